@@ -242,6 +242,11 @@ LOGGING = {
 
 CELERY_BROKER_URL = env('CELERY_BROKER_URL', default='redis://127.0.0.1:6379/0')
 
+# Optional leaderboard backend, e.g. 'leaderboard.backends.RedisLeaderboard' or
+# 'leaderboard.backends.LocalLeaderboard' (in-process, for tests). Empty: ranks come from Postgres.
+LEADERBOARD_BACKEND = env('LEADERBOARD_BACKEND', default='')
+LEADERBOARD_REDIS_URL = env('LEADERBOARD_REDIS_URL', default=CELERY_BROKER_URL)
+
 # CELERY_BROKER_URL = "redis://127.0.0.1:6379/0"  # or your Redis URL
 CELERY_BEAT_SCHEDULER = "celery.beat.PersistentScheduler"
 CELERY_BEAT_SCHEDULE_FILENAME = "/tmp/celerybeat-schedule"  # or some path
@@ -255,17 +260,47 @@ CELERY_BEAT_SCHEDULE = {
         "task": "notifications.tasks.send_due_notifications",
         "schedule": 3600.0,  # every 1 hours 
     },
-    # Leaderboard calucation
+    # Completion outbox (also drained right after each completion commits)
+    "process-completion-events": {
+        "task": "saved_workouts.tasks.process_completion_events",
+        "schedule": 60.0,  # every 60 secs 
+    },
+    # Leaderboard calucation (scores are kept current by completion events; this reconciles windows and ranks)
     "update-leaderboards-daily": {
         "task": "leaderboard.tasks.update_leaderboards",
+        # "schedule": 60.0,  # every 60 secs 
+        "schedule": crontab(hour=2, minute=0),  
+    },
+    # Scores and ranks for users who scored since the last tick (see user_stats/dirty.py)
+    "update-dirty-leaderboards": {
+        "task": "leaderboard.tasks.update_dirty_leaderboards",
+        "schedule": 60.0,  # every 60 secs 
+    },
+    # Stats for users whose workouts changed since the last tick
+    "update-dirty-user-stats": {
+        "task": "user_stats.tasks.update_dirty_user_stats",
         "schedule": 60.0,  # every 60 secs 
-        # "schedule": crontab(hour=2, minute=0),  
     },
-    # User stats calculation
+    # User stats calculation (completion events add new workouts; this drops ones that aged out)
         'update-user-stats-nightly': {
         'task': 'user_stats.tasks.update_all_user_stats',
-        "schedule": 60.0,  # every 60 secs 
-        # 'schedule': crontab(hour=3, minute=0),  # 3:00 AM daily
+        # "schedule": 60.0,  # every 60 secs 
+        'schedule': crontab(hour=3, minute=0),  # 3:00 AM daily
+    },
+    # Leaderboard backend (Redis sorted sets) rebuilt from ScoreLog; no-op when not configured
+    'reconcile-leaderboard-backend': {
+        'task': 'leaderboard.tasks.reconcile_leaderboard_backend',
+        'schedule': 900.0,  # every 15 mins
+    },
+    # Movement summary jobs whose delayed task was lost
+    'run-overdue-movement-recalcs': {
+        'task': 'movement_summary_stats.tasks.run_overdue_movement_recalcs',
+        'schedule': 300.0,  # every 5 mins
+    },
+    # Expired completion idempotency keys
+    'purge-idempotency-keys-hourly': {
+        'task': 'saved_workouts.tasks.purge_idempotency_keys',
+        'schedule': 3600.0,  # every hour
     },
 }
 
@@ -54,7 +54,9 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 from saved_workouts.models import Workout
 from leaderboard.models import Leaderboard
+from leaderboard.backends import get_leaderboard_backend
 from user_stats.models import UserStats
+from user_stats.facts import stats_windows
 env = environ.Env()
 import re
 
@@ -280,9 +282,14 @@ class FullUserView(APIView):
             workouts_this_week=Count('id', filter=Q(completed_date__gte=start_of_week))
         )
 
-        # 2. Leaderboard info
+        # 2. Leaderboard info (from the leaderboard backend when one is configured)
         leaderboard = getattr(user, 'leaderboard', None)
-        if leaderboard:
+        backend = get_leaderboard_backend()
+        if backend is not None:
+            standing = backend.standings([user.id])[user.id]
+            leaderboard_scores = {field: standing[field] for field in ('total_score', 'weekly_score', 'monthly_score')}
+            leaderboard_ranks = {field: standing[field] for field in ('total_rank', 'weekly_rank', 'monthly_rank')}
+        elif leaderboard:
             leaderboard_scores = {
                 'total_score': leaderboard.total_score,
                 'weekly_score': leaderboard.weekly_score,
@@ -310,20 +317,8 @@ class FullUserView(APIView):
             }
         }
 
-        # 3. Insert user_stats if it exists
-        # Suppose your model has something like `owner = OneToOneField(User, related_name='user_stats')`
-        user_stats = getattr(user, 'user_stats', None)
-        if user_stats:
-            # Example: Just place all of user_stats' JSON fields under 'stats["aggregates"]'
-            data['stats']['aggregates'] = {
-                'weekly_body_part': user_stats.weekly_body_part,
-                'monthly_body_part': user_stats.monthly_body_part,
-                'yearly_body_part': user_stats.yearly_body_part,
-
-                'weekly_activity_type': user_stats.weekly_activity_type,
-                'monthly_activity_type': user_stats.monthly_activity_type,
-                'yearly_activity_type': user_stats.yearly_activity_type,
-            }
+        # 3. Body-part and activity-type aggregates, summed from the daily training facts
+        data['stats']['aggregates'] = stats_windows(user.id)
 
         return Response(data, status=status.HTTP_200_OK)
 
@@ -0,0 +1,260 @@
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+logger = logging.getLogger(__name__)
+
+PERIODS = ('total', 'weekly', 'monthly')
+WEEK_DAYS = 8  # today and the 7 days before it, like `timestamp__date__gte=today - 7 days`
+
+
+def week_days(today):
+    return [today - timedelta(days=offset) for offset in range(WEEK_DAYS)]
+
+
+class LeaderboardBackend:
+    """
+    Ranked scores kept outside Postgres, updated incrementally as points are awarded.
+
+    Scores are stored per user as an all-time total plus daily and monthly buckets;
+    the weekly score is the sum of the last `WEEK_DAYS` daily buckets. Ranks follow
+    SQL RANK(): a user's rank is one more than the number of users with a higher
+    score. Postgres (ScoreLog and its daily rollups) stays the source of truth and
+    `rebuild()` replaces everything from it; see
+    `leaderboard.tasks.reconcile_leaderboard_backend`.
+    """
+
+    def add_points(self, user_id, points, day=None):
+        raise NotImplementedError
+
+    def standings(self, user_ids):
+        """{user_id: {'total_score', 'weekly_score', 'monthly_score', 'total_rank', ...}}"""
+        raise NotImplementedError
+
+    def count(self, period):
+        raise NotImplementedError
+
+    def ranked_user_ids(self, period, start, stop):
+        """User ids in rank order for positions start..stop-1 of `period`."""
+        raise NotImplementedError
+
+    def position(self, period, user_id):
+        """The user's 0-based position in the rank order of `period`, or None if unranked."""
+        raise NotImplementedError
+
+    def rebuild(self, totals, daily):
+        """
+        Replace all scores. `totals` is {user_id: total_score} for every ranked user
+        (including zeros); `daily` is {date: {user_id: points}} for the current week and month.
+        """
+        raise NotImplementedError
+
+
+class LocalLeaderboard(LeaderboardBackend):
+    """In-process stand-in for tests and for running without Redis. Not shared between processes."""
+
+    def __init__(self):
+        self.totals = Counter()
+        self.days = defaultdict(Counter)
+
+    def add_points(self, user_id, points, day=None):
+        day = day or now().date()
+        self.totals[user_id] += points
+        self.days[day][user_id] += points
+
+    def _scores(self, period):
+        if period == 'total':
+            return dict(self.totals)
+
+        today = now().date()
+        if period == 'weekly':
+            days = week_days(today)
+        else:
+            days = [day for day in self.days if (day.year, day.month) == (today.year, today.month)]
+
+        scores = {user_id: 0 for user_id in self.totals}
+        for day in days:
+            for user_id, points in self.days.get(day, {}).items():
+                scores[user_id] = scores.get(user_id, 0) + points
+        return scores
+
+    def standings(self, user_ids):
+        result = {user_id: {} for user_id in user_ids}
+        for period in PERIODS:
+            scores = self._scores(period)
+            for user_id in user_ids:
+                score = scores.get(user_id, 0)
+                result[user_id][f'{period}_score'] = score
+                result[user_id][f'{period}_rank'] = sum(1 for other in scores.values() if other > score) + 1
+        return result
+
+    def count(self, period):
+        return len(self.totals)
+
+    def ranked_user_ids(self, period, start, stop):
+        scores = self._scores(period)
+        return sorted(scores, key=lambda user_id: (-scores[user_id], user_id))[start:stop]
+
+    def position(self, period, user_id):
+        ranked = self.ranked_user_ids(period, 0, None)
+        return ranked.index(user_id) if user_id in ranked else None
+
+    def rebuild(self, totals, daily):
+        self.totals = Counter(totals)
+        self.days = defaultdict(Counter, {day: Counter(points) for day, points in daily.items()})
+
+
+class RedisLeaderboard(LeaderboardBackend):
+    """
+    Redis sorted sets, one member per user id:
+
+      <prefix>:total               all-time scores, every ranked user (zeros included)
+      <prefix>:day:YYYY-MM-DD      points awarded that day, expires after the weekly window
+      <prefix>:month:YYYY-MM       points awarded that month, expires after the month ends
+      <prefix>:view:<period>:<day> weekly/monthly scores for every user, built with ZUNIONSTORE
+                                   from the total set (weight 0) and the buckets, cached briefly
+
+    Awards are a ZINCRBY per set, ranks a ZSCORE plus ZCOUNT, both O(log n).
+    """
+
+    view_ttl = 30  # seconds a weekly/monthly union is reused before it is rebuilt
+    rebuild_chunk_size = 10000
+
+    def __init__(self, url=None, prefix='leaderboard'):
+        import redis  # Only needed when this backend is configured
+
+        self.client = redis.Redis.from_url(url or settings.LEADERBOARD_REDIS_URL, decode_responses=True)
+        self.prefix = prefix
+
+    # Keys
+    def total_key(self):
+        return f'{self.prefix}:total'
+
+    def day_key(self, day):
+        return f'{self.prefix}:day:{day.isoformat()}'
+
+    def month_key(self, day):
+        return f'{self.prefix}:month:{day:%Y-%m}'
+
+    def _day_expiry(self, day):
+        return datetime.combine(day + timedelta(days=WEEK_DAYS + 1), time.min)
+
+    def _month_expiry(self, day):
+        next_month = (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+        return datetime.combine(next_month + timedelta(days=1), time.min)
+
+    def _view(self, period):
+        """The sorted set holding every user's score for `period`."""
+        if period == 'total':
+            return self.total_key()
+
+        today = now().date()
+        key = f'{self.prefix}:view:{period}:{today.isoformat()}'
+        if not self.client.exists(key):
+            buckets = [self.day_key(day) for day in week_days(today)] if period == 'weekly' else [self.month_key(today)]
+            sources = {self.total_key(): 0, **{bucket: 1 for bucket in buckets}}
+            pipe = self.client.pipeline()
+            pipe.zunionstore(key, sources)
+            pipe.expire(key, self.view_ttl)
+            pipe.execute()
+        return key
+
+    # Reads and writes
+    def add_points(self, user_id, points, day=None):
+        day = day or now().date()
+        pipe = self.client.pipeline()
+        pipe.zincrby(self.total_key(), points, user_id)
+        pipe.zincrby(self.day_key(day), points, user_id)
+        pipe.expireat(self.day_key(day), self._day_expiry(day))
+        pipe.zincrby(self.month_key(day), points, user_id)
+        pipe.expireat(self.month_key(day), self._month_expiry(day))
+        pipe.execute()
+
+    def standings(self, user_ids):
+        views = {period: self._view(period) for period in PERIODS}
+
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            for period in PERIODS:
+                pipe.zscore(views[period], user_id)
+        scores = iter(pipe.execute())
+
+        result = {user_id: {} for user_id in user_ids}
+        for user_id in user_ids:
+            for period in PERIODS:
+                result[user_id][f'{period}_score'] = int(next(scores) or 0)
+
+        pipe = self.client.pipeline()
+        for user_id in user_ids:
+            for period in PERIODS:
+                pipe.zcount(views[period], f'({result[user_id][f"{period}_score"]}', '+inf')
+        higher = iter(pipe.execute())
+        for user_id in user_ids:
+            for period in PERIODS:
+                result[user_id][f'{period}_rank'] = next(higher) + 1
+        return result
+
+    def count(self, period):
+        return self.client.zcard(self.total_key())
+
+    def ranked_user_ids(self, period, start, stop):
+        if stop <= start:
+            return []
+        return [int(member) for member in self.client.zrevrange(self._view(period), start, stop - 1)]
+
+    def position(self, period, user_id):
+        return self.client.zrevrank(self._view(period), user_id)
+
+    def rebuild(self, totals, daily):
+        today = now().date()
+        months = defaultdict(Counter)
+        for day, points in daily.items():
+            months[day.replace(day=1)].update(points)
+
+        pipe = self.client.pipeline(transaction=True)
+        self._replace(pipe, self.total_key(), totals)
+        for day in week_days(today):
+            self._replace(pipe, self.day_key(day), daily.get(day, {}), self._day_expiry(day))
+        for month, points in months.items():
+            self._replace(pipe, self.month_key(month), points, self._month_expiry(month))
+        if today.replace(day=1) not in months:
+            pipe.delete(self.month_key(today))
+        pipe.delete(*(f'{self.prefix}:view:{period}:{today.isoformat()}' for period in ('weekly', 'monthly')))
+        pipe.execute()
+
+    def _replace(self, pipe, key, scores, expire_at=None):
+        pipe.delete(key)
+        items = list(scores.items())
+        for offset in range(0, len(items), self.rebuild_chunk_size):
+            pipe.zadd(key, dict(items[offset:offset + self.rebuild_chunk_size]))
+        if items and expire_at:
+            pipe.expireat(key, expire_at)
+
+
+_backends = {}
+
+
+def get_leaderboard_backend():
+    """The configured backend (settings.LEADERBOARD_BACKEND), or None to read from Postgres."""
+    path = getattr(settings, 'LEADERBOARD_BACKEND', '')
+    if not path:
+        return None
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def record_points(user_id, points):
+    """Add newly inserted ScoreLog points to the backend, if one is configured."""
+    backend = get_leaderboard_backend()
+    if backend is None or not points:
+        return
+    try:
+        backend.add_points(int(user_id), points)
+    except Exception:
+        # Postgres has the points; the next reconciliation will catch the backend up
+        logger.exception("Could not add %s points for user %s to the leaderboard backend", points, user_id)
@@ -0,0 +1,86 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from .backends import PERIODS, get_leaderboard_backend
+from .models import Leaderboard
+
+User = get_user_model()
+
+USER_FIELDS = ('username', 'first_name', 'profile_image')
+
+
+def check_period(period):
+    if period not in PERIODS:
+        raise ValueError(f"period must be one of {', '.join(PERIODS)}")
+    return period
+
+
+def top_entries(period, limit):
+    """The first `limit` users of `period`, as slim entry dicts in rank order."""
+    backend = get_leaderboard_backend()
+    if backend is not None:
+        return _backend_entries(backend, period, backend.ranked_user_ids(period, 0, limit))
+
+    rank_field = f'{period}_rank'
+    return _table_entries(period, _ranked(rank_field).order_by(rank_field, 'user_id')[:limit])
+
+
+def entries_around(user_id, period, radius):
+    """
+    Up to `radius` users either side of `user_id` in `period`, plus the user.
+    Returns [] if the user has no leaderboard position yet.
+    """
+    backend = get_leaderboard_backend()
+    if backend is not None:
+        position = backend.position(period, user_id)
+        if position is None:
+            return []
+        start = max(0, position - radius)
+        return _backend_entries(backend, period, backend.ranked_user_ids(period, start, position + radius + 1))
+
+    rank_field = f'{period}_rank'
+    me = _ranked(rank_field).filter(user_id=user_id).values_list(rank_field, flat=True).first()
+    if me is None:
+        return []
+
+    # Neighbours by (rank, user_id), read in both directions from the rank index
+    before = Q(**{f'{rank_field}__lt': me}) | Q(**{rank_field: me, 'user_id__lt': user_id})
+    from_me = Q(**{f'{rank_field}__gt': me}) | Q(**{rank_field: me, 'user_id__gte': user_id})
+
+    above = _ranked(rank_field).filter(before).order_by(f'-{rank_field}', '-user_id')[:radius]
+    below = _ranked(rank_field).filter(from_me).order_by(rank_field, 'user_id')[:radius + 1]
+    return _table_entries(period, above)[::-1] + _table_entries(period, below)
+
+
+def _ranked(rank_field):
+    """Leaderboard rows that have a rank: new rows keep the default 0 until `refresh_ranks` runs."""
+    return Leaderboard.objects.filter(**{f'{rank_field}__gt': 0})
+
+
+def _table_entries(period, leaderboards):
+    score_field, rank_field = f'{period}_score', f'{period}_rank'
+    rows = leaderboards.values('user_id', *(f'user__{field}' for field in USER_FIELDS), score_field, rank_field)
+    return [
+        {
+            'user_id': row['user_id'],
+            **{field: row[f'user__{field}'] for field in USER_FIELDS},
+            'score': row[score_field],
+            'rank': row[rank_field],
+        }
+        for row in rows
+    ]
+
+
+def _backend_entries(backend, period, user_ids):
+    standings = backend.standings(user_ids)
+    users = {user['id']: user for user in User.objects.filter(id__in=user_ids).values('id', *USER_FIELDS)}
+    return [
+        {
+            'user_id': user_id,
+            **{field: users[user_id][field] for field in USER_FIELDS},
+            'score': standings[user_id][f'{period}_score'],
+            'rank': standings[user_id][f'{period}_rank'],
+        }
+        for user_id in user_ids
+        if user_id in users
+    ]
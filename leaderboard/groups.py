@@ -0,0 +1,95 @@
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import F, Window
+from django.db.models.functions import Rank
+
+from chat_message.models import ChatMessage
+from .models import Leaderboard
+
+User = get_user_model()
+
+# Group boards are computed on request and reused for this long, unless a member's score changes first
+GROUP_BOARD_TTL = 60
+MAX_FRIENDS = 200
+
+USER_FIELDS = ('username', 'first_name', 'profile_image')
+
+
+def chat_room_members(room_id):
+    """Everyone who has posted in the room (rooms have no membership table)."""
+    return ChatMessage.objects.filter(room_id=room_id).values('owner_id')
+
+
+def hyrox_division_members(division):
+    return User.objects.filter(hyrox_division=division).values('id')
+
+
+def friends_key(user_ids):
+    """A stable cache key part for an explicit list of user ids."""
+    joined = ','.join(str(user_id) for user_id in sorted(set(user_ids)))
+    return hashlib.sha1(joined.encode()).hexdigest()
+
+
+def group_board(group_key, members, period):
+    """
+    The group's leaderboard for `period` as slim entry dicts in rank order, ranked
+    within the group only.
+
+    `members` is a list of user ids or a one-column queryset of them; either way the
+    board is one ranked query over the Leaderboard score columns. The result is cached
+    for GROUP_BOARD_TTL and registered against each member, so `invalidate_group_boards`
+    can drop it as soon as one of their scores changes.
+    """
+    cache_key = f'leaderboard:group:{group_key}:{period}'
+    board = cache.get(cache_key)
+    if board is not None:
+        return board
+
+    score_field = f'{period}_score'
+    rows = (
+        Leaderboard.objects
+        .filter(user_id__in=members)
+        .annotate(group_rank=Window(Rank(), order_by=F(score_field).desc()))
+        .order_by('group_rank', 'user_id')
+        .values('user_id', *(f'user__{field}' for field in USER_FIELDS), score_field, 'group_rank')
+    )
+    board = [
+        {
+            'user_id': row['user_id'],
+            **{field: row[f'user__{field}'] for field in USER_FIELDS},
+            'score': row[score_field],
+            'rank': row['group_rank'],
+        }
+        for row in rows
+    ]
+
+    cache.set(cache_key, board, GROUP_BOARD_TTL)
+    _register(cache_key, [entry['user_id'] for entry in board])
+    return board
+
+
+def invalidate_group_boards(user_ids):
+    """Drop every cached group board that includes any of these users."""
+    registry_keys = [_registry_key(user_id) for user_id in set(user_ids)]
+    if not registry_keys:
+        return
+    registries = cache.get_many(registry_keys)
+    board_keys = set().union(*registries.values()) if registries else set()
+    if board_keys:
+        cache.delete_many(list(board_keys))
+    cache.delete_many(list(registries))
+
+
+def _registry_key(user_id):
+    return f'leaderboard:group-boards:user:{user_id}'
+
+
+def _register(cache_key, user_ids):
+    registry_keys = [_registry_key(user_id) for user_id in user_ids]
+    registries = cache.get_many(registry_keys)
+    cache.set_many(
+        {key: registries.get(key, set()) | {cache_key} for key in registry_keys},
+        GROUP_BOARD_TTL
+    )
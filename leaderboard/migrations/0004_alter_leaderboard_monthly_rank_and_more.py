@@ -0,0 +1,31 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "leaderboard",
+            "0003_leaderboard_monthly_rank_leaderboard_total_rank_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="leaderboard",
+            name="monthly_rank",
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name="leaderboard",
+            name="total_rank",
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+        migrations.AlterField(
+            model_name="leaderboard",
+            name="weekly_rank",
+            field=models.IntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+TABLE = 'leaderboard_leaderboardsnapshot'
+
+
+def create_snapshot_table(apps, schema_editor):
+    """
+    Postgres: a table range-partitioned by period_start, with a default partition;
+    yearly partitions are added by leaderboard.snapshots.ensure_partition. The primary
+    key and unique constraint include period_start, as partitioning requires.
+    Other databases get a plain table.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(apps.get_model('leaderboard', 'LeaderboardSnapshot'))
+        return
+
+    user_table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    schema_editor.execute(f'''
+        CREATE TABLE "{TABLE}" (
+            "id" bigint GENERATED BY DEFAULT AS IDENTITY,
+            "period" varchar(10) NOT NULL,
+            "period_start" date NOT NULL,
+            "score" integer NOT NULL,
+            "rank" integer NOT NULL,
+            "user_id" bigint NOT NULL REFERENCES "{user_table}" ("id") DEFERRABLE INITIALLY DEFERRED,
+            PRIMARY KEY ("id", "period_start"),
+            CONSTRAINT "snapshot_period_user_uniq" UNIQUE ("period", "period_start", "user_id")
+        ) PARTITION BY RANGE ("period_start")
+    ''')
+    schema_editor.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT')
+    schema_editor.execute(f'CREATE INDEX "snapshot_board_idx" ON "{TABLE}" ("period", "period_start", "rank")')
+    schema_editor.execute(f'CREATE INDEX "snapshot_user_idx" ON "{TABLE}" ("user_id", "period", "period_start")')
+
+
+def drop_snapshot_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.delete_model(apps.get_model('leaderboard', 'LeaderboardSnapshot'))
+        return
+    schema_editor.execute(f'DROP TABLE "{TABLE}" CASCADE')  # Drops the partitions too
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("leaderboard", "0004_alter_leaderboard_monthly_rank_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name="LeaderboardSnapshot",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "period",
+                            models.CharField(
+                                choices=[("weekly", "Weekly"), ("monthly", "Monthly")],
+                                max_length=10,
+                            ),
+                        ),
+                        ("period_start", models.DateField()),
+                        ("score", models.IntegerField()),
+                        ("rank", models.IntegerField()),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.CASCADE,
+                                related_name="leaderboard_snapshots",
+                                to=settings.AUTH_USER_MODEL,
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            models.Index(
+                                fields=["period", "period_start", "rank"],
+                                name="snapshot_board_idx",
+                            ),
+                            models.Index(
+                                fields=["user", "period", "period_start"],
+                                name="snapshot_user_idx",
+                            ),
+                        ],
+                        "unique_together": {("period", "period_start", "user")},
+                    },
+                ),
+            ],
+        ),
+        # The table itself is created here, once the model is in the migration state
+        migrations.RunPython(create_snapshot_table, drop_snapshot_table),
+    ]
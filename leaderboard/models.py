@@ -11,10 +11,49 @@ class Leaderboard(models.Model):
     total_score = models.IntegerField(default=0, db_index=True)
     weekly_score = models.IntegerField(default=0) 
     monthly_score = models.IntegerField(default=0) 
-    total_rank = models.IntegerField(default=0)  
-    weekly_rank = models.IntegerField(default=0)
-    monthly_rank = models.IntegerField(default=0) 
+    total_rank = models.IntegerField(default=0, db_index=True)  
+    weekly_rank = models.IntegerField(default=0, db_index=True)
+    monthly_rank = models.IntegerField(default=0, db_index=True) 
     last_updated = models.DateTimeField(auto_now=True)  # Last time the score was updated
 
     def __str__(self):
         return f"{self.user.username} - Total Score: {self.total_score}, Weekly Score: {self.weekly_score}"
+
+
+class LeaderboardSnapshot(models.Model):
+    """
+    A user's final score and rank for one closed week or month, written by
+    `update_leaderboards` once the period ends. Only users who scored are stored;
+    anyone missing from a board finished level last.
+
+    In Postgres the table is range-partitioned by `period_start` (one partition per
+    year, created on demand), see leaderboard/snapshots.py.
+    """
+    WEEKLY = 'weekly'
+    MONTHLY = 'monthly'
+    PERIOD_CHOICES = [
+        (WEEKLY, 'Weekly'),
+        (MONTHLY, 'Monthly'),
+    ]
+
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    user = models.ForeignKey(
+        'jwt_auth.User',
+        on_delete=models.CASCADE,
+        related_name='leaderboard_snapshots'
+    )
+    score = models.IntegerField()
+    rank = models.IntegerField()
+
+    class Meta:
+        unique_together = ('period', 'period_start', 'user')
+        indexes = [
+            # A past board, page by page
+            models.Index(fields=['period', 'period_start', 'rank'], name='snapshot_board_idx'),
+            # One user's rank trajectory
+            models.Index(fields=['user', 'period', 'period_start'], name='snapshot_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.period} {self.period_start}: #{self.rank} ({self.score} points)"
@@ -6,4 +6,13 @@ class LeaderboardSerializer(serializers.ModelSerializer):
     user = UserSerializer()
     class Meta:
         model = Leaderboard
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """One row of a top-N or around-me leaderboard: just what the list renders."""
+    user_id = serializers.IntegerField()
+    username = serializers.CharField(allow_null=True)
+    first_name = serializers.CharField()
+    profile_image = serializers.CharField(allow_null=True)
+    score = serializers.IntegerField()
+    rank = serializers.IntegerField()
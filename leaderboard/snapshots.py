@@ -0,0 +1,99 @@
+import csv
+import io
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F, Sum, Window
+from django.db.models.functions import Rank
+
+from score_logging.models import DailyScoreRollup
+from .models import LeaderboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_BATCH_SIZE = 5000
+
+
+def closed_periods(today):
+    """
+    The most recently closed calendar week (Monday to Sunday) and month before
+    `today`, as (period, start, end) with `end` exclusive.
+    """
+    this_week = today - timedelta(days=today.weekday())
+    this_month = today.replace(day=1)
+    last_month = (this_month - timedelta(days=1)).replace(day=1)
+    return [
+        (LeaderboardSnapshot.WEEKLY, this_week - timedelta(days=7), this_week),
+        (LeaderboardSnapshot.MONTHLY, last_month, this_month),
+    ]
+
+
+def final_standings(start, end):
+    """(user_id, score, rank) for everyone who scored in [start, end), from the daily rollups."""
+    return (
+        DailyScoreRollup.objects
+        .filter(day__gte=start, day__lt=end)
+        .values('user_id')
+        .annotate(total=Sum('score'))
+        .filter(total__gt=0)
+        .annotate(rank=Window(Rank(), order_by=F('total').desc()))
+        .values_list('user_id', 'total', 'rank')
+        .order_by()
+    )
+
+
+def write_period_snapshots(today):
+    """
+    Snapshot every closed period that has no snapshot yet. Safe to run repeatedly:
+    each board is written once, in its own transaction.
+    Returns the number of rows written.
+    """
+    written = 0
+    for period, start, end in closed_periods(today):
+        with transaction.atomic():
+            if LeaderboardSnapshot.objects.filter(period=period, period_start=start).exists():
+                continue
+            rows = list(final_standings(start, end))
+            if rows:
+                _insert_rows(period, start, rows)
+                written += len(rows)
+                logger.info("Leaderboard snapshot %s %s: %s users", period, start, len(rows))
+    return written
+
+
+def ensure_partition(year):
+    """Create the yearly partition of the snapshot table (Postgres only) if it is missing."""
+    table = LeaderboardSnapshot._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{table}_{year}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        )
+
+
+def _insert_rows(period, start, rows):
+    if connection.vendor != 'postgresql':
+        LeaderboardSnapshot.objects.bulk_create(
+            [
+                LeaderboardSnapshot(period=period, period_start=start, user_id=user_id, score=score, rank=rank)
+                for user_id, score, rank in rows
+            ],
+            batch_size=SNAPSHOT_BATCH_SIZE,
+        )
+        return
+
+    # COPY streams the whole board in one statement
+    ensure_partition(start.year)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user_id, score, rank in rows:
+        writer.writerow([period, start.isoformat(), user_id, score, rank])
+    buffer.seek(0)
+
+    table = LeaderboardSnapshot._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY "{table}" ("period", "period_start", "user_id", "score", "rank") FROM STDIN WITH (FORMAT csv)',
+            buffer,
+        )
@@ -1,71 +1,234 @@
 # leaderboard/tasks.py
+import logging
+import time
+
 from celery import shared_task
-from django.db.models import Sum
-from django.utils.timezone import now
+from django.db import connection
+from django.db.models import Sum, Q, F, Value, Window
+from django.db.models.functions import Coalesce, Rank
+from django.utils.timezone import localdate, now
 from datetime import timedelta
 from leaderboard.models import Leaderboard
-from score_logging.models import ScoreLog
+from leaderboard.backends import get_leaderboard_backend, week_days
+from leaderboard.snapshots import write_period_snapshots
+from leaderboard.groups import invalidate_group_boards
+from user_stats.models import DirtyUser
+from user_stats.dirty import drain_dirty_users, clear_dirty_users
+from score_logging.models import DailyScoreRollup
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+
+SCORE_FIELDS = ['total_score', 'weekly_score', 'monthly_score']
+RANK_FIELDS = ['total_rank', 'weekly_rank', 'monthly_rank']
+
+UPSERT_BATCH_SIZE = 2000
+
+
+def _score_sum(window=None):
+    return Coalesce(Sum('daily_score_rollups__score', filter=window), Value(0))
+
+
+def leaderboard_rows():
+    """
+    Scores and ranks for every user in one grouped query.
+
+    DailyScoreRollup rows are summed per user with conditional aggregation for the
+    weekly and monthly windows (at most 31 rows per user for a window), and each score is ranked with RANK() over all users (tied
+    scores share a rank). Users without scores get 0 and rank with the rest.
+
+    Yields (user_id, total_score, weekly_score, monthly_score, total_rank, weekly_rank, monthly_rank).
+    """
+    today = localdate()
+    one_week_ago = today - timedelta(days=7)
+    start_of_month = today.replace(day=1)
+
+    def rank_by(score_field):
+        return Window(Rank(), order_by=F(score_field).desc())
+
+    return (
+        User.objects
+        .annotate(
+            total_score=_score_sum(),
+            weekly_score=_score_sum(Q(daily_score_rollups__day__gte=one_week_ago)),
+            monthly_score=_score_sum(Q(daily_score_rollups__day__gte=start_of_month)),
+        )
+        .annotate(
+            total_rank=rank_by('total_score'),
+            weekly_rank=rank_by('weekly_score'),
+            monthly_rank=rank_by('monthly_score'),
+        )
+        .values_list('id', *SCORE_FIELDS, *RANK_FIELDS)
+        .order_by()
+        .iterator(chunk_size=UPSERT_BATCH_SIZE)
+    )
+
+
+def refresh_leaderboard_scores(user_ids):
+    """
+    Recompute total, weekly and monthly scores for these users only, from the daily
+    rollups, and upsert the rows that changed. Ranks are left to `refresh_ranks`.
+    """
+    today = localdate()
+    stored = dict(
+        (row[0], row[1:])
+        for row in Leaderboard.objects.filter(user_id__in=user_ids).values_list('user_id', *SCORE_FIELDS)
+    )
+    scores = (
+        User.objects
+        .filter(id__in=user_ids)
+        .annotate(
+            total_score=_score_sum(),
+            weekly_score=_score_sum(Q(daily_score_rollups__day__gte=today - timedelta(days=7))),
+            monthly_score=_score_sum(Q(daily_score_rollups__day__gte=today.replace(day=1))),
+        )
+        .values_list('id', *SCORE_FIELDS)
+        .order_by()
+    )
+
+    changed = [
+        Leaderboard(user_id=user_id, **dict(zip(SCORE_FIELDS, values)))
+        for user_id, *values in scores
+        if stored.get(user_id) != tuple(values)
+    ]
+    if changed:
+        Leaderboard.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=SCORE_FIELDS + ['last_updated'],
+        )
+        invalidate_group_boards([row.user_id for row in changed])
+    return len(changed)
+
+
+def refresh_ranks():
+    """
+    Re-rank every leaderboard row from its stored scores in one UPDATE ... FROM a
+    RANK() subquery, writing only rows whose rank changed. Returns the rows updated.
+
+    One changed score can move everyone below it, so this reads and sorts the whole
+    table: its cost grows with the number of users, not with activity. Callers skip
+    it when no score changed.
+    """
+    quote = connection.ops.quote_name
+    table = quote(Leaderboard._meta.db_table)
+    ranks = ', '.join(
+        f'RANK() OVER (ORDER BY {quote(score)} DESC) AS {quote(rank)}'
+        for score, rank in zip(SCORE_FIELDS, RANK_FIELDS)
+    )
+    assignments = ', '.join(f'{quote(rank)} = ranked.{quote(rank)}' for rank in RANK_FIELDS)
+    differs = ' OR '.join(f'{table}.{quote(rank)} <> ranked.{quote(rank)}' for rank in RANK_FIELDS)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET {assignments} "
+            f"FROM (SELECT {quote('user_id')}, {ranks} FROM {table}) AS ranked "
+            f"WHERE {table}.{quote('user_id')} = ranked.{quote('user_id')} AND ({differs})"
+        )
+        return cursor.rowcount
+
+
+@shared_task
+def update_dirty_leaderboards():
+    """
+    Bring scores up to date for users marked dirty since the last run (see
+    user_stats.dirty), then re-rank if any score actually changed. Does nothing
+    when nobody scored.
+    """
+    changed = []
+
+    def rescore(user_ids):
+        changed.append(refresh_leaderboard_scores(user_ids))
+
+    processed = drain_dirty_users(DirtyUser.LEADERBOARD, rescore)
+    if sum(changed):
+        reranked = refresh_ranks()
+        logger.info("Leaderboards: %s dirty users rescored, %s rows re-ranked", processed, reranked)
+    return processed
+
 
 @shared_task
 def update_leaderboards():
     """
     Nightly aggregator to update total_score, weekly_score, monthly_score,
-    and ranks for all users.
+    and ranks for all users. This sweep rolls the weekly and monthly windows forward
+    for everyone; during the day `update_dirty_leaderboards` handles active users.
+
+    1) read the stored leaderboard values,
+    2) compute every user's scores and ranks in one query (`leaderboard_rows`),
+    3) upsert only the rows that are missing or changed, in batches,
+    4) snapshot the final standings of the week or month that just closed.
     """
-    today = now().date()
-    one_week_ago = today - timedelta(days=7)
-    start_of_month = today.replace(day=1)
+    started = time.perf_counter()
+    swept_from = now()
+    fields = SCORE_FIELDS + RANK_FIELDS
+
+    # 1) Current values, to skip rows that would not change
+    stored = {
+        row[0]: row[1:]
+        for row in Leaderboard.objects.values_list('user_id', *fields).iterator(chunk_size=UPSERT_BATCH_SIZE)
+    }
+
+    # 2) Compare with the fresh scores and ranks
+    changed = []
+    for user_id, *values in leaderboard_rows():
+        if stored.get(user_id) != tuple(values):
+            changed.append(Leaderboard(user_id=user_id, **dict(zip(fields, values))))
 
-    users = User.objects.all()
+    # 3) One upsert for everything that changed
+    if changed:
+        Leaderboard.objects.bulk_create(
+            changed,
+            batch_size=UPSERT_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user'],
+            update_fields=fields + ['last_updated'],
+        )
 
-    # 1) Aggregate for each user
-    for user in users:
-        total_score = ScoreLog.objects.filter(user=user).aggregate(sum=Sum('score_value'))['sum'] or 0
-        weekly_score = ScoreLog.objects.filter(
-            user=user, timestamp__gte=one_week_ago
-        ).aggregate(sum=Sum('score_value'))['sum'] or 0
-        monthly_score = ScoreLog.objects.filter(
-            user=user, timestamp__date__gte=start_of_month
-        ).aggregate(sum=Sum('score_value'))['sum'] or 0
+    # Group boards rank by score, so only score changes make them stale
+    invalidate_group_boards([
+        row.user_id for row in changed
+        if stored.get(row.user_id, ())[:len(SCORE_FIELDS)] != tuple(getattr(row, field) for field in SCORE_FIELDS)
+    ])
 
-        lb, _ = Leaderboard.objects.get_or_create(user=user)
-        lb.total_score = total_score
-        lb.weekly_score = weekly_score
-        lb.monthly_score = monthly_score
-        lb.save()
+    # 4) Period-end snapshots (no-op until a week or month closes)
+    write_period_snapshots(localdate())
 
-    # 2) Compute ranks for each category
-    _update_ranks()
+    # Everyone marked before the sweep started is now up to date
+    clear_dirty_users(DirtyUser.LEADERBOARD, swept_from)
 
+    logger.info(
+        "Leaderboards refreshed: %s of %s rows changed in %.2fs",
+        len(changed), len(stored), time.perf_counter() - started
+    )
+    return len(changed)
 
 
-def _update_ranks():
+@shared_task
+def reconcile_leaderboard_backend():
     """
-    Sort by total_score, weekly_score, monthly_score and assign ranks.
+    Rebuild the leaderboard backend (see leaderboard/backends.py) from the daily score
+    rollups, so any award it missed, or counted twice, is corrected. Does nothing when
+    no backend is configured.
     """
-    # RANK ALL-TIME
-    all_time_lb = Leaderboard.objects.order_by('-total_score')
-    rank = 1
-    for lb in all_time_lb:
-        lb.total_rank = rank
-        lb.save()
-        rank += 1
-    
-    # RANK WEEKLY
-    weekly_lb = Leaderboard.objects.order_by('-weekly_score')
-    rank = 1
-    for lb in weekly_lb:
-        lb.weekly_rank = rank
-        lb.save()
-        rank += 1
-
-    # RANK MONTHLY
-    monthly_lb = Leaderboard.objects.order_by('-monthly_score')
-    rank = 1
-    for lb in monthly_lb:
-        lb.monthly_rank = rank
-        lb.save()
-        rank += 1
+    backend = get_leaderboard_backend()
+    if backend is None:
+        return None
+
+    today = localdate()
+    since = min(week_days(today)[-1], today.replace(day=1))
+
+    # Totals for every user, so users without points are ranked too
+    totals = dict(User.objects.annotate(total_score=_score_sum()).values_list('id', 'total_score').order_by())
+
+    # Points per user per day for the weekly window and the current month
+    daily = {}
+    rows = DailyScoreRollup.objects.filter(day__gte=since).values_list('day', 'user_id', 'score')
+    for day, user_id, points in rows:
+        daily.setdefault(day, {})[user_id] = points
+
+    backend.rebuild(totals, daily)
+    logger.info("Leaderboard backend rebuilt for %s users", len(totals))
+    return len(totals)
@@ -1,6 +1,16 @@
 from django.urls import path
-from .views import LeaderboardListView
+from .views import (
+    LeaderboardListView, LeaderboardTopView, LeaderboardAroundMeView, LeaderboardHistoryView, UserLeaderboardHistoryView,
+    ChatRoomLeaderboardView, HyroxDivisionLeaderboardView, FriendsLeaderboardView
+)
 
 urlpatterns = [
     path('', LeaderboardListView.as_view(), name='leaderboard-list'),
+    path('top/', LeaderboardTopView.as_view(), name='leaderboard-top'),
+    path('around-me/', LeaderboardAroundMeView.as_view(), name='leaderboard-around-me'),
+    path('history/', LeaderboardHistoryView.as_view(), name='leaderboard-history'),
+    path('history/user/<int:user_id>/', UserLeaderboardHistoryView.as_view(), name='leaderboard-user-history'),
+    path('groups/chat-room/<int:room_id>/', ChatRoomLeaderboardView.as_view(), name='leaderboard-chat-room'),
+    path('groups/hyrox/<str:division>/', HyroxDivisionLeaderboardView.as_view(), name='leaderboard-hyrox-division'),
+    path('groups/friends/', FriendsLeaderboardView.as_view(), name='leaderboard-friends'),
 ]
\ No newline at end of file
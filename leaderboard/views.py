@@ -1,7 +1,34 @@
 # leaderboard/views.py
 from rest_framework.generics import ListAPIView
-from .models import Leaderboard
-from .serializers.common import LeaderboardSerializer
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from datetime import datetime
+from fitnessappbuild.pagination import KeysetPagination
+from .models import Leaderboard, LeaderboardSnapshot
+from .backends import get_leaderboard_backend
+from .entries import check_period, top_entries, entries_around
+from .groups import group_board, chat_room_members, hyrox_division_members, friends_key, MAX_FRIENDS
+from .serializers.common import LeaderboardSerializer, LeaderboardEntrySerializer
+
+
+class RankedUsers:
+    """
+    Lazy, sliceable rank order from the leaderboard backend, so the DRF paginator
+    can page it like a queryset: len() is the number of ranked users and a slice
+    returns the user ids at those positions.
+    """
+
+    def __init__(self, backend, period):
+        self.backend = backend
+        self.period = period
+
+    def __len__(self):
+        return self.backend.count(self.period)
+
+    def __getitem__(self, positions):
+        return self.backend.ranked_user_ids(self.period, positions.start or 0, positions.stop)
+
 
 class LeaderboardListView(ListAPIView):
     serializer_class = LeaderboardSerializer
@@ -14,3 +41,203 @@ class LeaderboardListView(ListAPIView):
             .select_related('user')     # ensures 1 DB join for user
             .order_by('weekly_rank')     # or '-total_score' if you prefer
         )
+
+    def list(self, request, *args, **kwargs):
+        backend = get_leaderboard_backend()
+        if backend is None:
+            return super().list(request, *args, **kwargs)
+
+        # 1) The page of user ids, in weekly rank order, from the backend
+        user_ids = self.paginate_queryset(RankedUsers(backend, 'weekly'))
+
+        # 2) Users from Postgres, scores and ranks from the backend
+        rows = Leaderboard.objects.select_related('user').in_bulk(user_ids, field_name='user_id')
+        standings = backend.standings(user_ids)
+        page = []
+        for user_id in user_ids:
+            row = rows.get(user_id)
+            if row is None:
+                continue  # Not in Postgres yet; picked up by the next refresh
+            for field, value in standings[user_id].items():
+                setattr(row, field, value)
+            page.append(row)
+
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+def _bounded_int(request, name, default, maximum):
+    return max(1, min(int(request.query_params.get(name, default)), maximum))
+
+
+class LeaderboardTopView(APIView):
+    """
+    The top `limit` users for `period` (total, weekly or monthly; default weekly).
+    """
+    max_limit = 100
+
+    def get(self, request):
+        try:
+            period = check_period(request.query_params.get('period', 'weekly'))
+            limit = _bounded_int(request, 'limit', 10, self.max_limit)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = top_entries(period, limit)
+        return Response(
+            {'period': period, 'results': LeaderboardEntrySerializer(entries, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+
+class LeaderboardAroundMeView(APIView):
+    """
+    The user's own leaderboard row for `period` with up to `radius` rows either side.
+    """
+    max_radius = 25
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'User ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user_id = int(user_id)
+            period = check_period(request.query_params.get('period', 'weekly'))
+            radius = _bounded_int(request, 'radius', 5, self.max_radius)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        entries = entries_around(user_id, period, radius)
+        return Response(
+            {'period': period, 'results': LeaderboardEntrySerializer(entries, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+
+def _snapshot_period(request):
+    period = request.query_params.get('period', LeaderboardSnapshot.WEEKLY)
+    if period not in dict(LeaderboardSnapshot.PERIOD_CHOICES):
+        raise ValueError(f"period must be one of {', '.join(dict(LeaderboardSnapshot.PERIOD_CHOICES))}")
+    return period
+
+
+class LeaderboardHistoryView(APIView):
+    """
+    The final standings of a closed week or month, a page at a time in rank order.
+    `period_start` (YYYY-MM-DD) picks the board; it defaults to the latest one.
+    """
+    pagination = KeysetPagination('rank')
+
+    def get(self, request):
+        try:
+            period = _snapshot_period(request)
+            period_start = request.query_params.get('period_start')
+            if period_start:
+                period_start = datetime.strptime(period_start, '%Y-%m-%d').date()
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        snapshots = LeaderboardSnapshot.objects.filter(period=period)
+        if not period_start:
+            period_start = snapshots.order_by('-period_start').values_list('period_start', flat=True).first()
+            if period_start is None:
+                return Response({'error': 'No snapshots yet'}, status=status.HTTP_404_NOT_FOUND)
+
+        rows = snapshots.filter(period_start=period_start).values(
+            'id', 'user_id', 'user__username', 'user__first_name', 'user__profile_image', 'score', 'rank'
+        )
+        page, next_cursor = self.pagination.paginate_queryset(rows, request)
+        entries = [
+            {
+                'user_id': row['user_id'],
+                'username': row['user__username'],
+                'first_name': row['user__first_name'],
+                'profile_image': row['user__profile_image'],
+                'score': row['score'],
+                'rank': row['rank'],
+            }
+            for row in page
+        ]
+        return Response({
+            'period': period,
+            'period_start': period_start,
+            'results': LeaderboardEntrySerializer(entries, many=True).data,
+            'next_cursor': next_cursor,
+        }, status=status.HTTP_200_OK)
+
+
+class UserLeaderboardHistoryView(APIView):
+    """A user's score and rank in their last `limit` closed weeks or months, newest first."""
+    max_limit = 52
+
+    def get(self, request, user_id):
+        try:
+            period = _snapshot_period(request)
+            limit = _bounded_int(request, 'limit', 12, self.max_limit)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        history = (
+            LeaderboardSnapshot.objects
+            .filter(user_id=user_id, period=period)
+            .order_by('-period_start')
+            .values('period_start', 'score', 'rank')[:limit]
+        )
+        return Response({'period': period, 'results': list(history)}, status=status.HTTP_200_OK)
+
+
+class GroupLeaderboardView(APIView):
+    """
+    A leaderboard ranked within one group of users. Subclasses say who the members
+    are; boards are computed on request and cached briefly (see leaderboard/groups.py).
+    Returns the top `limit` entries plus the requesting user's own entry, if they are in the group.
+    """
+    max_limit = 100
+
+    def get_group(self, request, **kwargs):
+        """Return (cache key part, members)."""
+        raise NotImplementedError
+
+    def get(self, request, **kwargs):
+        try:
+            period = check_period(request.query_params.get('period', 'weekly'))
+            limit = _bounded_int(request, 'limit', 50, self.max_limit)
+            group_key, members = self.get_group(request, **kwargs)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        board = group_board(group_key, members, period)
+
+        user_id = request.query_params.get('user_id')
+        me = next((entry for entry in board if str(entry['user_id']) == user_id), None)
+        return Response({
+            'period': period,
+            'count': len(board),
+            'results': LeaderboardEntrySerializer(board[:limit], many=True).data,
+            'me': LeaderboardEntrySerializer(me).data if me else None,
+        }, status=status.HTTP_200_OK)
+
+
+class ChatRoomLeaderboardView(GroupLeaderboardView):
+    def get_group(self, request, room_id):
+        return f'chat-room:{room_id}', chat_room_members(room_id)
+
+
+class HyroxDivisionLeaderboardView(GroupLeaderboardView):
+    def get_group(self, request, division):
+        return f'hyrox:{division}', hyrox_division_members(division)
+
+
+class FriendsLeaderboardView(GroupLeaderboardView):
+    """Friends are passed explicitly as `user_ids=1,2,3`; the requesting `user_id` is always included."""
+
+    def get_group(self, request):
+        user_ids = {int(user_id) for user_id in request.query_params.get('user_ids', '').split(',') if user_id.strip()}
+        if request.query_params.get('user_id'):
+            user_ids.add(int(request.query_params['user_id']))
+        if not user_ids:
+            raise ValueError('user_ids is required')
+        if len(user_ids) > MAX_FRIENDS:
+            raise ValueError(f'At most {MAX_FRIENDS} friends can be compared')
+        return f'friends:{friends_key(user_ids)}', list(user_ids)
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+
+from movement_summary_stats.performances import refresh_recent_performances
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild RecentMovementPerformance rows from completed workouts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help="Only backfill this user.")
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(saved_workouts__status="Completed").distinct()
+        if options.get('user_id'):
+            users = users.filter(id=options['user_id'])
+
+        total_rows = 0
+        for user_id in users.values_list('id', flat=True).iterator():
+            rows = refresh_recent_performances(user_id)
+            total_rows += rows
+            self.stdout.write(f"User {user_id}: {rows} movements stored.")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete: {total_rows} rows written."))
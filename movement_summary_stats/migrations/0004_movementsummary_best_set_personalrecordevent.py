@@ -0,0 +1,86 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movement_summary_stats", "0003_movementrecalcjob_pendingmovementrecalc"),
+        ("movements", "0014_movement_movement_exercise_lower_idx"),
+        (
+            "strength_records",
+            "0002_alter_strengthset_reps_alter_strengthset_rpe_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movementsummary",
+            name="best_set",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="strength_records.strengthset",
+            ),
+        ),
+        migrations.CreateModel(
+            name="PersonalRecordEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("weight", models.FloatField()),
+                ("reps", models.PositiveSmallIntegerField()),
+                ("estimated_1rm", models.FloatField()),
+                ("previous_weight", models.FloatField(blank=True, null=True)),
+                ("previous_reps", models.FloatField(blank=True, null=True)),
+                ("achieved_on", models.DateField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "movement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="movements.movement",
+                    ),
+                ),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="personal_records",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "strength_set",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="personal_records",
+                        to="strength_records.strengthset",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["owner", "created_at"],
+                        name="pr_event_owner_created_idx",
+                    )
+                ],
+            },
+        ),
+    ]
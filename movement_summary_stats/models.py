@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 
 # Create your models here.
 class MovementSummary(models.Model):
@@ -18,7 +19,113 @@ class MovementSummary(models.Model):
     best_weight = models.FloatField(null=True, blank=True)
     best_reps = models.FloatField(null=True, blank=True)
     estimated_1rm = models.FloatField(null=True, blank=True)
+    # The set holding the record, so the PR detector knows when it is lowered
+    best_set = models.ForeignKey(
+        'strength_records.StrengthSet',
+        related_name='+',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
+
+    class Meta:
+        unique_together = ('owner', 'movement')
+
+
+class RecentMovementPerformance(models.Model):
+    """
+    Denormalised copy of a user's last few completed performances of a movement,
+    in the same shape as the workout detail `movement_history` entries.
+    """
+    owner = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='recent_performances',
+        on_delete=models.CASCADE,
+        db_index=True
+    )
+    movement = models.ForeignKey(
+        'movements.Movement',
+        on_delete=models.CASCADE,
+        db_index=True
+    )
+    performances = models.JSONField(default=list, encoder=DjangoJSONEncoder)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('owner', 'movement')
+
+
+class MovementRecalcJob(models.Model):
+    """
+    One scheduled summary recalculation per user. Created with the first pending
+    movement and deleted by the task that runs it, so edits that arrive in between
+    only add PendingMovementRecalc rows. The task holds this row locked while it
+    recalculates, which keeps two recalculations for one user from overlapping.
+    """
+    owner = models.OneToOneField(
+        'jwt_auth.User',
+        related_name='movement_recalc_job',
+        on_delete=models.CASCADE
+    )
+    run_after = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Movement summaries for {self.owner_id} after {self.run_after}"
 
 
+class PendingMovementRecalc(models.Model):
+    """A movement whose summary is waiting for the owner's MovementRecalcJob."""
+    owner = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='pending_movement_recalcs',
+        on_delete=models.CASCADE
+    )
+    movement = models.ForeignKey(
+        'movements.Movement',
+        on_delete=models.CASCADE
+    )
+    requested_at = models.DateTimeField(auto_now_add=True)
+
     class Meta:
         unique_together = ('owner', 'movement')
+
+
+class PersonalRecordEvent(models.Model):
+    """
+    A new best set for (owner, movement), appended by
+    `movement_summary_stats.records.detect_personal_records` as strength sets are
+    written. Rows are never rewritten, so the log doubles as the user's PR feed.
+    """
+    owner = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='personal_records',
+        on_delete=models.CASCADE
+    )
+    movement = models.ForeignKey(
+        'movements.Movement',
+        on_delete=models.CASCADE
+    )
+    strength_set = models.ForeignKey(
+        'strength_records.StrengthSet',
+        related_name='personal_records',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+    weight = models.FloatField()
+    reps = models.PositiveSmallIntegerField()
+    estimated_1rm = models.FloatField()
+    previous_weight = models.FloatField(null=True, blank=True)  # None for a first record
+    previous_reps = models.FloatField(null=True, blank=True)
+    achieved_on = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # The user's PR feed, newest first
+            models.Index(fields=['owner', 'created_at'], name='pr_event_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner_id} PR on {self.movement_id}: {self.weight} x {self.reps} ({self.achieved_on})"
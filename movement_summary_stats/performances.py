@@ -0,0 +1,92 @@
+from workout_section_movement.models import SectionMovement
+from saved_workouts.history import build_movement_history, HISTORY_LIMIT
+from .models import RecentMovementPerformance
+
+
+def completed_movement_ids(owner_id):
+    """All movement IDs the user has logged in a completed workout."""
+    return list(
+        SectionMovement.objects
+        .filter(
+            section__workout__owner_id=owner_id,
+            section__workout__status="Completed",
+            movements__isnull=False,
+        )
+        .values_list('movements_id', flat=True)
+        .distinct()
+    )
+
+
+def workout_movement_ids(workout_ids):
+    """Movement IDs used by the given workouts."""
+    return list(
+        SectionMovement.objects
+        .filter(section__workout_id__in=workout_ids, movements__isnull=False)
+        .values_list('movements_id', flat=True)
+        .distinct()
+    )
+
+
+def refresh_recent_performances(owner_id, movement_ids=None):
+    """
+    Rebuild the stored recent performances for (owner, movement) pairs.
+
+    Only the movements passed in are touched, so a completion or edit costs a
+    handful of queries regardless of how long the user's history is. Passing
+    `movement_ids=None` rebuilds every movement the user has completed.
+    """
+    if movement_ids is None:
+        movement_ids = completed_movement_ids(owner_id)
+    movement_ids = list(set(m for m in movement_ids if m is not None))
+    if not movement_ids:
+        return 0
+
+    history = build_movement_history(owner_id, movement_ids, limit=HISTORY_LIMIT)
+
+    rows = [
+        RecentMovementPerformance(owner_id=owner_id, movement_id=movement_id, performances=entries)
+        for movement_id, entries in history.items()
+    ]
+    if rows:
+        RecentMovementPerformance.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['owner', 'movement'],
+            update_fields=['performances', 'last_updated'],
+        )
+
+    # Movements with no completed performances left (e.g. the workout was deleted)
+    stale_ids = [m for m in movement_ids if m not in history]
+    if stale_ids:
+        RecentMovementPerformance.objects.filter(owner_id=owner_id, movement_id__in=stale_ids).delete()
+
+    return len(rows)
+
+
+def get_movement_history(owner_id, movement_ids):
+    """
+    Read `movement_history` for the workout detail screen from the stored rows.
+
+    Movements without a stored row (never completed, or not yet backfilled) fall
+    back to the batched history engine, so the result is always complete.
+    """
+    movement_ids = list(dict.fromkeys(m for m in movement_ids if m is not None))
+    if not movement_ids:
+        return {}
+
+    stored = dict(
+        RecentMovementPerformance.objects
+        .filter(owner_id=owner_id, movement_id__in=movement_ids)
+        .values_list('movement_id', 'performances')
+    )
+
+    missing = [m for m in movement_ids if m not in stored]
+    computed = build_movement_history(owner_id, missing) if missing else {}
+
+    movement_history = {}
+    for movement_id in movement_ids:
+        if movement_id in stored:
+            movement_history[movement_id] = stored[movement_id][:HISTORY_LIMIT]
+        elif movement_id in computed:
+            movement_history[movement_id] = computed[movement_id]
+    return movement_history
@@ -0,0 +1,97 @@
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncDay, TruncWeek
+
+from strength_records.models import StrengthSet
+from .tasks import estimated_1rm_expression
+
+BUCKETS = {'day': TruncDay, 'week': TruncWeek}
+SERIES = ('max_weight', 'best_e1rm', 'total_load', 'set_count')
+
+
+def progression_buckets(owner_id, movement_id, bucket='day', start=None, end=None):
+    """
+    A movement's strength sets rolled up per day or week (weeks start on Monday),
+    oldest first: one grouped query, however long the history.
+
+    Returns {'dates': [...], 'max_weight': [...], 'best_e1rm': [...],
+    'total_load': [...], 'set_count': [...]} as parallel lists.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+
+    sets = StrengthSet.objects.filter(owner_id=owner_id, movement_id=movement_id)
+    if start:
+        sets = sets.filter(performed_date__gte=start)
+    if end:
+        sets = sets.filter(performed_date__lte=end)
+
+    rows = (
+        sets
+        .annotate(period=BUCKETS[bucket]('performed_date'))
+        .values_list('period')
+        .annotate(
+            max_weight=Max('weight'),
+            best_e1rm=Max(estimated_1rm_expression()),
+            total_load=Sum('load'),
+            set_count=Count('id'),
+        )
+        .order_by('period')
+    )
+
+    series = {'dates': [], **{name: [] for name in SERIES}}
+    for period, max_weight, best_e1rm, total_load, set_count in rows:
+        series['dates'].append(period)
+        series['max_weight'].append(round(max_weight or 0, 1))
+        series['best_e1rm'].append(round(best_e1rm or 0, 1))
+        series['total_load'].append(round(total_load or 0, 1))
+        series['set_count'].append(set_count)
+    return series
+
+
+def lttb_indices(xs, ys, threshold):
+    """
+    Largest-Triangle-Three-Buckets: the indices of `threshold` points that keep the
+    visual shape of (xs, ys). The first and last points are always kept; every
+    bucket in between keeps the point making the largest triangle with the point
+    kept before it and the average of the next bucket.
+    """
+    count = len(xs)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+
+    indices = [0]
+    every = (count - 2) / (threshold - 2)
+    previous = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket (the last point for the final bucket)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        avg_x = sum(xs[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        # The point in this bucket with the largest triangle
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs(
+                (xs[previous] - avg_x) * (ys[j] - ys[previous])
+                - (xs[previous] - xs[j]) * (avg_y - ys[previous])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        previous = best
+
+    indices.append(count - 1)
+    return indices
+
+
+def downsample(series, points):
+    """Keep at most `points` buckets of `series`, chosen by LTTB over the best e1RM line."""
+    dates = series['dates']
+    if len(dates) <= points:
+        return series
+    keep = lttb_indices([d.toordinal() for d in dates], series['best_e1rm'], points)
+    return {name: [values[i] for i in keep] for name, values in series.items()}
@@ -0,0 +1,163 @@
+from collections import defaultdict
+
+from django.db import connection
+
+from .models import MovementSummary, PersonalRecordEvent
+from .tasks import schedule_movement_recalc
+
+
+def estimated_1rm(weight, reps):
+    """Epley: weight * (1 + reps / 30), as `best_sets` computes it in SQL."""
+    return (weight or 0.0) * (1 + (reps or 0) / 30.0)
+
+
+def record_rank(weight, reps):
+    """How sets compare for a record: heavier wins, then more reps."""
+    return (weight or 0.0, reps or 0)
+
+
+def detect_personal_records(created=(), updated=(), deleted=()):
+    """
+    Fold StrengthSet rows that were just written into their MovementSummary rows.
+
+    The current bests of every (owner, movement) touched are loaded in one query and
+    each set is compared against its best in constant time. A set that beats it
+    becomes the new best in place, and each (owner, movement) that got a new best
+    appends one PersonalRecordEvent. Bests are stored with a conditional upsert, so
+    a higher best stored meanwhile by a concurrent save is never overwritten, and
+    no event is written for a best that didn't land.
+
+    Only when the set holding a record is lowered or deleted, and no set in the
+    batch beats that record, is the movement recalculated in full through the
+    owner's debounced job: a comparison can't tell which of the other sets now
+    holds it.
+
+    Returns the PersonalRecordEvents written.
+    """
+    written = [s for s in (*created, *updated) if s.owner_id and s.movement_id]
+    deleted = [s for s in deleted if s.owner_id and s.movement_id]
+    if not written and not deleted:
+        return []
+    updated_ids = {s.pk for s in updated}
+
+    # 1) Current bests, one query
+    summaries = {
+        (summary.owner_id, summary.movement_id): summary
+        for summary in MovementSummary.objects.filter(
+            owner_id__in={s.owner_id for s in written + deleted},
+            movement_id__in={s.movement_id for s in written + deleted},
+        )
+    }
+
+    # 2) Records that may have been lowered need a full recalculation
+    to_recalc = set()
+    for strength_set in deleted:
+        key = (strength_set.owner_id, strength_set.movement_id)
+        summary = summaries.get(key)
+        if summary and summary.best_set_id in (strength_set.pk, None):
+            to_recalc.add(key)
+    for strength_set in written:
+        key = (strength_set.owner_id, strength_set.movement_id)
+        summary = summaries.get(key)
+        # Summaries from before `best_set` was tracked could be held by any set
+        may_hold_record = summary and summary.best_set_id in (strength_set.pk, None)
+        if (
+            may_hold_record
+            and strength_set.pk in updated_ids
+            and record_rank(strength_set.weight, strength_set.reps)
+            < record_rank(summary.best_weight, summary.best_reps)
+        ):
+            to_recalc.add(key)
+
+    # 3) New bests, compared in O(1) per set. The stored best is the highest any set
+    # reached before this batch, so a set beating it is the new best even where the
+    # old record set was lowered or deleted.
+    changed = {}
+    records = {}  # key -> (record set, previous best)
+    for strength_set in written:
+        key = (strength_set.owner_id, strength_set.movement_id)
+        summary = summaries.get(key)
+        if summary is not None and (
+            record_rank(strength_set.weight, strength_set.reps)
+            <= record_rank(summary.best_weight, summary.best_reps)
+        ):
+            continue
+
+        if summary is None:
+            previous = (None, None)
+            summary = summaries[key] = MovementSummary(owner_id=key[0], movement_id=key[1])
+        else:
+            previous = (summary.best_weight, summary.best_reps)
+        summary.best_set_id = strength_set.pk
+        summary.best_weight = strength_set.weight or 0.0
+        summary.best_reps = strength_set.reps or 0
+        summary.estimated_1rm = estimated_1rm(strength_set.weight, strength_set.reps)
+        changed[key] = summary
+
+        # One event per movement per write, for the best set, against the best before it
+        if strength_set.weight:
+            records[key] = (strength_set, records[key][1] if key in records else previous)
+
+    # 4) Write the bests that still beat the stored ones, their events, and the recalculations
+    stored = upsert_bests(changed.values())
+    to_recalc -= stored
+    records = {key: record for key, record in records.items() if key in stored}
+
+    events = PersonalRecordEvent.objects.bulk_create([
+        PersonalRecordEvent(
+            owner_id=strength_set.owner_id,
+            movement_id=strength_set.movement_id,
+            strength_set_id=strength_set.pk,
+            weight=strength_set.weight,
+            reps=strength_set.reps or 0,
+            estimated_1rm=estimated_1rm(strength_set.weight, strength_set.reps),
+            previous_weight=previous_weight,
+            previous_reps=previous_reps,
+            achieved_on=strength_set.performed_date,
+        )
+        for strength_set, (previous_weight, previous_reps) in records.values()
+    ])
+
+    recalc_by_owner = defaultdict(list)
+    for owner_id, movement_id in to_recalc:
+        recalc_by_owner[owner_id].append(movement_id)
+    for owner_id, movement_ids in sorted(recalc_by_owner.items()):
+        schedule_movement_recalc(owner_id, movement_ids)
+
+    return events
+
+
+def upsert_bests(summaries):
+    """
+    Insert or raise MovementSummary bests in one statement. An existing row is only
+    updated when the incoming (best_weight, best_reps) beats the stored one, so a
+    concurrent save that compared against the same old best can't lower it.
+
+    Returns the {(owner_id, movement_id)} rows actually written.
+    """
+    summaries = list(summaries)
+    if not summaries:
+        return set()
+
+    quote = connection.ops.quote_name
+    table = quote(MovementSummary._meta.db_table)
+    fields = ('owner_id', 'movement_id', 'best_set_id', 'best_weight', 'best_reps', 'estimated_1rm')
+    columns = ', '.join(quote(column) for column in fields)
+    updates = ', '.join(f"{quote(column)} = EXCLUDED.{quote(column)}" for column in fields[2:])
+    weight, reps = quote('best_weight'), quote('best_reps')
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(summaries))
+
+    params = []
+    for summary in summaries:
+        params.extend(getattr(summary, field) for field in fields)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+            f"ON CONFLICT ({quote('owner_id')}, {quote('movement_id')}) DO UPDATE SET {updates} "
+            f"WHERE (EXCLUDED.{weight}, EXCLUDED.{reps}) "
+            f"> (COALESCE({table}.{weight}, 0), COALESCE({table}.{reps}, 0)) "
+            f"RETURNING {quote('owner_id')}, {quote('movement_id')}",
+            params,
+        )
+        return {tuple(row) for row in cursor.fetchall()}
@@ -1,6 +1,6 @@
 # movement_summary_stats/serializers.py
 from rest_framework import serializers
-from ..models import MovementSummary
+from ..models import MovementSummary, PersonalRecordEvent
 from movements.serializers.common import MovementSerializer
 
 class MovementSummarySerializer(serializers.ModelSerializer):
@@ -9,3 +9,14 @@ class MovementSummarySerializer(serializers.ModelSerializer):
     class Meta:
         model = MovementSummary
         fields = '__all__'
+
+
+class PersonalRecordEventSerializer(serializers.ModelSerializer):
+    exercise = serializers.CharField(source='movement.exercise', read_only=True)
+
+    class Meta:
+        model = PersonalRecordEvent
+        fields = [
+            'id', 'movement', 'exercise', 'strength_set', 'weight', 'reps', 'estimated_1rm',
+            'previous_weight', 'previous_reps', 'achieved_on', 'created_at',
+        ]
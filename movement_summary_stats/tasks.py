@@ -1,61 +1,164 @@
 # tasks.py
+from datetime import timedelta
+
 from celery import shared_task
-from django.db.models import Max
+from django.db import transaction
+from django.db.models import F, FloatField, Value, Window
+from django.db.models.functions import Cast, RowNumber
+from django.utils.timezone import now
 from strength_records.models import StrengthSet
-from .models import MovementSummary 
+from .models import MovementSummary, MovementRecalcJob, PendingMovementRecalc
 import logging
 logger = logging.getLogger(__name__)
 
+# Edits within this long of the first one are folded into a single recalculation
+RECALC_DEBOUNCE_SECONDS = 10
+# Jobs this far past due are assumed to have lost their task (e.g. the broker was down)
+RECALC_JOB_GRACE = timedelta(minutes=2)
 
-@shared_task
-def recalc_movement_summaries(user_id, movement_id=None):
 
-    # 1) Build a queryset of StrengthSet objects for this user.
-    qs = StrengthSet.objects.filter(owner_id=user_id)
+def estimated_1rm_expression():
+    """Epley estimated 1RM of a StrengthSet row: weight * (1 + reps / 30)."""
+    return F('weight') * (Value(1.0) + Cast('reps', FloatField()) / Value(30.0))
 
-    if movement_id:
-        qs = qs.filter(movement_id=movement_id)
-
-    # 2) Gather all distinct Movement IDs for which this user has sets
-    movement_ids = qs.values_list('movement_id', flat=True).distinct()
-    logger.info(f"Recalc Summaries for user {user_id}, movement_ids: {movement_ids}")
-
-    # 3) For each movement, find the set with the highest weight
-    for m_id in movement_ids:
-        # Sub-query for that movement
-        set_qs = qs.filter(movement_id=m_id)
-
-        if not set_qs.exists():
-            # If no sets remain for that movement, remove the summary if desired
-            MovementSummary.objects.filter(owner_id=user_id, movement_id=m_id).delete()
-            continue
-
-        # The single set with the highest "weight"
-        best_set = set_qs.order_by('-weight').first()  # highest weight at top
-        logger.info(
-            f"[recalc_movement_summaries] user={user_id}, movement_id={m_id}, "
-            f"best_set.id={best_set.id if best_set else None}, "
-            f"weight={best_set.weight}, reps={best_set.reps}, "
-            f"workout_id={best_set.workout_id}, date={best_set.performed_date}"
+
+def best_sets(sets):
+    """
+    The heaviest set of each movement in `sets` (ties go to more reps, then the
+    earliest set, which set the record), with its Epley estimated 1RM:
+    weight * (1 + reps / 30).
+
+    One windowed query, returning (movement_id, id, weight, reps, estimated_1rm) rows.
+    """
+    return (
+        sets
+        .annotate(
+            weight_order=Window(
+                RowNumber(),
+                partition_by=[F('movement_id')],
+                order_by=[F('weight').desc(), F('reps').desc(), F('id').asc()],
+            ),
+            one_rep_max=estimated_1rm_expression(),
         )
-        
-        best_weight = best_set.weight or 0.0
-        best_reps = best_set.reps or 0
-        # Epley formula for 1RM: weight * (1 + reps/30)
-        estimated_1rm = best_weight * (1 + (best_reps / 30.0))
-
-        # Upsert into MovementSummary
-        summary, _ = MovementSummary.objects.get_or_create(
+        .filter(weight_order=1)
+        .values_list('movement_id', 'id', 'weight', 'reps', 'one_rep_max')
+    )
+
+
+@shared_task
+def recalc_movement_summaries(user_id, movement_id=None, movement_ids=None):
+    """
+    Rebuild the user's MovementSummary rows from their strength sets: one query for
+    every movement's best set and 1RM, one upsert to store them, and one delete for
+    summaries whose movement has no sets left.
+
+    Pass `movement_ids` (or `movement_id`) to recompute only the movements that
+    changed; with neither, every movement the user has logged is recomputed.
+    """
+    # 1) Scope to the movements that were touched
+    sets = StrengthSet.objects.filter(owner_id=user_id)
+    summaries = MovementSummary.objects.filter(owner_id=user_id)
+    if movement_id:
+        sets = sets.filter(movement_id=movement_id)
+        summaries = summaries.filter(movement_id=movement_id)
+    if movement_ids is not None:
+        sets = sets.filter(movement_id__in=movement_ids)
+        summaries = summaries.filter(movement_id__in=movement_ids)
+
+    # 2) Best set and estimated 1RM per movement
+    rows = [
+        MovementSummary(
             owner_id=user_id,
             movement_id=m_id,
-            defaults={
-                'best_weight': best_weight,
-                'best_reps': best_reps,
-                'estimated_1rm': estimated_1rm
-            }
+            best_set_id=set_id,
+            best_weight=weight or 0.0,
+            best_reps=reps or 0,
+            estimated_1rm=one_rep_max or 0.0,
+        )
+        for m_id, set_id, weight, reps, one_rep_max in best_sets(sets)
+    ]
+
+    # 3) Upsert them, and drop summaries of movements with no sets left
+    if rows:
+        MovementSummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['owner', 'movement'],
+            update_fields=['best_set', 'best_weight', 'best_reps', 'estimated_1rm'],
         )
-        # If already existed, update fields
-        summary.best_weight = best_weight
-        summary.best_reps = best_reps
-        summary.estimated_1rm = estimated_1rm
-        summary.save()
+    removed, _ = summaries.exclude(movement_id__in=[row.movement_id for row in rows]).delete()
+
+    logger.debug(f"Recalculated {len(rows)} movement summaries for user {user_id}, removed {removed}")
+    return len(rows)
+
+
+def schedule_movement_recalc(owner_id, movement_ids):
+    """
+    Queue a summary recalculation of these movements for the owner, in the caller's
+    transaction. The first call creates the owner's job and schedules one delayed
+    task once the transaction commits; later calls, until that task runs, only add
+    their movements to it.
+    """
+    movement_ids = sorted(set(m for m in movement_ids if m))
+    if not owner_id or not movement_ids:
+        return
+
+    with transaction.atomic():
+        # 1) Lock (or create) the owner's job first, so a running recalculation can't miss these rows
+        _, created = MovementRecalcJob.objects.select_for_update().get_or_create(
+            owner_id=owner_id,
+            defaults={'run_after': now() + timedelta(seconds=RECALC_DEBOUNCE_SECONDS)}
+        )
+
+        # 2) Merge the movements into the pending set
+        PendingMovementRecalc.objects.bulk_create(
+            [PendingMovementRecalc(owner_id=owner_id, movement_id=m_id) for m_id in movement_ids],
+            ignore_conflicts=True,
+        )
+
+    if created:
+        transaction.on_commit(
+            lambda: recalc_pending_movement_summaries.apply_async(
+                (owner_id,), countdown=RECALC_DEBOUNCE_SECONDS
+            ),
+            robust=True
+        )
+
+
+@shared_task
+def recalc_pending_movement_summaries(owner_id):
+    """
+    Run the owner's job: recalculate every pending movement in one pass and clear
+    the job. The job row stays locked throughout, so new edits wait for it and
+    then schedule a fresh job.
+    """
+    with transaction.atomic():
+        job = MovementRecalcJob.objects.select_for_update().filter(owner_id=owner_id).first()
+        if job is None:
+            return 0  # Already run (by the sweep, or a duplicate delivery)
+
+        pending = PendingMovementRecalc.objects.filter(owner_id=owner_id)
+        movement_ids = list(pending.values_list('movement_id', flat=True))
+        if movement_ids:
+            recalc_movement_summaries(owner_id, movement_ids=movement_ids)
+
+        pending.delete()
+        job.delete()
+
+    return len(movement_ids)
+
+
+@shared_task
+def run_overdue_movement_recalcs():
+    """Run jobs whose delayed task never arrived."""
+    overdue = (
+        MovementRecalcJob.objects
+        .filter(run_after__lt=now() - RECALC_JOB_GRACE)
+        .values_list('owner_id', flat=True)
+    )
+    owner_ids = list(overdue)
+    for owner_id in owner_ids:
+        recalc_pending_movement_summaries(owner_id)
+    if owner_ids:
+        logger.warning(f"Ran {len(owner_ids)} overdue movement summary jobs")
+    return len(owner_ids)
@@ -1,3 +1,198 @@
-from django.test import TestCase
+import math
+from datetime import date, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+
+from movements.models import Movement
+from strength_records.models import StrengthSet
+from workout_section_sets.reconciliation import strength_set_reconciler
+from movement_summary_stats.models import (
+    MovementRecalcJob,
+    MovementSummary,
+    PendingMovementRecalc,
+    PersonalRecordEvent,
+)
+from movement_summary_stats.records import upsert_bests
+from movement_summary_stats.progression import SERIES, downsample, lttb_indices
+from movement_summary_stats.tasks import recalc_pending_movement_summaries, schedule_movement_recalc
+
+User = get_user_model()
+
+
+
+class MovementRecalcJobTest(TestCase):
+    """Edits for one owner are coalesced into one job that recalculates only what is pending."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='coalesce@example.com', username='coalesce', first_name='Coalesce')
+        cls.squat = Movement.objects.create(exercise='Squat', primary_body_part='Legs')
+        cls.bench = Movement.objects.create(exercise='Bench', primary_body_part='Chest')
+        cls.row = Movement.objects.create(exercise='Row', primary_body_part='Back')
+
+    def pending(self):
+        return set(PendingMovementRecalc.objects.filter(owner=self.user).values_list('movement_id', flat=True))
+
+    @mock.patch('movement_summary_stats.tasks.recalc_pending_movement_summaries.apply_async')
+    def test_schedules_are_coalesced_into_one_job(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            schedule_movement_recalc(self.user.id, [self.squat.id, self.bench.id])
+            schedule_movement_recalc(self.user.id, [self.bench.id, self.row.id])
+
+        self.assertEqual(MovementRecalcJob.objects.filter(owner=self.user).count(), 1)
+        self.assertEqual(len(callbacks), 1)
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.args[0], (self.user.id,))
+        self.assertEqual(self.pending(), {self.squat.id, self.bench.id, self.row.id})
+
+    @mock.patch('movement_summary_stats.tasks.recalc_pending_movement_summaries.apply_async')
+    def test_running_the_job_recalculates_only_pending_movements(self, apply_async):
+        for movement, weight in ((self.squat, 140.0), (self.bench, 100.0)):
+            StrengthSet.objects.create(owner=self.user, movement=movement, set_number=1, reps=3, weight=weight)
+            MovementSummary.objects.create(owner=self.user, movement=movement, best_weight=1.0, best_reps=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_movement_recalc(self.user.id, [self.squat.id])
+
+        self.assertEqual(recalc_pending_movement_summaries(self.user.id), 1)
+
+        self.assertFalse(MovementRecalcJob.objects.filter(owner=self.user).exists())
+        self.assertEqual(self.pending(), set())
+        bests = dict(MovementSummary.objects.filter(owner=self.user).values_list('movement_id', 'best_weight'))
+        self.assertEqual(bests, {self.squat.id: 140.0, self.bench.id: 1.0})
+        self.assertEqual(recalc_pending_movement_summaries(self.user.id), 0)
+
+
+class PersonalRecordDetectionTest(TestCase):
+    """Strength sets written through the reconciler keep MovementSummary and the PR feed current."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='lifter@example.com', username='lifter', first_name='Lifter')
+        cls.squat = Movement.objects.create(exercise='Squat', primary_body_part='Legs')
+
+    def save_sets(self, sets, delete_stale=False):
+        """Reconcile the user's squat sets against {set_number: (weight, reps)}."""
+        reconciler = strength_set_reconciler(StrengthSet.objects.filter(owner=self.user, movement=self.squat))
+        for set_number, (weight, reps) in sets.items():
+            reconciler.stage(
+                (self.squat.id, set_number),
+                {'reps': reps, 'weight': weight, 'rpe': 0, 'load': weight * reps},
+                owner=self.user, performed_date=date.today(),
+            )
+        reconciler.save(delete_stale=delete_stale)
+
+    def summary(self):
+        return MovementSummary.objects.get(owner=self.user, movement=self.squat)
+
+    def setUp(self):
+        self.save_sets({1: (100.0, 5), 2: (80.0, 5)})
+        self.record = StrengthSet.objects.get(owner=self.user, movement=self.squat, set_number=1)
+
+    def test_new_best_updates_the_summary_and_writes_an_event(self):
+        self.save_sets({1: (100.0, 5), 2: (80.0, 5), 3: (110.0, 3)})
+
+        summary = self.summary()
+        self.assertEqual((summary.best_weight, summary.best_reps), (110.0, 3))
+        event = PersonalRecordEvent.objects.filter(owner=self.user).latest('id')
+        self.assertEqual((event.weight, event.previous_weight, event.previous_reps), (110.0, 100.0, 5))
+
+    @mock.patch('movement_summary_stats.records.schedule_movement_recalc')
+    def test_deleting_the_record_set_queues_a_recalculation(self, schedule):
+        self.save_sets({2: (80.0, 5)}, delete_stale=True)
+
+        self.assertFalse(StrengthSet.objects.filter(pk=self.record.pk).exists())
+        schedule.assert_called_once_with(self.user.id, [self.squat.id])
+
+    @mock.patch('movement_summary_stats.records.schedule_movement_recalc')
+    def test_lowering_the_record_set_queues_a_recalculation(self, schedule):
+        self.save_sets({1: (90.0, 5), 2: (80.0, 5)})
+
+        schedule.assert_called_once_with(self.user.id, [self.squat.id])
+        self.assertEqual(self.summary().best_weight, 100.0)
+
+    @mock.patch('movement_summary_stats.records.schedule_movement_recalc')
+    def test_new_best_in_the_batch_that_lowers_the_record_is_still_a_record(self, schedule):
+        events_before = PersonalRecordEvent.objects.count()
+
+        self.save_sets({1: (90.0, 5), 2: (120.0, 2)})
+
+        schedule.assert_not_called()
+        summary = self.summary()
+        self.assertEqual((summary.best_weight, summary.best_reps), (120.0, 2))
+        self.assertEqual(PersonalRecordEvent.objects.count(), events_before + 1)
+        event = PersonalRecordEvent.objects.latest('id')
+        self.assertEqual((event.weight, event.previous_weight), (120.0, 100.0))
+
+    def test_upsert_never_lowers_a_stored_best(self):
+        lower = MovementSummary(
+            owner_id=self.user.id, movement_id=self.squat.id, best_set_id=None,
+            best_weight=90.0, best_reps=8, estimated_1rm=114.0,
+        )
+
+        self.assertEqual(upsert_bests([lower]), set())
+        summary = self.summary()
+        self.assertEqual((summary.best_weight, summary.best_reps, summary.best_set_id), (100.0, 5, self.record.pk))
+
+    def test_concurrent_higher_best_is_kept_and_gets_no_event(self):
+        events_before = PersonalRecordEvent.objects.count()
+
+        def save_concurrently(summaries):
+            # Another save stores 120 kg after this one read the 100 kg best
+            MovementSummary.objects.filter(owner=self.user, movement=self.squat).update(best_weight=120.0, best_reps=1)
+            return upsert_bests(summaries)
+
+        with mock.patch('movement_summary_stats.records.upsert_bests', side_effect=save_concurrently):
+            self.save_sets({1: (100.0, 5), 2: (80.0, 5), 3: (110.0, 3)})
+
+        summary = self.summary()
+        self.assertEqual((summary.best_weight, summary.best_reps), (120.0, 1))
+        self.assertEqual(PersonalRecordEvent.objects.count(), events_before)
+
+
+class LttbDownsampleTest(SimpleTestCase):
+    """Bucket boundaries of `lttb_indices` and the alignment of `downsample`."""
+
+    def points(self, count):
+        xs = list(range(count))
+        return xs, [math.sin(x / 3) * 50 + x for x in xs]
+
+    def test_threshold_at_or_above_count_keeps_every_point(self):
+        xs, ys = self.points(10)
+        for threshold in (10, 11, 50):
+            with self.subTest(threshold=threshold):
+                self.assertEqual(lttb_indices(xs, ys, threshold), list(range(10)))
+
+    def test_keeps_exactly_threshold_increasing_indices_with_both_ends(self):
+        for count in (4, 10, 101, 1000):
+            for threshold in (3, 4, 7, count - 1):
+                if threshold >= count:
+                    continue
+                with self.subTest(count=count, threshold=threshold):
+                    xs, ys = self.points(count)
+                    indices = lttb_indices(xs, ys, threshold)
+
+                    self.assertEqual(len(indices), threshold)
+                    self.assertEqual((indices[0], indices[-1]), (0, count - 1))
+                    self.assertTrue(all(a < b for a, b in zip(indices, indices[1:])), indices)
+
+    def test_downsample_keeps_every_series_aligned_with_dates(self):
+        first = date(2026, 1, 1)
+        series = {'dates': [first + timedelta(days=i) for i in range(200)]}
+        for offset, name in enumerate(SERIES):
+            series[name] = [i * 10 + offset for i in range(200)]
+        series['best_e1rm'] = [math.sin(i / 5) * 40 + 100 for i in range(200)]
+
+        sampled = downsample(series, 30)
+
+        self.assertEqual(len(sampled['dates']), 30)
+        for name in SERIES:
+            with self.subTest(series=name):
+                self.assertEqual(len(sampled[name]), 30)
+                for day, value in zip(sampled['dates'], sampled[name]):
+                    self.assertEqual(value, series[name][(day - first).days])
+
+    def test_downsample_leaves_short_series_alone(self):
+        series = {'dates': [date(2026, 1, 1)], **{name: [1] for name in SERIES}}
+        self.assertIs(downsample(series, 30), series)
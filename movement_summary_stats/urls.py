@@ -1,6 +1,9 @@
 from django.urls import path
-from .views import MovementStatsAPIView
+from .views import MovementStatsAPIView, PersonalRecordFeedView, MovementProgressionView, StrengthSetHistoryView
 
 urlpatterns = [
     path('', MovementStatsAPIView.as_view(), name='movement-stats'),
+    path('records/', PersonalRecordFeedView.as_view(), name='personal-records'),
+    path('progression/', MovementProgressionView.as_view(), name='movement-progression'),
+    path('sets/', StrengthSetHistoryView.as_view(), name='strength-set-history'),
 ]
\ No newline at end of file
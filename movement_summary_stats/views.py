@@ -1,13 +1,16 @@
+from datetime import date
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
 
-from movement_summary_stats.models import MovementSummary
+from movement_summary_stats.models import MovementSummary, PersonalRecordEvent
+from fitnessappbuild.pagination import KeysetPagination
 from django.contrib.auth import get_user_model
 User = get_user_model()
 from movements.models import Movement
 
-from .serializers.common import MovementSummarySerializer
+from .serializers.common import MovementSummarySerializer, PersonalRecordEventSerializer
+from .progression import progression_buckets, downsample
 from strength_records.models import StrengthSet
 from strength_records.serializers.common import StrengthSetSerializer
 
@@ -23,6 +26,8 @@ class MovementStatsAPIView(APIView):
             return Response({"error": "User not found"}, status=404)
 
         # fetch summaries + sets
+        # `strength_sets` is the full history, kept for the MovementStats screen that still reads it;
+        # new clients should page it from StrengthSetHistoryView instead
         summaries_qs = MovementSummary.objects.filter(owner=user).select_related('movement')
         sets_qs = StrengthSet.objects.filter(owner=user).select_related('movement', 'workout')
 
@@ -34,3 +39,111 @@ class MovementStatsAPIView(APIView):
             "summaries": summaries_data,
             "strength_sets": sets_data
         }, status=200)
+
+
+class PersonalRecordFeedView(APIView):
+    """
+    A user's personal records, newest first, paged by (created_at, id) with
+    `page_size` and `cursor`. Pass `movement_id` for one movement's record history.
+    """
+    pagination = KeysetPagination('created_at', descending=True, page_size=20)
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({"error": "user_id is required"}, status=400)
+
+        records = PersonalRecordEvent.objects.filter(owner_id=user_id).select_related('movement')
+        movement_id = request.query_params.get('movement_id')
+        if movement_id:
+            records = records.filter(movement_id=movement_id)
+
+        page, next_cursor = self.pagination.paginate_queryset(records, request)
+        data = PersonalRecordEventSerializer(page, many=True).data
+        return self.pagination.get_paginated_response(data, next_cursor)
+
+
+class MovementProgressionView(APIView):
+    """
+    One movement's strength progression for charts: per-day or per-week buckets
+    (`bucket=day|week`) of max weight, best estimated 1RM, total load and set count,
+    optionally limited to `start`/`end` (YYYY-MM-DD).
+
+    Series are returned as parallel arrays and downsampled with LTTB to at most
+    `points` buckets (default 120), so the payload stays small whatever the history.
+    """
+    default_points = 120
+    max_points = 500
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        movement_id = request.query_params.get('movement_id')
+        if not user_id or not movement_id:
+            return Response({"error": "user_id and movement_id are required"}, status=400)
+
+        try:
+            bucket = request.query_params.get('bucket', 'day')
+            points = max(3, min(int(request.query_params.get('points', self.default_points)), self.max_points))
+            start = request.query_params.get('start')
+            end = request.query_params.get('end')
+            start = date.fromisoformat(start) if start else None
+            end = date.fromisoformat(end) if end else None
+            series = progression_buckets(user_id, movement_id, bucket, start, end)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        buckets = len(series['dates'])
+        series = downsample(series, points)
+        return Response({
+            "movement_id": int(movement_id),
+            "bucket": bucket,
+            "buckets": buckets,
+            "downsampled": len(series['dates']) < buckets,
+            **series,
+        }, status=200)
+
+
+class StrengthSetHistoryView(APIView):
+    """
+    A user's raw strength sets, newest first, paged by (performed_date, id) with
+    `page_size` and `cursor`, read from `strengthset_owner_history_idx`; pass
+    `movement_id` for one movement's history, which is read from the covering
+    `strengthset_history_idx`.
+
+    Rows are flat (`movement` and `workout` are ids) and each movement's details are sent once
+    in `movements`, keyed by id.
+    """
+    pagination = KeysetPagination('performed_date', descending=True)
+    set_fields = ('id', 'movement_id', 'workout_id', 'performed_date', 'set_number', 'reps', 'weight', 'rpe', 'load')
+    movement_fields = ('id', 'exercise', 'body_area', 'primary_body_part', 'landscape_thumbnail')
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({"error": "user_id is required"}, status=400)
+
+        sets = StrengthSet.objects.filter(owner_id=user_id)
+        movement_id = request.query_params.get('movement_id')
+        if movement_id:
+            sets = sets.filter(movement_id=movement_id)
+
+        # 1) One page of flat rows
+        rows, next_cursor = self.pagination.paginate_queryset(sets.values(*self.set_fields), request)
+        results = [
+            {field.removesuffix('_id'): row[field] for field in self.set_fields}
+            for row in rows
+        ]
+
+        # 2) The page's movements, once each
+        movements = {
+            movement['id']: movement
+            for movement in Movement.objects
+            .filter(id__in={row['movement_id'] for row in rows})
+            .values(*self.movement_fields)
+        }
+
+        return Response({
+            "results": results,
+            "movements": movements,
+            "next_cursor": next_cursor,
+        }, status=200)
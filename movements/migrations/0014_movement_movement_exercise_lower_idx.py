@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:03
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movements", "0013_movement_equipment_check"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="movement",
+            index=models.Index(
+                django.db.models.functions.text.Lower("exercise"),
+                name="movement_exercise_lower_idx",
+            ),
+        ),
+    ]
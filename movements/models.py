@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 
 # Create your models here.
 class Movement(models.Model):
@@ -16,3 +17,9 @@ class Movement(models.Model):
     landscape_video_url = models.CharField(max_length=250, null=True, blank=True)
     portrait_video_url = models.CharField(max_length=250, null=True, blank=True)
     landscape_thumbnail = models.CharField(max_length=250, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves case-insensitive name lookups (see movements.resolver)
+            models.Index(Lower('exercise'), name='movement_exercise_lower_idx'),
+        ]
@@ -0,0 +1,111 @@
+import threading
+import time
+
+from django.db.models.functions import Lower
+
+from .models import Movement
+
+# How long a process trusts its cached catalogue. Saves made in this process
+# invalidate it straight away through signals; the TTL bounds how stale it can
+# get when the catalogue is edited by another worker.
+CATALOGUE_TTL_SECONDS = 300
+
+_lock = threading.Lock()
+_catalogue_cache = {'names': None, 'ids': None, 'expires_at': 0.0, 'generation': 0}
+
+
+def normalise_name(name):
+    """The key movement names are matched on: trimmed and lower-cased."""
+    return (name or '').strip().lower()
+
+
+def invalidate_catalogue(**kwargs):
+    """Drop the cached catalogue. Connected to Movement post_save/post_delete."""
+    with _lock:
+        _catalogue_cache['names'] = None
+        _catalogue_cache['ids'] = None
+        _catalogue_cache['expires_at'] = 0.0
+        # Loads that started before this are stale: see `_catalogue`
+        _catalogue_cache['generation'] += 1
+
+
+def _catalogue():
+    """Return ({lower(exercise): id}, {id}) for the whole catalogue, loading it if needed."""
+    with _lock:
+        if _catalogue_cache['names'] is not None and time.monotonic() < _catalogue_cache['expires_at']:
+            return _catalogue_cache['names'], _catalogue_cache['ids']
+        generation = _catalogue_cache['generation']
+
+    names = {}
+    ids = set()
+    for movement_id, exercise in Movement.objects.order_by('id').values_list('id', 'exercise'):
+        ids.add(movement_id)
+        if exercise:
+            # Duplicate names resolve to the oldest movement
+            names.setdefault(exercise.lower(), movement_id)
+
+    with _lock:
+        # Only cache the load if no save invalidated the catalogue while it ran;
+        # otherwise it may predate that save, so use it for this call only
+        if _catalogue_cache['generation'] == generation:
+            _catalogue_cache['names'] = names
+            _catalogue_cache['ids'] = ids
+            _catalogue_cache['expires_at'] = time.monotonic() + CATALOGUE_TTL_SECONDS
+    return names, ids
+
+
+def resolve_movement_names(names):
+    """
+    Resolve a batch of movement names case-insensitively.
+
+    Returns {normalised name: movement id} for every name that exists; look results
+    up with `normalise_name()`. Names are served from the in-process catalogue, and
+    any misses (e.g. movements added by another worker) are re-checked in a single
+    query against the lower(exercise) index.
+    """
+    wanted = {normalise_name(name) for name in names}
+    wanted.discard('')
+    if not wanted:
+        return {}
+
+    catalogue_names, _ = _catalogue()
+    resolved = {name: catalogue_names[name] for name in wanted if name in catalogue_names}
+
+    missing = wanted - resolved.keys()
+    if missing:
+        rows = (
+            Movement.objects
+            .annotate(exercise_lower=Lower('exercise'))
+            .filter(exercise_lower__in=missing)
+            .order_by('id')
+            .values_list('exercise_lower', 'id')
+        )
+        for name, movement_id in rows:
+            resolved.setdefault(name, movement_id)
+
+    return resolved
+
+
+def resolve_movement_ids(movement_ids):
+    """
+    Return the subset of `movement_ids` that exist in the catalogue, checking any
+    not in the in-process catalogue with a single query.
+    """
+    wanted = set()
+    for movement_id in movement_ids:
+        try:
+            wanted.add(int(movement_id))
+        except (TypeError, ValueError):
+            continue
+    if not wanted:
+        return set()
+
+    _, catalogue_ids = _catalogue()
+    resolved = wanted & catalogue_ids
+
+    missing = wanted - resolved
+    if missing:
+        resolved.update(Movement.objects.filter(id__in=missing).values_list('id', flat=True))
+
+    return resolved
+
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Movement
+from .resolver import invalidate_catalogue
+
+
+@receiver(post_save, sender=Movement)
+@receiver(post_delete, sender=Movement)
+def movement_catalogue_changed(sender, **kwargs):
+    invalidate_catalogue()
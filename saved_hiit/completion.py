@@ -0,0 +1,26 @@
+from saved_workouts.completion import CompletionEngine
+from .models import SavedHIITWorkout
+
+
+class HiitCompletion(CompletionEngine):
+    """Saves the session's RPE and comments; awards +20 when both are filled in."""
+
+    activity_type = "Hiit"
+
+    def load(self):
+        self.hiit_session = SavedHIITWorkout.objects.get(workout=self.workout)
+
+    def apply(self):
+        new_rpe = self.data.get("rpe")
+        new_comments = self.data.get("comments")
+
+        hiit_session = self.hiit_session
+        hiit_session.rpe = new_rpe if new_rpe is not None else hiit_session.rpe
+        hiit_session.comments = new_comments if new_comments is not None else hiit_session.comments
+        hiit_session.save()
+
+        # "Fully logged" means rpe > 0 and comments not empty
+        rpe_is_filled = hiit_session.rpe and hiit_session.rpe > 0
+        comments_are_filled = hiit_session.comments and hiit_session.comments.strip() != ""
+        if rpe_is_filled and comments_are_filled:
+            self.award("Full HIIT Logging", 20)
@@ -0,0 +1,17 @@
+from saved_workouts.completion import CompletionEngine
+from .models import SavedMobilitySession
+
+
+class MobilityCompletion(CompletionEngine):
+    """Saves the session's RPE and comments."""
+
+    activity_type = "Mobility"
+
+    def load(self):
+        self.mobility_session = SavedMobilitySession.objects.get(workout=self.workout)
+
+    def apply(self):
+        mobility_session = self.mobility_session
+        mobility_session.rpe = self.data.get("rpe", mobility_session.rpe)
+        mobility_session.comments = self.data.get("comments", mobility_session.comments)
+        mobility_session.save()
@@ -0,0 +1,71 @@
+from saved_workouts.completion import CompletionEngine
+from workout_section_sets.reconciliation import apply_changes
+from saved_run_intervals.models import SavedRunningInterval
+from saved_run_interval_times.models import SavedRunningSplitTime
+from .models import SavedRunningSession
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RunningCompletion(CompletionEngine):
+    """
+    Saves split times plus the session's RPE and comments. Awards +20 if every
+    split of every interval has an actual time.
+    """
+
+    activity_type = "Running"
+
+    def load(self):
+        intervals_data = self.data.get('intervals', [])
+
+        self.session = SavedRunningSession.objects.get(workout=self.workout)
+        self.interval_ids = set(
+            SavedRunningInterval.objects
+            .filter(saved_session=self.session, id__in=[interval['id'] for interval in intervals_data])
+            .values_list('id', flat=True)
+        )
+        self.split_map = SavedRunningSplitTime.objects.filter(
+            saved_interval__saved_session=self.session
+        ).in_bulk([split['id'] for interval in intervals_data for split in interval.get('split_times', [])])
+
+    def apply(self):
+        # Session RPE and comments
+        if apply_changes(self.session, {
+            'rpe': self.data.get('rpe', self.session.rpe),
+            'comments': self.data.get('comments', self.session.comments),
+        }):
+            self.session.save()
+
+        # Split times; fully logged only if every split has an actual_time
+        splits_to_update = []
+        all_intervals_fully_logged = True
+        for interval_data in self.data.get('intervals', []):
+            if interval_data['id'] not in self.interval_ids:
+                logger.warning(f"Interval with ID {interval_data['id']} does not exist. Skipping.")
+                all_intervals_fully_logged = False
+                continue
+
+            for split_data in interval_data.get('split_times', []):
+                split_time = self.split_map.get(split_data['id'])
+                if split_time is None:
+                    logger.warning(f"Split time with ID {split_data['id']} does not exist. Skipping.")
+                    all_intervals_fully_logged = False
+                    continue
+
+                new_actual_time = split_data.get('actual_time')
+                if apply_changes(split_time, {
+                    'actual_time': new_actual_time if new_actual_time is not None else split_time.actual_time,
+                    'comments': split_data.get('comments', split_time.comments),
+                }):
+                    splits_to_update.append(split_time)
+
+                if not split_time.actual_time:
+                    all_intervals_fully_logged = False
+
+        if splits_to_update:
+            SavedRunningSplitTime.objects.bulk_update(splits_to_update, ['actual_time', 'comments'])
+
+        if all_intervals_fully_logged:
+            self.award('Full Running Splits', 20)
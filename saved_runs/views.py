@@ -1,14 +1,7 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.utils.timezone import now
-from django.db import transaction
-from django.db.models import F
-from .models import SavedRunningSession
-from saved_workouts.models import Workout
-from saved_run_intervals.models import SavedRunningInterval
-from saved_run_interval_times.models import SavedRunningSplitTime
-from leaderboard.models import Leaderboard
-from score_logging.models import ScoreLog
+from .completion import RunningCompletion
+from saved_workouts.idempotency import idempotent
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -194,98 +187,15 @@ class CompleteRunningWorkoutAPIView(APIView):
     the running workout + 20 if all splits are fully filled.
     """
 
+    @idempotent
     def put(self, request, workout_id):
         user_id = request.query_params.get('user_id')
 
         try:
             logger.info(f"Starting completion process for running workout_id: {workout_id}, user_id: {user_id}")
 
-            # 1️⃣ --- Get User Object ---
-            user = User.objects.get(id=user_id)
-
-            # 2️⃣ --- Update Workout Status (must be activity_type='Running') ---
-            workout = Workout.objects.get(id=workout_id, owner=user, activity_type="Running")
-            scheduled_date = request.data.get('scheduled_date')
-            workout.status = 'Completed'
-            workout.completed_date = scheduled_date if scheduled_date else now().date()
-            workout.save()
-
-            # 3️⃣ --- Award Points for Workout Completion (50 points) ---
-            leaderboard, _ = Leaderboard.objects.get_or_create(user=user)
-            if not ScoreLog.objects.filter(user=user, workout_id=workout.id, score_type='Workout Completion').exists():
-                # leaderboard.total_score += 50
-                # leaderboard.weekly_score += 50
-                # leaderboard.monthly_score += 50
-                # leaderboard.save()
-
-                ScoreLog.objects.create(
-                    user=user,
-                    score_type='Workout Completion',
-                    score_value=50,
-                    workout_id=workout.id
-                )
-                logger.info(f"Awarded 50 points for running workout completion (workout_id={workout_id}, user_id={user_id})")
-
-            # 4️⃣ --- Process Running Session (RPE, Comments) ---
-            running_session = SavedRunningSession.objects.get(workout=workout)
-            running_session.rpe = request.data.get('rpe', running_session.rpe)
-            running_session.comments = request.data.get('comments', running_session.comments)
-            running_session.save()
-
-            # 5️⃣ --- Update Split Times ---
-            intervals_data = request.data.get('intervals', [])
-
-            # We'll track if ALL intervals have ALL splits with an actual_time (non-empty)
-            all_intervals_fully_logged = True  # We'll set it to False if we find any unfilled split
-            for interval_data in intervals_data:
-                try:
-                    interval = SavedRunningInterval.objects.get(id=interval_data['id'])
-                except SavedRunningInterval.DoesNotExist:
-                    logger.warning(f"Interval with ID {interval_data['id']} does not exist. Skipping.")
-                    # If this interval doesn't exist, let's say it's "not fully logged"
-                    all_intervals_fully_logged = False
-                    continue
-
-                split_times_data = interval_data.get('split_times', [])
-                for split_data in split_times_data:
-                    try:
-                        split_time = SavedRunningSplitTime.objects.get(id=split_data['id'])
-
-                        # Update actual_time and comments
-                        new_actual_time = split_data.get('actual_time')
-                        split_time.actual_time = new_actual_time if new_actual_time is not None else split_time.actual_time
-                        split_time.comments = split_data.get('comments', split_time.comments)
-                        split_time.save()
-
-                        # Check if actual_time is missing or empty
-                        if not split_time.actual_time:
-                            all_intervals_fully_logged = False
-                    except SavedRunningSplitTime.DoesNotExist:
-                        logger.warning(f"Split time with ID {split_data['id']} does not exist. Skipping.")
-                        all_intervals_fully_logged = False
-
-            # 6️⃣ --- Award Bonus Points if ALL splits are fully logged ---
-            # If "all_intervals_fully_logged" is True, we do a single +20
-            if all_intervals_fully_logged:
-                # Avoid double-awarding if it was previously given
-                if not ScoreLog.objects.filter(
-                        user=user,
-                        workout_id=workout.id,
-                        score_type='Full Running Splits').exists():
-                    leaderboard.total_score += 20
-                    leaderboard.weekly_score += 20
-                    leaderboard.monthly_score += 20
-                    leaderboard.save()
-
-                    ScoreLog.objects.create(
-                        user=user,
-                        score_type='Full Running Splits',
-                        score_value=20,
-                        workout_id=workout.id
-                    )
-                    logger.info(f"Awarded 20 points for fully logging all running splits (workout_id={workout_id}, user_id={user_id})")
-
-            # 7️⃣ --- Log Completion ---
+            RunningCompletion(user_id, workout_id, request.data).run()
+
             logger.info(f"Running workout with id {workout_id} completed successfully for user {user_id}")
             return Response({'message': 'Running workout completed successfully!'}, status=200)
 
@@ -0,0 +1,283 @@
+import logging
+import time
+
+from django.db import connection, transaction
+from django.utils.timezone import now
+
+from score_logging.awards import award_points
+from workout_section_movement.models import SectionMovement
+from workout_section_sets.models import Set
+from workout_section_sets.reconciliation import apply_changes, set_reconciler, strength_set_reconciler
+from saved_conditioning.models import ConditioningWorkout
+from strength_records.models import StrengthSet
+from .models import Workout, CompletionEvent
+from .events import record_completion_event
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """`connection.execute_wrapper` hook that counts the statements it sees."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class CompletionEngine:
+    """
+    Completes a workout of one activity type.
+
+    `run()` works in three steps:
+      1) load the workout and (via `load()`) everything the subclass needs to read,
+      2) inside one transaction mark the workout Completed, let `apply()` stage and
+         write the activity's changes, insert the awarded points (awards already
+         given are skipped by the database, not checked up front) and write a
+         CompletionEvent to the outbox,
+      3) record the query count and timings in `stats`.
+
+    Derived data is updated outside the request: recent performances, training facts
+    and reminders from the outbox by `process_completion_events`, leaderboard scores
+    and user stats by the dirty-user jobs.
+
+    Subclasses keep `load()` and `apply()` to a fixed number of queries, so
+    completing a workout costs the same whatever its size.
+    """
+
+    activity_type = None  # Only complete workouts of this type (None: any)
+    completion_points = 50
+
+    def __init__(self, user_id, workout_id, data):
+        self.user_id = user_id
+        self.workout_id = workout_id
+        self.data = data
+
+        self.workout = None
+        self.awards = {}
+        self.awarded = []
+        self.movement_ids = []  # Movements whose logged sets changed
+        self.previous_completed_date = None
+        self.stats = {}
+
+    def run(self):
+        counter = QueryCounter()
+        started = time.perf_counter()
+
+        with connection.execute_wrapper(counter):
+            # 1) Preload
+            self._load_workout()
+            self.load()
+            loaded = time.perf_counter()
+
+            # 2) Write everything atomically
+            with transaction.atomic():
+                self._complete_workout()
+                self.award('Workout Completion', self.completion_points)
+                self.apply()
+                self._write_awards()
+                self._record_event()
+            finished = time.perf_counter()
+
+        # 3) Report
+        self.stats = {
+            'queries': counter.count,
+            'load_ms': round((loaded - started) * 1000, 2),
+            'write_ms': round((finished - loaded) * 1000, 2),
+            'total_ms': round((finished - started) * 1000, 2),
+        }
+        logger.info(
+            "Completed %s workout %s for user %s: %s",
+            self.workout.activity_type, self.workout.id, self.user_id, self.stats
+        )
+        return self.stats
+
+    def load(self):
+        """Preload whatever `apply()` reads. Runs before the transaction opens."""
+
+    def apply(self):
+        """Stage and write the activity's changes. Runs inside the transaction."""
+
+    def award(self, score_type, score_value):
+        """Queue points for this workout. Each score type is awarded at most once per workout."""
+        self.awards.setdefault(score_type, score_value)
+
+    @property
+    def performed_date(self):
+        scheduled_date = self.data.get('scheduled_date')
+        return scheduled_date if scheduled_date else now().date()
+
+    def _load_workout(self):
+        workouts = Workout.objects.filter(id=self.workout_id, owner_id=self.user_id)
+        if self.activity_type:
+            workouts = workouts.filter(activity_type=self.activity_type)
+        self.workout = workouts.get()
+
+    def _complete_workout(self):
+        self.previous_completed_date = self.workout.completed_date
+        self.workout.status = 'Completed'
+        self.workout.completed_date = self.performed_date
+        self.workout.save()
+
+    def _write_awards(self):
+        self.awarded = award_points(self.user_id, self.workout.id, self.awards.items())
+        for score_type, score_value in self.awarded:
+            logger.info(
+                "Awarded %s points for %s (workout_id=%s, user_id=%s)",
+                score_value, score_type, self.workout.id, self.user_id
+            )
+
+    def _record_event(self):
+        # Only the first completion counts towards stats; later ones are edits
+        first_completion = any(score_type == 'Workout Completion' for score_type, _ in self.awarded)
+        record_completion_event(
+            self.user_id,
+            self.workout,
+            event_type=CompletionEvent.COMPLETED if first_completion else CompletionEvent.EDITED,
+            points=sum(score_value for _, score_value in self.awarded),
+            movement_ids=self.movement_ids,
+            previous_completed_date=self.previous_completed_date,
+        )
+
+
+class SectionedCompletion(CompletionEngine):
+    """
+    Completion for section-based workouts (Gym, Hyrox): logs sets per section movement,
+    updates conditioning feedback and awards +20 when every strength movement is logged.
+    """
+
+    strength_keywords = ["strong", "build", "pump"]  # case-insensitive
+    records_movement_feedback = True  # Save difficulty/comments on each movement
+    logs_strength_sets = True  # Mirror strength-section sets into StrengthSet
+
+    def load(self):
+        section_ids = [section['section_id'] for section in self.data.get('sections', [])]
+        in_workout = {'section_id__in': section_ids, 'section__workout': self.workout}
+
+        self.movement_map = {
+            movement.id: movement
+            for movement in SectionMovement.objects.filter(**in_workout).select_related('section')
+        }
+        self.conditioning_map = {
+            conditioning.id: conditioning
+            for conditioning in ConditioningWorkout.objects.filter(**in_workout)
+        }
+        self.set_rows = set_reconciler(
+            Set.objects.filter(
+                section_movement__section_id__in=section_ids,
+                section_movement__section__workout=self.workout,
+            )
+        )
+        if self.logs_strength_sets:
+            # Existing StrengthSet rows for (this user, this workout, this date)
+            self.strength_rows = strength_set_reconciler(
+                StrengthSet.objects.filter(
+                    owner_id=self.user_id,
+                    workout=self.workout,
+                    performed_date=self.performed_date,
+                )
+            )
+
+    def apply(self):
+        movements_to_update = []
+        conditioning_updates = []
+        logged_movement_ids = set()  # Section movements whose full set list was sent
+        logged_strength_movement_ids = set()  # Their Movement IDs, for strength sections
+
+        # We'll track how many "strength" movements exist and how many are "fully logged"
+        strength_movements_count = 0
+        strength_fully_logged_count = 0
+
+        for section_data in self.data.get('sections', []):
+            # Update conditioning workouts
+            for conditioning_data in section_data.get('conditioning_workouts', []):
+                conditioning = self.conditioning_map.get(conditioning_data.get('conditioning_id'))
+                if conditioning and apply_changes(conditioning, {
+                    'comments': conditioning_data.get('comments', conditioning.comments),
+                    'rpe': conditioning_data.get('rpe', conditioning.rpe),
+                }):
+                    conditioning_updates.append(conditioning)
+
+            # Update standard movements (sets)
+            for movement_data in section_data.get('movements', []):
+                movement_id = movement_data.get('movement_id')
+                movement = self.movement_map.get(movement_id)
+
+                if not movement:
+                    continue
+
+                if self.records_movement_feedback and apply_changes(movement, {
+                    'movement_difficulty': movement_data.get('movement_difficulty', movement.movement_difficulty),
+                    'movement_comment': movement_data.get('movement_comments', movement.movement_comment),
+                }):
+                    movements_to_update.append(movement)
+
+                # Determine if this movement belongs to a "strength" section
+                section_name_lower = movement.section.section_name.lower() if movement.section.section_name else ""
+                is_strength_section = any(kw in section_name_lower for kw in self.strength_keywords)
+
+                # A movement is "fully logged" if it has at least one set with reps>0, weight>0
+                movement_has_valid_set = False
+
+                if movement_data.get('sets'):
+                    logged_movement_ids.add(movement_id)
+                    if is_strength_section and movement.movements_id:
+                        logged_strength_movement_ids.add(movement.movements_id)
+
+                for set_data in movement_data.get('sets', []):
+                    reps = set_data.get('reps') or 0
+                    weight = set_data.get('weight') or 0
+                    set_number = set_data.get('set_number')
+
+                    self.set_rows.stage((movement_id, set_number), {'reps': reps, 'weight': weight})
+
+                    if reps > 0 and weight > 0:
+                        movement_has_valid_set = True
+
+                    if self.logs_strength_sets and is_strength_section and movement.movements_id:
+                        self.strength_rows.stage(
+                            (movement.movements_id, set_number),
+                            {
+                                'reps': reps,
+                                'weight': weight,
+                                'rpe': movement_data.get('movement_difficulty', movement.movement_difficulty),
+                                'load': weight * reps,
+                            },
+                            owner_id=self.user_id,
+                            workout=self.workout,
+                            performed_date=self.performed_date,
+                        )
+
+                if is_strength_section:
+                    strength_movements_count += 1
+                    if movement_has_valid_set:
+                        strength_fully_logged_count += 1
+
+        # Write only what changed; sets removed in the app are deleted
+        if movements_to_update:
+            SectionMovement.objects.bulk_update(movements_to_update, ['movement_difficulty', 'movement_comment'])
+        self.set_rows.save(delete_stale=True, in_scope=lambda key: key[0] in logged_movement_ids)
+        if conditioning_updates:
+            ConditioningWorkout.objects.bulk_update(conditioning_updates, ['comments', 'rpe'])
+        if self.logs_strength_sets:
+            # Mirror rows of removed sets go too, under the same scope
+            self.strength_rows.save(
+                delete_stale=True, in_scope=lambda key: key[0] in logged_strength_movement_ids
+            )
+
+        self.movement_ids = [movement.movements_id for movement in self.movement_map.values()]
+
+        # Award a single +20 if ALL "strength" movements are fully logged
+        if strength_movements_count > 0 and strength_fully_logged_count == strength_movements_count:
+            self.award('Full Strength Logging', 20)
+
+
+class GymCompletion(SectionedCompletion):
+    pass
+
+
+class HyroxCompletion(SectionedCompletion):
+    records_movement_feedback = False
+    logs_strength_sets = False
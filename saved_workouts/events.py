@@ -0,0 +1,28 @@
+from django.db import transaction
+
+from user_stats.models import DirtyUser
+from user_stats.dirty import mark_dirty
+from .models import CompletionEvent
+from .tasks import process_completion_events
+
+
+def record_completion_event(owner_id, workout, event_type=CompletionEvent.COMPLETED, points=0, movement_ids=(),
+                            previous_completed_date=None):
+    """
+    Write a CompletionEvent in the caller's transaction and drain the outbox once it
+    commits. The beat schedule drains it too, so nothing is lost if the broker is down.
+    The owner's stats are marked dirty in the same transaction.
+    """
+    event = CompletionEvent.objects.create(
+        event_type=event_type,
+        owner_id=owner_id,
+        workout=workout,
+        points=points,
+        movement_ids=sorted(set(m for m in movement_ids if m)),
+        previous_completed_date=(
+            previous_completed_date if previous_completed_date != workout.completed_date else None
+        ),
+    )
+    mark_dirty([owner_id], DirtyUser.STATS)
+    transaction.on_commit(process_completion_events.delay, robust=True)
+    return event
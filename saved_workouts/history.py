@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+from django.db.models import F, Window
+from django.db.models.functions import DenseRank
+
+from workout_section_movement.models import SectionMovement
+from workout_section_sets.models import Set
+from saved_conditioning.models import ConditioningWorkout
+
+
+HISTORY_LIMIT = 3
+
+
+def _dedupe(ids):
+    """Keep the first occurrence of every id, preserving order."""
+    return list(dict.fromkeys(i for i in ids if i is not None))
+
+
+def build_movement_history(user_id, movement_ids, limit=HISTORY_LIMIT):
+    """
+    Return the last `limit` completed performances of each movement for a user.
+
+    All movements are resolved together: one ranked query picks the section movements
+    belonging to each movement's latest completed workouts, and one query loads their sets.
+    DENSE_RANK is used (rather than ROW_NUMBER) so a movement that appears twice in the
+    same workout still counts as a single performance.
+
+    Returns {movement_id: [{workout_id, completed_date, movement_difficulty,
+    movement_comment, sets: [{set_number, reps, weight}]}]}, newest first.
+    """
+    movement_ids = _dedupe(movement_ids)
+    if not movement_ids:
+        return {}
+
+    # 1) Rank each movement's completed workouts, newest first
+    ranked_rows = (
+        SectionMovement.objects
+        .filter(
+            movements_id__in=movement_ids,
+            section__workout__owner=user_id,
+            section__workout__status="Completed",
+        )
+        .annotate(
+            workout_id=F('section__workout_id'),
+            completed_date=F('section__workout__completed_date'),
+            performance_rank=Window(
+                expression=DenseRank(),
+                partition_by=[F('movements_id')],
+                order_by=[
+                    F('section__workout__completed_date').desc(nulls_last=True),
+                    F('section__workout_id').desc(),
+                ],
+            ),
+        )
+        .filter(performance_rank__lte=limit)
+        .values(
+            'id', 'movements_id', 'workout_id', 'completed_date',
+            'movement_difficulty', 'movement_comment', 'performance_rank',
+        )
+    )
+
+    # Group section movements into one performance per (movement, workout)
+    performances = {}
+    section_movements = {}
+    for row in ranked_rows:
+        section_movements[row['id']] = row
+        key = (row['movements_id'], row['workout_id'])
+        if key not in performances:
+            performances[key] = {
+                "rank": row['performance_rank'],
+                "workout_id": row['workout_id'],
+                "completed_date": row['completed_date'],
+                "sets": [],
+            }
+
+    if not performances:
+        return {}
+
+    # 2) Load every set for the selected section movements in one go
+    sets = (
+        Set.objects
+        .filter(section_movement_id__in=section_movements.keys())
+        .order_by('set_number', 'id')
+        .values('section_movement_id', 'set_number', 'reps', 'weight')
+    )
+    for s in sets:
+        sm = section_movements[s['section_movement_id']]
+        performances[(sm['movements_id'], sm['workout_id'])]["sets"].append(s)
+
+    # 3) Build the response shape; difficulty/comment come from the first set's movement
+    movement_history = defaultdict(list)
+    for (movement_id, _), perf in performances.items():
+        first_set = perf["sets"][0] if perf["sets"] else None
+        first_sm = section_movements[first_set['section_movement_id']] if first_set else None
+        movement_history[movement_id].append({
+            "workout_id": perf["workout_id"],
+            "completed_date": perf["completed_date"],
+            "movement_difficulty": first_sm['movement_difficulty'] if first_sm else None,
+            "movement_comment": first_sm['movement_comment'] if first_sm else None,
+            "sets": [
+                {"set_number": s['set_number'], "reps": s['reps'], "weight": s['weight']}
+                for s in perf["sets"]
+            ],
+            "_rank": perf["rank"],
+        })
+
+    return _sorted_by_rank(movement_history)
+
+
+def build_conditioning_history(user_id, conditioning_overview_ids, limit=HISTORY_LIMIT):
+    """
+    Return the last `limit` completed performances of each conditioning overview for a user,
+    ranked in a single windowed query.
+
+    Returns {overview_id: [{workout_id, completed_date, entries: [{comments, rpe}]}]}, newest first.
+    """
+    conditioning_overview_ids = _dedupe(conditioning_overview_ids)
+    if not conditioning_overview_ids:
+        return {}
+
+    ranked_rows = (
+        ConditioningWorkout.objects
+        .filter(
+            conditioning_overview_id__in=conditioning_overview_ids,
+            section__workout__owner=user_id,
+            section__workout__status="Completed",
+        )
+        .annotate(
+            workout_id=F('section__workout_id'),
+            completed_date=F('section__workout__completed_date'),
+            performance_rank=Window(
+                expression=DenseRank(),
+                partition_by=[F('conditioning_overview_id')],
+                order_by=[
+                    F('section__workout__completed_date').desc(nulls_last=True),
+                    F('section__workout_id').desc(),
+                ],
+            ),
+        )
+        .filter(performance_rank__lte=limit)
+        .order_by('id')
+        .values(
+            'conditioning_overview_id', 'workout_id', 'completed_date',
+            'comments', 'rpe', 'performance_rank',
+        )
+    )
+
+    performances = {}
+    for row in ranked_rows:
+        key = (row['conditioning_overview_id'], row['workout_id'])
+        if key not in performances:
+            performances[key] = {
+                "workout_id": row['workout_id'],
+                "completed_date": row['completed_date'],
+                "entries": [],
+                "_rank": row['performance_rank'],
+            }
+        performances[key]["entries"].append({
+            "comments": row['comments'],
+            "rpe": row['rpe'],
+        })
+
+    conditioning_history = defaultdict(list)
+    for (overview_id, _), perf in performances.items():
+        conditioning_history[overview_id].append(perf)
+
+    return _sorted_by_rank(conditioning_history)
+
+
+def _sorted_by_rank(history):
+    """Order each entry list newest first and drop the internal rank key."""
+    result = {}
+    for key, entries in history.items():
+        entries.sort(key=lambda e: e["_rank"])
+        for entry in entries:
+            entry.pop("_rank")
+        result[key] = entries
+    return result
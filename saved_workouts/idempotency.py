@@ -0,0 +1,78 @@
+import logging
+from datetime import timedelta
+from functools import wraps
+
+from django.db import IntegrityError
+from django.utils.timezone import now
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+# How long a stored response is replayed; see saved_workouts.tasks.purge_idempotency_keys
+IDEMPOTENCY_KEY_TTL = timedelta(hours=24)
+
+
+def idempotent(view_method):
+    """
+    Make an APIView handler safe to retry.
+
+    When the request carries an `Idempotency-Key` header, the first request claims the
+    key and its successful response is stored. Replays with the same key get the stored
+    response back without running the handler again; a replay that arrives while the
+    first request is still running gets a 409. Failed responses are not stored, so the
+    client can retry them. Requests without the header run as before.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        user_id = request.query_params.get('user_id')
+        if not key or not user_id:
+            return view_method(self, request, *args, **kwargs)
+
+        # 1) Claim the key, or find the request that already did
+        try:
+            record, created = IdempotencyKey.objects.get_or_create(
+                user_id=user_id, key=key, defaults={'endpoint': request.path}
+            )
+        except (IntegrityError, ValueError):
+            # Unknown user; let the handler produce its usual error
+            return view_method(self, request, *args, **kwargs)
+
+        if not created and record.created_at < now() - IDEMPOTENCY_KEY_TTL:
+            # Expired: treat the key as fresh
+            record.delete()
+            return wrapper(self, request, *args, **kwargs)
+
+        # 2) Replay
+        if not created:
+            if record.endpoint != request.path:
+                return Response(
+                    {'error': f'{IDEMPOTENCY_HEADER} was already used for a different request'},
+                    status=422
+                )
+            if record.response_status is None:
+                return Response({'error': 'A request with this Idempotency-Key is still in progress'}, status=409)
+
+            logger.info("Replaying stored response for idempotency key %s (user_id=%s)", key, user_id)
+            return Response(record.response_body, status=record.response_status)
+
+        # 3) First request: run it and store the outcome
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            record.delete()
+            raise
+
+        if 200 <= response.status_code < 300:
+            record.response_status = response.status_code
+            record.response_body = response.data
+            record.save(update_fields=['response_status', 'response_body'])
+        else:
+            record.delete()
+        return response
+
+    return wrapper
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("saved_workouts", "0011_completionevent"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workout",
+            index=models.Index(
+                fields=["owner", "created_at"], name="workout_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workout",
+            index=models.Index(
+                fields=["owner", "scheduled_date"], name="workout_owner_scheduled_idx"
+            ),
+        ),
+    ]
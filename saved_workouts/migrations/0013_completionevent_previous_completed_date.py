@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("saved_workouts", "0012_workout_workout_owner_created_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="completionevent",
+            name="previous_completed_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
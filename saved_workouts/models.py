@@ -1,4 +1,5 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 
 # Create your models here.
 class Workout(models.Model):
@@ -23,4 +24,68 @@ class Workout(models.Model):
         blank=True,
         null=True,
         db_index=True 
-    )
\ No newline at end of file
+    )
+
+    class Meta:
+        indexes = [
+            # Keyset pagination and calendar reads for one user
+            models.Index(fields=['owner', 'created_at'], name='workout_owner_created_idx'),
+            models.Index(fields=['owner', 'scheduled_date'], name='workout_owner_scheduled_idx'),
+        ]
+
+class IdempotencyKey(models.Model):
+    """
+    The stored response of a completion request made with an `Idempotency-Key` header.
+    Retries with the same key get this response back instead of re-running the request.
+    A row with no `response_status` is a request that is still in flight.
+    """
+    user = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='idempotency_keys',
+        on_delete=models.CASCADE,
+        db_index=True
+    )
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=255)
+    response_status = models.SmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
+
+
+class CompletionEvent(models.Model):
+    """
+    Outbox row written in the same transaction as a workout completion (or an edit of
+    its logged sets). `saved_workouts.tasks.process_completion_events` drains these and
+    updates the derived data: recent performances, daily training facts and scheduled
+    notifications. Leaderboard scores and user stats are recomputed by the dirty-user
+    jobs (see user_stats.dirty).
+    """
+    COMPLETED = 'completed'
+    EDITED = 'edited'
+    EVENT_TYPES = [
+        (COMPLETED, 'Completed'),
+        (EDITED, 'Edited'),
+    ]
+
+    event_type = models.CharField(max_length=15, choices=EVENT_TYPES, default=COMPLETED)
+    owner = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='completion_events',
+        on_delete=models.CASCADE,
+        db_index=True
+    )
+    workout = models.ForeignKey(
+        'saved_workouts.Workout',
+        related_name='completion_events',
+        on_delete=models.CASCADE,
+        db_index=True
+    )
+    points = models.IntegerField(default=0)  # Points newly awarded by this completion
+    movement_ids = models.JSONField(default=list)  # Movements whose logged sets changed
+    # The workout's completed_date before this event, if it moved (its facts are rebuilt too)
+    previous_completed_date = models.DateField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
@@ -0,0 +1,118 @@
+from django.db.models import Prefetch
+
+from .models import Workout
+from workout_section_movement.models import SectionMovement
+from saved_conditioning.models import ConditioningWorkout
+from saved_runs.models import SavedRunningSession
+from saved_run_intervals.models import SavedRunningInterval
+from saved_mobility.models import SavedMobilitySession
+from saved_mobility_details.models import SavedMobilityDetails
+from saved_hiit.models import SavedHIITWorkout
+from saved_hiit_details.models import SavedHIITDetails
+from saved_hiit_detail_movements.models import SavedHIITMovement
+
+
+def _sectioned_prefetches():
+    return [
+        Prefetch(
+            'workout_sections__section_movement_details',
+            queryset=SectionMovement.objects.select_related('movements').prefetch_related('workout_sets')
+        ),
+        Prefetch(
+            'workout_sections__conditioning_elements',
+            queryset=ConditioningWorkout.objects
+            .select_related('conditioning_overview')
+            .prefetch_related('conditioning_overview__conditioning_details')
+        ),
+    ]
+
+
+def _running_prefetches():
+    return [
+        Prefetch(
+            'running_sessions',
+            queryset=SavedRunningSession.objects.prefetch_related(
+                Prefetch(
+                    'saved_intervals',
+                    queryset=SavedRunningInterval.objects.prefetch_related('split_times')
+                )
+            )
+        ),
+    ]
+
+
+def _mobility_prefetches():
+    return [
+        Prefetch(
+            'mobility_sessions',
+            queryset=SavedMobilitySession.objects.prefetch_related(
+                Prefetch(
+                    'mobility_details',
+                    queryset=SavedMobilityDetails.objects.select_related('movements')
+                )
+            )
+        ),
+    ]
+
+
+def _hiit_prefetches():
+    return [
+        Prefetch(
+            'hiit_sessions',
+            queryset=SavedHIITWorkout.objects.prefetch_related(
+                Prefetch(
+                    'hiit_details',
+                    queryset=SavedHIITDetails.objects.prefetch_related(
+                        Prefetch(
+                            'hiit_movements',
+                            queryset=SavedHIITMovement.objects.select_related('movements')
+                        )
+                    )
+                )
+            )
+        ),
+    ]
+
+
+# The relation tree each activity type's populated serializers walk
+ACTIVITY_PREFETCHES = {
+    'Gym': _sectioned_prefetches,
+    'Hyrox': _sectioned_prefetches,
+    'Running': _running_prefetches,
+    'Mobility': _mobility_prefetches,
+    'Hiit': _hiit_prefetches,
+}
+
+# The (smaller) trees walked by the history summary serializers
+HISTORY_PREFETCHES = {
+    'Running': _running_prefetches,
+    'Mobility': lambda: ['mobility_sessions'],
+    'Hiit': lambda: ['hiit_sessions'],
+}
+
+
+def populated_workouts(queryset=None):
+    """
+    Workouts with every relation `PopulatedWorkoutSerializer` walks prefetched.
+
+    All activity trees are included because the serializer renders every relation
+    for every workout; prefetches on empty parents issue no further queries, so the
+    total stays fixed regardless of how many sections, sets or intervals exist.
+    """
+    if queryset is None:
+        queryset = Workout.objects.all()
+
+    builds = dict.fromkeys(ACTIVITY_PREFETCHES.values())
+    prefetches = [prefetch for build in builds for prefetch in build()]
+    return queryset.prefetch_related(*prefetches, 'notifications')
+
+
+def workout_history(activity_type, queryset=None):
+    """Workouts with only the given activity's relation tree prefetched, for history summaries."""
+    if queryset is None:
+        queryset = Workout.objects.all()
+
+    build = HISTORY_PREFETCHES.get(activity_type)
+    if build is None:
+        return queryset
+    return queryset.prefetch_related(*build())
@@ -0,0 +1,70 @@
+from rest_framework import serializers
+from saved_runs.models import SavedRunningSession
+from saved_run_intervals.models import SavedRunningInterval
+from saved_run_interval_times.models import SavedRunningSplitTime
+from saved_mobility.models import SavedMobilitySession
+from saved_hiit.models import SavedHIITWorkout
+from ..models import Workout
+
+# Slim serializers for the "previous workouts" comparison screens.
+# They keep the PopulatedWorkoutSerializer key names so the app reads them unchanged.
+
+WORKOUT_HISTORY_FIELDS = ('id', 'name', 'description', 'activity_type', 'duration', 'completed_date')
+
+
+class RunningSplitHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedRunningSplitTime
+        fields = ('repeat_number', 'target_time', 'actual_time', 'comments')
+
+
+class RunningIntervalHistorySerializer(serializers.ModelSerializer):
+    split_times = RunningSplitHistorySerializer(many=True)
+
+    class Meta:
+        model = SavedRunningInterval
+        fields = ('id', 'repeats', 'repeat_distance', 'target_pace', 'split_times')
+
+
+class RunningSessionHistorySerializer(serializers.ModelSerializer):
+    saved_intervals = RunningIntervalHistorySerializer(many=True)
+
+    class Meta:
+        model = SavedRunningSession
+        fields = ('id', 'total_distance', 'rpe', 'comments', 'saved_intervals')
+
+
+class RunningHistorySerializer(serializers.ModelSerializer):
+    running_sessions = RunningSessionHistorySerializer(many=True)
+
+    class Meta:
+        model = Workout
+        fields = WORKOUT_HISTORY_FIELDS + ('running_sessions',)
+
+
+class MobilitySessionHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedMobilitySession
+        fields = ('id', 'rpe', 'comments')
+
+
+class MobilityHistorySerializer(serializers.ModelSerializer):
+    mobility_sessions = MobilitySessionHistorySerializer(many=True)
+
+    class Meta:
+        model = Workout
+        fields = WORKOUT_HISTORY_FIELDS + ('mobility_sessions',)
+
+
+class HiitSessionHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedHIITWorkout
+        fields = ('id', 'workout_type', 'structure', 'rpe', 'comments')
+
+
+class HiitHistorySerializer(serializers.ModelSerializer):
+    hiit_sessions = HiitSessionHistorySerializer(many=True)
+
+    class Meta:
+        model = Workout
+        fields = WORKOUT_HISTORY_FIELDS + ('hiit_sessions',)
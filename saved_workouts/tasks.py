@@ -0,0 +1,86 @@
+from collections import defaultdict
+
+from celery import shared_task
+from django.db import transaction
+from django.utils.timezone import now
+from .models import CompletionEvent, IdempotencyKey
+from .idempotency import IDEMPOTENCY_KEY_TTL
+from movement_summary_stats.performances import refresh_recent_performances
+from user_stats.facts import rebuild_daily_facts
+from notifications.models import ScheduledNotification
+import logging
+logger = logging.getLogger(__name__)
+
+COMPLETION_EVENT_BATCH_SIZE = 100
+
+
+@shared_task
+def purge_idempotency_keys():
+    """Delete stored completion responses older than the replay window."""
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=now() - IDEMPOTENCY_KEY_TTL).delete()
+    logger.info(f"Purged {deleted} expired idempotency keys")
+    return deleted
+
+
+@shared_task
+def process_completion_events(batch_size=COMPLETION_EVENT_BATCH_SIZE):
+    """
+    Drain the CompletionEvent outbox in batches.
+
+    Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent
+    workers never process the same event, and is marked processed in the same
+    transaction as its fan-out, so every event is applied exactly once.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                CompletionEvent.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(processed_at__isnull=True)
+                .select_related('workout')
+                .order_by('id')[:batch_size]
+            )
+            if not events:
+                break
+
+            _fan_out(events)
+            CompletionEvent.objects.filter(id__in=[e.id for e in events]).update(processed_at=now())
+
+        processed += len(events)
+
+    if processed:
+        logger.info(f"Processed {processed} completion events")
+    return processed
+
+
+def _fan_out(events):
+    completed = [e for e in events if e.event_type == CompletionEvent.COMPLETED]
+
+    # 1) Recent performances for the movements that changed (summaries are kept by the PR detector)
+    movements_by_owner = defaultdict(set)
+    for e in events:
+        movements_by_owner[e.owner_id].update(e.movement_ids)
+    for owner_id, movement_ids in movements_by_owner.items():
+        if movement_ids:
+            refresh_recent_performances(owner_id, movement_ids)
+
+    # Leaderboard scores and user stats are not touched here: the awards and the event
+    # marked the owner dirty, and `update_dirty_leaderboards` / `update_dirty_user_stats`
+    # recompute them from committed data. Adding deltas here as well would count the
+    # completion twice whenever those jobs run first.
+
+    # 2) The daily training facts of every day that changed, including the day a
+    #    re-completion moved the workout away from
+    days_by_owner = defaultdict(set)
+    for e in events:
+        days_by_owner[e.owner_id].update([e.workout.completed_date, e.previous_completed_date])
+    for owner_id, days in days_by_owner.items():
+        rebuild_daily_facts(owner_id, days)
+
+    # 3) Reminders for workouts that are now done
+    ScheduledNotification.objects.filter(
+        workout_id__in=[e.workout_id for e in completed],
+        sent=False,
+        canceled=False,
+    ).update(canceled=True)
@@ -8,15 +8,13 @@ import logging  # ✅ Import logging
 from datetime import date, time, datetime, timedelta
 from .models import Workout
 from workout_sections.models import Section
-from movements.models import Movement
-from strength_records.models import StrengthSet
+from movements.resolver import normalise_name, resolve_movement_names, resolve_movement_ids
 from workout_section_movement.models import SectionMovement
 from .serializers.populated import PopulatedWorkoutSerializer
 from .serializers.common import WorkoutSerializer
-from workout_section_sets.models import Set
-from score_logging.models import ScoreLog
-from leaderboard.models import Leaderboard
-from django.db.models import OuterRef, Subquery, Prefetch, F, Q
+from .serializers.history import RunningHistorySerializer, MobilityHistorySerializer, HiitHistorySerializer
+from .querysets import populated_workouts, workout_history
+from django.db.models import OuterRef, Subquery, F, Q
 from django.db.models.functions import Coalesce
 from django.db import transaction
 from django.contrib.auth import get_user_model
@@ -40,8 +38,15 @@ from saved_hiit.models import SavedHIITWorkout
 from saved_hiit_details.models import SavedHIITDetails
 from saved_hiit_detail_movements.models import SavedHIITMovement
 from notifications.models import ScheduledNotification
+from .history import build_conditioning_history
+from .completion import GymCompletion, HyroxCompletion
+from .idempotency import idempotent
+from fitnessappbuild.pagination import KeysetPagination
+from user_stats.models import DirtyUser
+from user_stats.dirty import mark_dirty
+from user_stats.facts import rebuild_daily_facts
 
-from movement_summary_stats.tasks import recalc_movement_summaries
+from movement_summary_stats.performances import get_movement_history, refresh_recent_performances, workout_movement_ids
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -85,108 +90,54 @@ class SaveWorkoutView(APIView):
             return Response({'error': 'An error occurred while saving the workout'}, status=400)
 
     def _save_gym_workout(self, data, user):
-        # Determine workout number
-        if data.get('workout_number'):
-            workout_number = data['workout_number']  # Use provided workout_number for duplication
-        else:
-            workout_number = self._get_workout_number(user)  # Generate a new workout_number
+        return self._save_sectioned_workout(data, user, "Gym")
 
-        template_code = self._build_template_code(data)
+    def _save_hyrox_workout(self, data, user):
+        return self._save_sectioned_workout(data, user, "Hyrox")
 
-        # Process and save gym workout
-        workout = Workout.objects.create(
-            name=data['name'],
-            workout_code=template_code,
-            workout_number=workout_number,
-            description=data['description'],
-            duration=data['duration'],
-            complexity=data['complexity'],
-            status=data.get('status', 'Saved'),
-            scheduled_date=data.get('scheduled_date'),
-            owner=user,
-            activity_type="Gym",
-        )
+    def _save_sectioned_workout(self, data, user, activity_type):
+        """
+        Save a Gym or Hyrox workout. Every movement name and conditioning overview is
+        resolved up front in one batch each, then sections, conditioning rows and
+        section movements are inserted with bulk_create in dependency order.
+        """
+        sections_data = data['sections']
 
-        # Save sections and movements
-        for section_data in data['sections']:
-            section = Section.objects.create(
-                workout=workout,
-                section_type=section_data['section_type'],
-                section_name=section_data['section_name'],
-                section_order=section_data['section_order'],
-            )
+        # 1) Resolve and validate everything before writing anything
+        movement_map = resolve_movement_names(self._section_movement_names(sections_data))
 
-            # Check if the section is "Conditioning"
+        conditioning_overview_ids = []
+        for section_data in sections_data:
             if section_data['section_name'] == "Conditioning" and 'conditioning_workout' in section_data:
-                conditioning_workout = section_data['conditioning_workout']
-                conditioning_overview_id = conditioning_workout.get('conditioning_overview_id')
-
+                conditioning_overview_id = section_data['conditioning_workout'].get('conditioning_overview_id')
                 if conditioning_overview_id is None:  # Use None to check for missing values
                     return Response({"error": "conditioning_overview_id is required for Conditioning sections"}, status=400)
+                conditioning_overview_ids.append(conditioning_overview_id)
+
+        conditioning_overviews = ConditioningOverview.objects.in_bulk(conditioning_overview_ids)
+        for conditioning_overview_id in conditioning_overview_ids:
+            if conditioning_overview_id not in conditioning_overviews:
+                return Response(
+                    {'error': f"ConditioningOverview with ID {conditioning_overview_id} does not exist"},
+                    status=400
+                )
 
-                try:
-                    conditioning_overview = ConditioningOverview.objects.get(id=conditioning_overview_id)
-                except ConditioningOverview.DoesNotExist:
+        for section_data in sections_data:
+            for movement_data in self._section_movements_to_save(section_data):
+                if normalise_name(movement_data['movement_name']) not in movement_map:
                     return Response(
-                        {'error': f"ConditioningOverview with ID {conditioning_overview_id} does not exist"},
+                        {'error': f"Movement '{movement_data['movement_name']}' does not exist"},
                         status=400
                     )
 
-                # Create ConditioningWorkout
-                ConditioningWorkout.objects.create(
-                    section=section,
-                    conditioning_overview=conditioning_overview,
-                    comments=conditioning_workout.get('comments'),
-                    rpe=conditioning_workout.get('rpe'),
-                )
-
-                # Save Conditioning movements
-                for movement_data in conditioning_workout['movements']:
-                    try:
-                        movement = Movement.objects.get(exercise=movement_data['movement_name'])
-                    except Movement.DoesNotExist:
-                        return Response(
-                            {'error': f"Movement '{movement_data['movement_name']}' does not exist"},
-                            status=400
-                        )
-                    SectionMovement.objects.create(
-                        section=section,
-                        movements=movement,
-                        movement_order=movement_data['movement_order'],
-                    )
-            else:
-                # Save standard movements for non-conditioning sections
-                for movement_data in section_data['movements']:
-                    try:
-                        movement = Movement.objects.get(exercise=movement_data['movement_name'])
-                    except Movement.DoesNotExist:
-                        return Response(
-                            {'error': f"Movement '{movement_data['movement_name']}' does not exist"},
-                            status=400
-                        )
-                    SectionMovement.objects.create(
-                        section=section,
-                        movements=movement,
-                        movement_order=movement_data['movement_order'],
-                    )
-        
-        # schedule notification if required
-        self._create_scheduled_notification_if_needed(workout, user, data)
-
-        serialized_workout = PopulatedWorkoutSerializer(workout).data
-        return Response({'message': 'Gym workout saved successfully', 'workout': serialized_workout}, status=201)
-
-
-    def _save_hyrox_workout(self, data, user):
-        # Determine workout number
+        # 2) Create the workout
         if data.get('workout_number'):
             workout_number = data['workout_number']  # Use provided workout_number for duplication
         else:
             workout_number = self._get_workout_number(user)  # Generate a new workout_number
 
-        template_code = self._build_template_code(data)
+        template_code = self._build_template_code(data, movement_map)
 
-        # Process and save gym workout
         workout = Workout.objects.create(
             name=data['name'],
             workout_code=template_code,
@@ -197,79 +148,69 @@ class SaveWorkoutView(APIView):
             status=data.get('status', 'Saved'),
             scheduled_date=data.get('scheduled_date'),
             owner=user,
-            activity_type="Hyrox",
+            activity_type=activity_type,
         )
 
-        # Save sections and movements
-        for section_data in data['sections']:
-            section = Section.objects.create(
+        # 3) Sections first, so their IDs exist for the child rows
+        sections = Section.objects.bulk_create([
+            Section(
                 workout=workout,
                 section_type=section_data['section_type'],
                 section_name=section_data['section_name'],
                 section_order=section_data['section_order'],
             )
+            for section_data in sections_data
+        ])
 
-            # Check if the section is "Conditioning"
+        # 4) Conditioning rows and section movements
+        conditioning_workouts = []
+        section_movements = []
+        for section, section_data in zip(sections, sections_data):
             if section_data['section_name'] == "Conditioning" and 'conditioning_workout' in section_data:
                 conditioning_workout = section_data['conditioning_workout']
-                conditioning_overview_id = conditioning_workout.get('conditioning_overview_id')
-
-                if conditioning_overview_id is None:  # Use None to check for missing values
-                    return Response({"error": "conditioning_overview_id is required for Conditioning sections"}, status=400)
-
-                try:
-                    conditioning_overview = ConditioningOverview.objects.get(id=conditioning_overview_id)
-                except ConditioningOverview.DoesNotExist:
-                    return Response(
-                        {'error': f"ConditioningOverview with ID {conditioning_overview_id} does not exist"},
-                        status=400
+                conditioning_workouts.append(
+                    ConditioningWorkout(
+                        section=section,
+                        conditioning_overview=conditioning_overviews[conditioning_workout['conditioning_overview_id']],
+                        comments=conditioning_workout.get('comments'),
+                        rpe=conditioning_workout.get('rpe'),
                     )
-
-                # Create ConditioningWorkout
-                ConditioningWorkout.objects.create(
-                    section=section,
-                    conditioning_overview=conditioning_overview,
-                    comments=conditioning_workout.get('comments'),
-                    rpe=conditioning_workout.get('rpe'),
                 )
 
-                # Save Conditioning movements
-                for movement_data in conditioning_workout['movements']:
-                    try:
-                        movement = Movement.objects.get(exercise=movement_data['movement_name'])
-                    except Movement.DoesNotExist:
-                        return Response(
-                            {'error': f"Movement '{movement_data['movement_name']}' does not exist"},
-                            status=400
-                        )
-                    SectionMovement.objects.create(
-                        section=section,
-                        movements=movement,
-                        movement_order=movement_data['movement_order'],
-                    )
-            else:
-                # Save standard movements for non-conditioning sections
-                for movement_data in section_data['movements']:
-                    try:
-                        movement = Movement.objects.get(exercise=movement_data['movement_name'])
-                    except Movement.DoesNotExist:
-                        return Response(
-                            {'error': f"Movement '{movement_data['movement_name']}' does not exist"},
-                            status=400
-                        )
-                    SectionMovement.objects.create(
+            for movement_data in self._section_movements_to_save(section_data):
+                section_movements.append(
+                    SectionMovement(
                         section=section,
-                        movements=movement,
+                        movements_id=movement_map[normalise_name(movement_data['movement_name'])],
                         movement_order=movement_data['movement_order'],
                     )
-        
+                )
+
+        if conditioning_workouts:
+            ConditioningWorkout.objects.bulk_create(conditioning_workouts)
+        if section_movements:
+            SectionMovement.objects.bulk_create(section_movements)
+
         # schedule notification if required
         self._create_scheduled_notification_if_needed(workout, user, data)
 
-        serialized_workout = PopulatedWorkoutSerializer(workout).data
-        return Response({'message': 'Hyrox workout saved successfully', 'workout': serialized_workout}, status=201)
+        serialized_workout = PopulatedWorkoutSerializer(populated_workouts().get(id=workout.id)).data
+        return Response({'message': f'{activity_type} workout saved successfully', 'workout': serialized_workout}, status=201)
 
+    def _section_movements_to_save(self, section_data):
+        """The movement rows a section stores: the conditioning workout's, or the section's own."""
+        if section_data['section_name'] == "Conditioning" and 'conditioning_workout' in section_data:
+            return section_data['conditioning_workout']['movements']
+        return section_data['movements']
 
+    def _section_movement_names(self, sections):
+        """Every movement name referenced by the sections, conditioning included."""
+        names = set()
+        for section_data in sections:
+            if 'conditioning_workout' in section_data:
+                names.update(m['movement_name'] for m in section_data['conditioning_workout'].get('movements', []))
+            names.update(m['movement_name'] for m in section_data.get('movements', []))
+        return names
 
 
     def _save_running_workout(self, data, user):
@@ -347,7 +288,11 @@ class SaveWorkoutView(APIView):
         else:
             workout_number = self._get_workout_number(user)
 
-        template_code = self._build_template_code(data)
+        # Resolve every detail's movement name in one batch
+        movement_map = resolve_movement_names(
+            detail.get('movement_name', '') for detail in (data.get('mobility_sessions') or {}).get('saved_details', [])
+        )
+        template_code = self._build_template_code(data, movement_map)
 
         # Process and save mobility workout
         workout = Workout.objects.create(
@@ -380,21 +325,24 @@ class SaveWorkoutView(APIView):
         skipped_movements = []  # Track movements that are missing
 
         # Save mobility details (but skip missing movements)
+        details_to_create = []
         for detail_data in mobility_session_data.get('saved_details', []):
             movement_name = detail_data.get('movement_name').strip()  # Trim whitespace
 
-            try:
-                movement = Movement.objects.get(exercise__iexact=movement_name)  # Case-insensitive lookup
-            except Movement.DoesNotExist:
+            movement_id = movement_map.get(normalise_name(movement_name))  # Case-insensitive lookup
+            if movement_id is None:
                 skipped_movements.append(movement_name)
                 continue  # Skip this movement and move to the next one
 
-            SavedMobilityDetails.objects.create(
-                details=saved_mobility_session,
-                order=detail_data.get('order'),
-                duration=detail_data.get('duration'),
-                movements=movement,
+            details_to_create.append(
+                SavedMobilityDetails(
+                    details=saved_mobility_session,
+                    order=detail_data.get('order'),
+                    duration=detail_data.get('duration'),
+                    movements_id=movement_id,
+                )
             )
+        SavedMobilityDetails.objects.bulk_create(details_to_create)
 
         response_data = {'message': 'Mobility workout saved successfully', 'workout_id': workout.id}
 
@@ -421,6 +369,13 @@ class SaveWorkoutView(APIView):
         template_code = self._build_template_code(data)
 
         try:
+            # Check every referenced movement ID in one batch
+            valid_movement_ids = resolve_movement_ids([
+                movement_data.get('id')
+                for block_data in data.get('sections', [])
+                for movement_data in block_data['movements']
+            ])
+
             with transaction.atomic():
                 # print(f"🔄 Creating Workout Entry for {data['name']}...")
 
@@ -453,37 +408,39 @@ class SaveWorkoutView(APIView):
                 # print(f"✅ HIIT Workout Created: {hiit_workout.id} ({hiit_workout.workout_type})")
 
                 # Save HIIT blocks
-                for index, block_data in enumerate(data.get('sections', [])):
-                    # print(f"🔄 Creating HIIT Block {index + 1}: {block_data.get('block_name', f'Block {index + 1}')}...")
-
-                    hiit_block = SavedHIITDetails.objects.create(
+                hiit_blocks = SavedHIITDetails.objects.bulk_create([
+                    SavedHIITDetails(
                         hiit_workout=hiit_workout,
                         block_name=block_data.get('block_name', f"Block {index + 1}"),
                         rep_scheme=block_data.get('rep_scheme'),
                         order=index + 1
                     )
-                    # print(f"✅ HIIT Block Created: {hiit_block.id} ({hiit_block.block_name})")
+                    for index, block_data in enumerate(data.get('sections', []))
+                ])
 
-                    # Save movements within the block
+                # Save movements within each block
+                hiit_movements = []
+                for hiit_block, block_data in zip(hiit_blocks, data.get('sections', [])):
                     for order, movement_data in enumerate(block_data['movements']):
-                        # print(f"🔍 Fetching Movement ID {movement_data.get('id')}...")
-
-                        movement = Movement.objects.filter(id=movement_data.get('id')).first()
-                        if movement is None:
+                        movement_id = movement_data.get('id')
+                        try:
+                            movement_id = int(movement_id)
+                        except (TypeError, ValueError):
+                            movement_id = None
+                        if movement_id not in valid_movement_ids:
                             print(f"⚠️ WARNING: Movement ID {movement_data.get('id')} not found, setting to NULL.")
+                            movement_id = None
 
-                        try:
-                            hiit_movement = SavedHIITMovement.objects.create(
+                        hiit_movements.append(
+                            SavedHIITMovement(
                                 block=hiit_block,
-                                movements=movement,
+                                movements_id=movement_id,
                                 exercise_name=movement_data.get('exercise', 'Unknown Movement'),
                                 order=order + 1,
                                 rest_period=(movement_data.get('exercise') == 'Rest')  # Flagging rest periods
                             )
-                            # print(f"✅ HIIT Movement Created: {hiit_movement.exercise_name} (Block {hiit_block.block_name})")
-                        except Exception as e:
-                            print(f"❌ ERROR: Failed to create HIIT Movement ({movement_data.get('exercise')})")
-                            print(traceback.format_exc())  # ✅ Log the full stack trace
+                        )
+                SavedHIITMovement.objects.bulk_create(hiit_movements)
 
             # ✅ Successful Save
             serialized_workout = {
@@ -509,10 +466,11 @@ class SaveWorkoutView(APIView):
         last_workout = Workout.objects.filter(owner=user).order_by('-workout_number').first()
         return (last_workout.workout_number + 1) if last_workout else 1
 
-    def _gather_gym_movement_ids(self, sections):
+    def _gather_gym_movement_ids(self, sections, movement_map):
         """
         Go through the sections array and collect all Movement IDs
         in the order they appear, *excluding* Conditionings and Warm Ups.
+        `movement_map` is the resolved normalised name -> Movement ID lookup.
         """
         movement_ids = []
 
@@ -526,26 +484,20 @@ class SaveWorkoutView(APIView):
 
             # If it's "Conditioning," handle separately
             if section_name_lower == "conditioning" and 'conditioning_workout' in section_data:
-                cond_movements = section_data['conditioning_workout']['movements']
-                for mdata in cond_movements:
-                    try:
-                        mv = Movement.objects.get(exercise=mdata['movement_name'])
-                        movement_ids.append(mv.id)
-                    except Movement.DoesNotExist:
-                        pass
+                movements = section_data['conditioning_workout']['movements']
             else:
                 # Normal (non-warmup, non-conditioning) sections
-                for mdata in section_data['movements']:
-                    try:
-                        mv = Movement.objects.get(exercise=mdata['movement_name'])
-                        movement_ids.append(mv.id)
-                    except Movement.DoesNotExist:
-                        pass
+                movements = section_data['movements']
+
+            for mdata in movements:
+                mv_id = movement_map.get(normalise_name(mdata['movement_name']))
+                if mv_id:
+                    movement_ids.append(mv_id)
 
         return movement_ids
 
 
-    def _gather_mobility_pairs(self, data):
+    def _gather_mobility_pairs(self, data, movement_map=None):
         """
         Suppose you want M-{movementId}-{duration} for each item.
         We'll gather from data['mobility_sessions']['saved_details'].
@@ -553,18 +505,16 @@ class SaveWorkoutView(APIView):
         pairs = []
         mobility_session_data = data.get('mobility_sessions', {})
         saved_details = mobility_session_data.get('saved_details', [])
+        if movement_map is None:
+            movement_map = resolve_movement_names(d.get('movement_name', '') for d in saved_details)
         for detail_data in saved_details:
             movement_name = detail_data.get('movement_name', '').strip()
             duration = detail_data.get('duration', 0)
-            try:
-                mv = Movement.objects.get(exercise__iexact=movement_name)
-                pairs.append(mv.id)
+            mv_id = movement_map.get(normalise_name(movement_name))
+            if mv_id:
+                pairs.append(mv_id)
                 pairs.append(duration)
-            except Movement.DoesNotExist:
-                # If missing, skip or append placeholders
-                # pairs.append(0)
-                # pairs.append(duration)
-                pass
+            # If missing, skip (or append placeholders)
         return pairs
 
     def _gather_hiit_movement_ids(self, sections):
@@ -584,48 +534,43 @@ class SaveWorkoutView(APIView):
                     movement_ids.append(0)
         return movement_ids
 
-    def _gather_hyrox_movement_ids(self, sections):
+    def _gather_hyrox_movement_ids(self, sections, movement_map):
         movement_ids = []
 
         for section_data in sections:
             # If this section has a Conditioning workout, handle those movements:
             if section_data['section_name'].lower() == "conditioning" and 'conditioning_workout' in section_data:
-                cond_movements = section_data['conditioning_workout']['movements']
-                for mdata in cond_movements:
-                    try:
-                        mv = Movement.objects.get(exercise=mdata['movement_name'])
-                        movement_ids.append(mv.id)
-                    except Movement.DoesNotExist:
-                        # If you want, log or just ignore the missing movement
-                        pass
-
+                movements = section_data['conditioning_workout']['movements']
             else:
                 # Normal (non-conditioning) sections
-                for mdata in section_data.get('movements', []):
-                    try:
-                        mv = Movement.objects.get(exercise=mdata['movement_name'])
-                        movement_ids.append(mv.id)
-                    except Movement.DoesNotExist:
-                        pass
+                movements = section_data.get('movements', [])
+
+            for mdata in movements:
+                mv_id = movement_map.get(normalise_name(mdata['movement_name']))
+                if mv_id:
+                    movement_ids.append(mv_id)
 
         return movement_ids
 
 
-    def _build_template_code(self, data):
+    def _build_template_code(self, data, movement_map=None):
         workout_type = data['activity_type']
 
+        if workout_type in ('Gym', 'Hyrox') and movement_map is None:
+            movement_map = resolve_movement_names(self._section_movement_names(data['sections']))
+
         if workout_type == 'Running':
             session_data = data.get('running_sessions', {})
             code = f"R-{session_data.get('type', 'Intervals')}-{session_data.get('name','Unknown')}"
             return code
 
         elif workout_type == 'Gym':
-            movement_ids = self._gather_gym_movement_ids(data['sections'])
+            movement_ids = self._gather_gym_movement_ids(data['sections'], movement_map)
             code = "G-" + "-".join(str(mid) for mid in movement_ids)
             return code
 
         elif workout_type == 'Mobility':
-            pairs = self._gather_mobility_pairs(data)
+            pairs = self._gather_mobility_pairs(data, movement_map)
             code = "M-" + "-".join(str(x) for x in pairs)
             return code
 
@@ -636,7 +581,7 @@ class SaveWorkoutView(APIView):
             return code
         
         elif workout_type == 'Hyrox':
-            movement_ids = self._gather_hyrox_movement_ids(data['sections'])
+            movement_ids = self._gather_hyrox_movement_ids(data['sections'], movement_map)
             code = "Hy-" + "-".join(str(mid) for mid in movement_ids)
             return code
 
@@ -723,7 +668,12 @@ class SaveWorkoutView(APIView):
         
 # Show all workouts of all types
 class GetAllWorkoutsView(APIView):
+    """
+    All workouts for a user, newest first.
+    Pass `page_size` (and then `cursor`) to page through them by (created_at, id).
+    """
     # permission_classes = [IsAuthenticated]
+    pagination = KeysetPagination('created_at', descending=True)
 
     def get(self, request):
         user_id = request.query_params.get('user_id')  # Fetch the user_id from query params
@@ -732,6 +682,12 @@ class GetAllWorkoutsView(APIView):
         
         # Get all workouts for the user
         workouts = Workout.objects.filter(owner_id=user_id).order_by('-created_at')
+
+        if self.pagination.is_requested(request):
+            page, next_cursor = self.pagination.paginate_queryset(workouts, request)
+            serializer = WorkoutSerializer(page, many=True)
+            return self.pagination.get_paginated_response(serializer.data, next_cursor)
+
         serializer = WorkoutSerializer(workouts, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -740,7 +696,9 @@ class GetAllWorkoutsView(APIView):
 class GetUpcomingWorkouts(APIView):
     """
     View to get all workouts for a user.
+    Pass `page_size` (and then `cursor`) to page through scheduled workouts by (scheduled_date, id).
     """
+    pagination = KeysetPagination('scheduled_date')
 
     def get(self, request):
         user_id = request.query_params.get('user_id')  # Get user_id from query params
@@ -757,6 +715,13 @@ class GetUpcomingWorkouts(APIView):
             # Filter for only upcoming workouts (scheduled for a future date)
             workouts = workouts.filter(scheduled_date__gte=now().date()).order_by('scheduled_date')
 
+        if self.pagination.is_requested(request):
+            # Unscheduled workouts have no position in the (scheduled_date, id) order
+            workouts = workouts.filter(scheduled_date__isnull=False)
+            page, next_cursor = self.pagination.paginate_queryset(workouts, request)
+            serializer = WorkoutSerializer(page, many=True)
+            return self.pagination.get_paginated_response(serializer.data, next_cursor)
+
         if limit > 0:
             # Limit the number of workouts returned
             workouts = workouts[:limit]
@@ -765,6 +730,55 @@ class GetUpcomingWorkouts(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+# Compact per-day summary of a user's workouts between two dates
+class WorkoutCalendarView(APIView):
+    """
+    Returns `{start, end, days: [{date, workouts: [...]}]}` for `start`..`end` (inclusive,
+    YYYY-MM-DD). Only the fields the calendar renders are read, straight from the
+    (owner, scheduled_date) index; days without workouts are left out.
+    """
+
+    max_range_days = 93
+    summary_fields = ('id', 'name', 'activity_type', 'status', 'duration', 'workout_code', 'scheduled_date')
+
+    def get(self, request):
+        user_id = request.query_params.get('user_id')
+        if not user_id:
+            return Response({'error': 'User ID is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start = datetime.strptime(request.query_params['start'], '%Y-%m-%d').date()
+            end = datetime.strptime(request.query_params['end'], '%Y-%m-%d').date()
+        except (KeyError, ValueError):
+            return Response({'error': 'start and end are required as YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if end < start:
+            return Response({'error': 'end must not be before start'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start).days >= self.max_range_days:
+            return Response(
+                {'error': f'Date range cannot exceed {self.max_range_days} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = (
+            Workout.objects
+            .filter(owner_id=user_id, scheduled_date__range=(start, end))
+            .order_by('scheduled_date', 'id')
+            .values(*self.summary_fields)
+        )
+
+        days = {}
+        for row in rows:
+            scheduled_date = row.pop('scheduled_date')
+            days.setdefault(scheduled_date, []).append(row)
+
+        return Response({
+            'start': start,
+            'end': end,
+            'days': [{'date': day, 'workouts': workouts} for day, workouts in days.items()],
+        }, status=status.HTTP_200_OK)
+
+
 
 
 class GetSingleWorkoutView(APIView):
@@ -780,17 +794,7 @@ class GetSingleWorkoutView(APIView):
         try:
             # -- 1) Fetch the workout and sections
             try:
-                workout = Workout.objects.prefetch_related(
-                    Prefetch(
-                        'workout_sections__section_movement_details',
-                        queryset=SectionMovement.objects.prefetch_related('workout_sets')
-                    ),
-                    Prefetch(
-                        # We also prefetch the 'conditioning_elements' for each section
-                        'workout_sections__conditioning_elements',
-                        queryset=ConditioningWorkout.objects.select_related('conditioning_overview')
-                    )
-                ).select_related('owner').get(id=workout_id, owner=user_id)
+                workout = populated_workouts().select_related('owner').get(id=workout_id, owner=user_id)
             except Workout.DoesNotExist:
                 return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -798,136 +802,24 @@ class GetSingleWorkoutView(APIView):
             serializer = PopulatedWorkoutSerializer(workout)
             workout_data = serializer.data
 
-            # =======================================================
-            # MOVEMENT HISTORY (Unchanged)
-            # =======================================================
-            # A) Extract movement IDs
+            # -- 3) Movement and conditioning history, fetched for all IDs at once
             movement_ids = [
                 movement['movements']['id']
                 for section in workout_data['workout_sections']
                 for movement in section['section_movement_details']
                 if movement.get('movements')
             ]
+            cond_overview_ids = [
+                cond_item['conditioning_overview']['id']
+                for section in workout_data['workout_sections']
+                for cond_item in section.get('conditioning_elements', [])
+                if cond_item.get('conditioning_overview')
+            ]
 
-            # B) If no movements, just return
-            if not movement_ids:
-                return Response({
-                    "workout": workout_data,
-                    "movement_history": {},
-                    "conditioning_history": {}  # We'll also return an empty conditioning history
-                }, status=status.HTTP_200_OK)
-
-            # C) Build movement_history by fetching last 3 completed workouts for each movement
-            movement_history = {}
-
-            for movement_id in movement_ids:
-                last_3_workouts = (
-                    Workout.objects.filter(
-                        workout_sections__section_movement_details__movements__id=movement_id,
-                        owner=user_id,
-                        status="Completed"
-                    )
-                    .distinct()
-                    .order_by('-completed_date')[:3]
-                )
-
-                for w in last_3_workouts:
-                    workout_sets = Set.objects.filter(
-                        section_movement__movements__id=movement_id,
-                        section_movement__section__workout=w
-                    ).select_related(
-                        'section_movement__movements',
-                        'section_movement__section__workout'
-                    ).order_by('set_number')
-
-                    sets_data = [
-                        {
-                            "set_number": ws.set_number,
-                            "reps": ws.reps,
-                            "weight": ws.weight
-                        }
-                        for ws in workout_sets
-                    ]
-
-                    if movement_id not in movement_history:
-                        movement_history[movement_id] = []
-
-                    movement_history[movement_id].append({
-                        "workout_id": w.id,
-                        "completed_date": w.completed_date,
-                        "movement_difficulty": workout_sets[0].section_movement.movement_difficulty if workout_sets else None,
-                        "movement_comment": workout_sets[0].section_movement.movement_comment if workout_sets else None,
-                        "sets": sets_data
-                    })
-
-            # Sort each movement's history by date desc
-            for mid in movement_history:
-                movement_history[mid].sort(key=lambda x: x['completed_date'], reverse=True)
-
-            # =======================================================
-            # ### NEW for Conditioning: BUILD conditioning_history
-            # =======================================================
-            # A) Extract all conditioning_overview IDs
-            cond_overview_ids = []
-            for section in workout_data['workout_sections']:
-                for cond_item in section.get('conditioning_elements', []):
-                    overview = cond_item.get('conditioning_overview')
-                    if overview and overview.get('id'):
-                        cond_overview_ids.append(overview['id'])
-
-            # B) If no conditioning overviews, skip
-            if not cond_overview_ids:
-                return Response({
-                    "workout": workout_data,
-                    "movement_history": movement_history,
-                    "conditioning_history": {}
-                }, status=status.HTTP_200_OK)
-
-            # C) Build conditioning_history for each overview ID
-            conditioning_history = {}
-
-            for cond_id in cond_overview_ids:
-                last_3_cond_workouts = (
-                    Workout.objects.filter(
-                        workout_sections__conditioning_elements__conditioning_overview__id=cond_id,
-                        owner=user_id,
-                        status="Completed"
-                    )
-                    .distinct()
-                    .order_by('-completed_date')[:3]
-                )
+            movement_history = get_movement_history(user_id, movement_ids)
+            conditioning_history = build_conditioning_history(user_id, cond_overview_ids)
 
-                for w in last_3_cond_workouts:
-                    # You could store more details, e.g. comments, rpe, etc.
-                    # from the "ConditioningWorkout" row(s) if relevant.
-                    cond_entries = ConditioningWorkout.objects.filter(
-                        section__workout=w,
-                        conditioning_overview__id=cond_id
-                    ).select_related('conditioning_overview')
-
-                    # Example: build a summary
-                    entries_data = []
-                    for ce in cond_entries:
-                        entries_data.append({
-                            "comments": ce.comments,
-                            "rpe": ce.rpe,
-                            # "any other fields if you want"
-                        })
-
-                    if cond_id not in conditioning_history:
-                        conditioning_history[cond_id] = []
-
-                    conditioning_history[cond_id].append({
-                        "workout_id": w.id,
-                        "completed_date": w.completed_date,
-                        "entries": entries_data
-                    })
-
-            # Sort each cond_overview's history by date desc
-            for cid in conditioning_history:
-                conditioning_history[cid].sort(key=lambda x: x['completed_date'], reverse=True)
-
-            # -- 3) Return data
+            # -- 4) Return data
             return Response({
                 "workout": workout_data,
                 "movement_history": movement_history,
@@ -940,7 +832,6 @@ class GetSingleWorkoutView(APIView):
 
 
 
-
 class GetSingleHyroxWorkout(APIView):
     """
     Get a single workout and return all related workout details along with 
@@ -954,17 +845,7 @@ class GetSingleHyroxWorkout(APIView):
         try:
             # -- 1) Fetch the workout and sections
             try:
-                workout = Workout.objects.prefetch_related(
-                    Prefetch(
-                        'workout_sections__section_movement_details',
-                        queryset=SectionMovement.objects.prefetch_related('workout_sets')
-                    ),
-                    Prefetch(
-                        # We also prefetch the 'conditioning_elements' for each section
-                        'workout_sections__conditioning_elements',
-                        queryset=ConditioningWorkout.objects.select_related('conditioning_overview')
-                    )
-                ).select_related('owner').get(id=workout_id, owner=user_id)
+                workout = populated_workouts().select_related('owner').get(id=workout_id, owner=user_id)
             except Workout.DoesNotExist:
                 return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -972,136 +853,24 @@ class GetSingleHyroxWorkout(APIView):
             serializer = PopulatedWorkoutSerializer(workout)
             workout_data = serializer.data
 
-            # =======================================================
-            # MOVEMENT HISTORY (Unchanged)
-            # =======================================================
-            # A) Extract movement IDs
+            # -- 3) Movement and conditioning history, fetched for all IDs at once
             movement_ids = [
                 movement['movements']['id']
                 for section in workout_data['workout_sections']
                 for movement in section['section_movement_details']
                 if movement.get('movements')
             ]
+            cond_overview_ids = [
+                cond_item['conditioning_overview']['id']
+                for section in workout_data['workout_sections']
+                for cond_item in section.get('conditioning_elements', [])
+                if cond_item.get('conditioning_overview')
+            ]
 
-            # B) If no movements, just return
-            if not movement_ids:
-                return Response({
-                    "workout": workout_data,
-                    "movement_history": {},
-                    "conditioning_history": {}  # We'll also return an empty conditioning history
-                }, status=status.HTTP_200_OK)
-
-            # C) Build movement_history by fetching last 3 completed workouts for each movement
-            movement_history = {}
-
-            for movement_id in movement_ids:
-                last_3_workouts = (
-                    Workout.objects.filter(
-                        workout_sections__section_movement_details__movements__id=movement_id,
-                        owner=user_id,
-                        status="Completed"
-                    )
-                    .distinct()
-                    .order_by('-completed_date')[:3]
-                )
-
-                for w in last_3_workouts:
-                    workout_sets = Set.objects.filter(
-                        section_movement__movements__id=movement_id,
-                        section_movement__section__workout=w
-                    ).select_related(
-                        'section_movement__movements',
-                        'section_movement__section__workout'
-                    ).order_by('set_number')
-
-                    sets_data = [
-                        {
-                            "set_number": ws.set_number,
-                            "reps": ws.reps,
-                            "weight": ws.weight
-                        }
-                        for ws in workout_sets
-                    ]
-
-                    if movement_id not in movement_history:
-                        movement_history[movement_id] = []
-
-                    movement_history[movement_id].append({
-                        "workout_id": w.id,
-                        "completed_date": w.completed_date,
-                        "movement_difficulty": workout_sets[0].section_movement.movement_difficulty if workout_sets else None,
-                        "movement_comment": workout_sets[0].section_movement.movement_comment if workout_sets else None,
-                        "sets": sets_data
-                    })
-
-            # Sort each movement's history by date desc
-            for mid in movement_history:
-                movement_history[mid].sort(key=lambda x: x['completed_date'], reverse=True)
-
-            # =======================================================
-            # ### NEW for Conditioning: BUILD conditioning_history
-            # =======================================================
-            # A) Extract all conditioning_overview IDs
-            cond_overview_ids = []
-            for section in workout_data['workout_sections']:
-                for cond_item in section.get('conditioning_elements', []):
-                    overview = cond_item.get('conditioning_overview')
-                    if overview and overview.get('id'):
-                        cond_overview_ids.append(overview['id'])
-
-            # B) If no conditioning overviews, skip
-            if not cond_overview_ids:
-                return Response({
-                    "workout": workout_data,
-                    "movement_history": movement_history,
-                    "conditioning_history": {}
-                }, status=status.HTTP_200_OK)
-
-            # C) Build conditioning_history for each overview ID
-            conditioning_history = {}
-
-            for cond_id in cond_overview_ids:
-                last_3_cond_workouts = (
-                    Workout.objects.filter(
-                        workout_sections__conditioning_elements__conditioning_overview__id=cond_id,
-                        owner=user_id,
-                        status="Completed"
-                    )
-                    .distinct()
-                    .order_by('-completed_date')[:3]
-                )
+            movement_history = get_movement_history(user_id, movement_ids)
+            conditioning_history = build_conditioning_history(user_id, cond_overview_ids)
 
-                for w in last_3_cond_workouts:
-                    # You could store more details, e.g. comments, rpe, etc.
-                    # from the "ConditioningWorkout" row(s) if relevant.
-                    cond_entries = ConditioningWorkout.objects.filter(
-                        section__workout=w,
-                        conditioning_overview__id=cond_id
-                    ).select_related('conditioning_overview')
-
-                    # Example: build a summary
-                    entries_data = []
-                    for ce in cond_entries:
-                        entries_data.append({
-                            "comments": ce.comments,
-                            "rpe": ce.rpe,
-                            # "any other fields if you want"
-                        })
-
-                    if cond_id not in conditioning_history:
-                        conditioning_history[cond_id] = []
-
-                    conditioning_history[cond_id].append({
-                        "workout_id": w.id,
-                        "completed_date": w.completed_date,
-                        "entries": entries_data
-                    })
-
-            # Sort each cond_overview's history by date desc
-            for cid in conditioning_history:
-                conditioning_history[cid].sort(key=lambda x: x['completed_date'], reverse=True)
-
-            # -- 3) Return data
+            # -- 4) Return data
             return Response({
                 "workout": workout_data,
                 "movement_history": movement_history,
@@ -1128,19 +897,7 @@ class GetSingleRunningWorkoutView(APIView):
         try:
             # Fetch the main workout
             try:
-                workout = Workout.objects.prefetch_related(
-                    Prefetch(
-                        'running_sessions',
-                        queryset=SavedRunningSession.objects.prefetch_related(
-                            Prefetch(
-                                'saved_intervals',
-                                queryset=SavedRunningInterval.objects.prefetch_related(
-                                    'split_times'
-                                )
-                            )
-                        )
-                    )
-                ).get(id=workout_id, owner=user_id)
+                workout = populated_workouts().get(id=workout_id, owner=user_id)
             except Workout.DoesNotExist:
                 return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1157,24 +914,24 @@ class GetSingleRunningWorkoutView(APIView):
 
             # Fetch last 3 workouts with the same description
             try:
-                similar_workouts = Workout.objects.filter(
+                similar_workouts = workout_history("Running").filter(
                     owner=user_id,
                     activity_type="Running",
                     description=workout.description,  # Match on description
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
-                similar_workouts_data = PopulatedWorkoutSerializer(similar_workouts, many=True).data
+                similar_workouts_data = RunningHistorySerializer(similar_workouts, many=True).data
             except Exception as e:
                 return Response({'error': f'Error fetching similar workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # Fetch last 3 running workouts generally
             try:
-                recent_running_workouts = Workout.objects.filter(
+                recent_running_workouts = workout_history("Running").filter(
                     owner=user_id,
                     activity_type="Running",
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
-                recent_running_workouts_data = PopulatedWorkoutSerializer(recent_running_workouts, many=True).data
+                recent_running_workouts_data = RunningHistorySerializer(recent_running_workouts, many=True).data
             except Exception as e:
                 return Response({'error': f'Error fetching recent running workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1203,17 +960,7 @@ class GetSingleMobilityWorkoutView(APIView):
         try:
             # Fetch the main workout
             try:
-                workout = Workout.objects.prefetch_related(
-                    Prefetch(
-                        'mobility_sessions',
-                        queryset=SavedMobilitySession.objects.prefetch_related(
-                            Prefetch(
-                                'mobility_details',
-                                queryset=SavedMobilityDetails.objects.select_related('movements')
-                            )
-                        )
-                    )
-                ).get(id=workout_id, owner=user_id)
+                workout = populated_workouts().get(id=workout_id, owner=user_id)
 
                 print(f"Fetched Workout: {workout}")
                 print(f"Workout Activity Type: {workout.activity_type}")
@@ -1267,24 +1014,24 @@ class GetSingleMobilityWorkoutView(APIView):
 
             # Fetch last 3 workouts with the same description
             try:
-                similar_workouts = Workout.objects.filter(
+                similar_workouts = workout_history("Mobility").filter(
                     owner=user_id,
                     activity_type="Mobility",
                     description=workout.description,  # Match on description
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
-                similar_workouts_data = PopulatedWorkoutSerializer(similar_workouts, many=True).data
+                similar_workouts_data = MobilityHistorySerializer(similar_workouts, many=True).data
             except Exception as e:
                 return Response({'error': f'Error fetching similar workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # Fetch last 3 mobility workouts generally
             try:
-                recent_mobility_workouts = Workout.objects.filter(
+                recent_mobility_workouts = workout_history("Mobility").filter(
                     owner=user_id,
                     activity_type="Mobility",
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
-                recent_mobility_workouts_data = PopulatedWorkoutSerializer(recent_mobility_workouts, many=True).data
+                recent_mobility_workouts_data = MobilityHistorySerializer(recent_mobility_workouts, many=True).data
             except Exception as e:
                 return Response({'error': f'Error fetching recent mobility workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -1315,22 +1062,7 @@ class GetSingleHiitWorkoutView(APIView):
         try:
             # Fetch the main HIIT workout
             try:
-                workout = Workout.objects.prefetch_related(
-                    Prefetch(
-                        'hiit_sessions',
-                        queryset=SavedHIITWorkout.objects.prefetch_related(
-                            Prefetch(
-                                'hiit_details',
-                                queryset=SavedHIITDetails.objects.prefetch_related(
-                                    Prefetch(
-                                        'hiit_movements',
-                                        queryset=SavedHIITMovement.objects.select_related('movements')
-                                    )
-                                )
-                            )
-                        )
-                    )
-                ).get(id=workout_id, owner=user_id)
+                workout = populated_workouts().get(id=workout_id, owner=user_id)
 
                 print(f"✅ Fetched HIIT Workout: {workout.name} (ID: {workout.id})")
 
@@ -1351,27 +1083,27 @@ class GetSingleHiitWorkoutView(APIView):
 
             # Fetch last 3 workouts with the same workout number
             try:
-                similar_workouts = Workout.objects.filter(
+                similar_workouts = workout_history("Hiit").filter(
                     owner=user_id,
                     activity_type="Hiit",
                     workout_number=workout.workout_number,
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
 
-                similar_workouts_data = PopulatedWorkoutSerializer(similar_workouts, many=True).data
+                similar_workouts_data = HiitHistorySerializer(similar_workouts, many=True).data
                 print(f"✅ Found {len(similar_workouts_data)} similar HIIT workouts")
             except Exception as e:
                 return Response({'error': f'Error fetching similar HIIT workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
             # Fetch last 3 HIIT workouts generally
             try:
-                recent_hiit_workouts = Workout.objects.filter(
+                recent_hiit_workouts = workout_history("Hiit").filter(
                     owner=user_id,
                     activity_type="Hiit",
                     status="Completed"
                 ).exclude(id=workout.id).order_by('-completed_date')[:3]
 
-                recent_hiit_workouts_data = PopulatedWorkoutSerializer(recent_hiit_workouts, many=True).data
+                recent_hiit_workouts_data = HiitHistorySerializer(recent_hiit_workouts, many=True).data
                 print(f"✅ Found {len(recent_hiit_workouts_data)} recent HIIT workouts")
             except Exception as e:
                 return Response({'error': f'Error fetching recent HIIT workouts: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -1411,6 +1143,10 @@ class UpdateWorkoutStatusView(APIView):
         workout.status = new_status
         workout.save()
 
+        if new_status == 'Completed':
+            mark_dirty([workout.owner_id], DirtyUser.STATS)
+            rebuild_daily_facts(workout.owner_id, [workout.completed_date])
+
         return Response({'message': f'Workout status updated to {new_status}'}, status=status.HTTP_200_OK)
 
 
@@ -1427,9 +1163,21 @@ class DeleteWorkoutView(APIView):
         except Workout.DoesNotExist:
             return Response({'error': 'Workout not found'}, status=status.HTTP_404_NOT_FOUND)
 
+        # Remember which movement histories this workout contributed to
+        owner_id = workout.owner_id
+        was_completed = workout.status == 'Completed'
+        completed_date = workout.completed_date
+        movement_ids = workout_movement_ids([workout.id]) if was_completed else []
+
         # Delete the workout
         workout.delete()
 
+        if owner_id and movement_ids:
+            refresh_recent_performances(owner_id, movement_ids)
+        if owner_id and was_completed:
+            mark_dirty([owner_id], DirtyUser.STATS)
+            rebuild_daily_facts(owner_id, [completed_date])
+
         return Response({'message': 'Workout deleted successfully'}, status=status.HTTP_200_OK)
 
 
@@ -1466,203 +1214,14 @@ class UpdateWorkoutDateView(APIView):
 
 
 class CompleteWorkoutAPIView(APIView):
+    @idempotent
     def put(self, request, workout_id):
         user_id = request.query_params.get('user_id')
 
         try:
             logger.info(f"Starting completion process for workout_id: %s, user_id: %s", workout_id, user_id)
 
-            # 1️⃣ --- Get User Object ---
-            user = User.objects.get(id=user_id)
-
-            # 2️⃣ --- Update Workout Status ---
-            workout = Workout.objects.get(id=workout_id, owner=user)
-            scheduled_date = request.data.get('scheduled_date')
-
-            workout.status = 'Completed'
-            workout.completed_date = scheduled_date if scheduled_date else now().date()
-            workout.save()
-
-            # 3️⃣ --- Award Points for Workout Completion (50 points) ---
-            leaderboard, _ = Leaderboard.objects.get_or_create(user=user)
-            if not ScoreLog.objects.filter(user=user, workout_id=workout.id, score_type='Workout Completion').exists():
-
-                ScoreLog.objects.create(
-                    user=user,
-                    score_type='Workout Completion',
-                    score_value=50,
-                    workout_id=workout.id
-                )
-
-            # 4️⃣ --- Process Sections and Movements (same as before) ---
-            sections_data = request.data.get('sections', [])
-            section_ids = [section['section_id'] for section in sections_data]
-            
-            sections = Section.objects.filter(id__in=section_ids, workout=workout).select_related('workout')
-            movements = SectionMovement.objects.filter(section__in=sections).select_related('section')
-            existing_sets = Set.objects.filter(section_movement__in=movements).select_related('section_movement')
-
-            # Create mappings for fast lookup of existing 'Set' objects
-            existing_sets_map = {
-                (set_instance.section_movement_id, set_instance.set_number): set_instance
-                for set_instance in existing_sets
-            }
-
-            movements_to_update = []
-            new_sets = []
-            sets_to_update = []
-            conditioning_updates = []  # For bulk updating ConditioningWorkout entries
-
-            # NEW: We want to avoid duplicates in StrengthSet by updating instead of always creating.
-            performed_date = scheduled_date if scheduled_date else now().date()
-            
-            # Gather existing StrengthSet rows for (this user, this workout, this date)
-            existing_strengthsets = StrengthSet.objects.filter(
-                owner=user,
-                workout=workout,
-                performed_date=performed_date
-            ).select_related('movement')
-
-            # Key = (movement_id, set_number), Value = StrengthSet instance
-            existing_strengthsets_map = {
-                (sset.movement_id, sset.set_number): sset
-                for sset in existing_strengthsets
-            }
-
-            new_strength_sets = []
-            strength_sets_to_update = []
-
-            # We'll track how many "strength" movements exist and how many are "fully logged"
-            strength_keywords = ["strong", "build", "pump"]  # case-insensitive
-            strength_movements_count = 0
-            strength_fully_logged_count = 0
-
-            for section_data in sections_data:
-                # Update conditioning workouts
-                if 'conditioning_workouts' in section_data:
-                    for conditioning_data in section_data['conditioning_workouts']:
-                        conditioning_id = conditioning_data.get('conditioning_id')
-                        conditioning_instance = ConditioningWorkout.objects.filter(id=conditioning_id).first()
-                        if conditioning_instance:
-                            conditioning_instance.comments = conditioning_data.get('comments', conditioning_instance.comments)
-                            conditioning_instance.rpe = conditioning_data.get('rpe', conditioning_instance.rpe)
-                            conditioning_updates.append(conditioning_instance)
-
-                # Update standard movements (sets)
-                for movement_data in section_data.get('movements', []):
-                    movement_id = movement_data.get('movement_id')
-                    movement = next((m for m in movements if m.id == movement_id), None)
-                    
-                    if not movement:
-                        continue
-
-                    # Optionally update the movement difficulty/comment
-                    movement.movement_difficulty = movement_data.get('movement_difficulty', movement.movement_difficulty)
-                    movement.movement_comment = movement_data.get('movement_comments', movement.movement_comment)
-                    movements_to_update.append(movement)
-
-                    # Determine if this movement belongs to a "strength" section
-                    section_obj = movement.section  # from .select_related('section')
-                    section_name_lower = section_obj.section_name.lower() if section_obj.section_name else ""
-                    is_strength_section = any(kw in section_name_lower for kw in strength_keywords)
-
-                    # We'll track if this movement is "fully logged" if it has at least one set with reps>0, weight>0
-                    movement_has_valid_set = False
-
-                    # Process sets
-                    for set_data in movement_data.get('sets', []):
-                        reps = set_data.get('reps') or 0
-                        weight = set_data.get('weight') or 0
-                        set_number = set_data.get('set_number')
-
-                        # Update or create the standard 'Set'
-                        existing_set = existing_sets_map.get((movement_id, set_number))
-                        if existing_set:
-                            existing_set.reps = reps
-                            existing_set.weight = weight
-                            sets_to_update.append(existing_set)
-                        else:
-                            new_sets.append(
-                                Set(
-                                    section_movement=movement,
-                                    set_number=set_number,
-                                    reps=reps,
-                                    weight=weight
-                                )
-                            )
-
-                        # If any set has reps>0 and weight>0, we consider this movement "fully logged"
-                        if reps > 0 and weight > 0:
-                            movement_has_valid_set = True
-
-                        # NEW: Avoid duplicates for StrengthSet
-                        if is_strength_section and movement.movements:
-                            key = (movement.movements.id, set_number)
-                            existing_strength_set = existing_strengthsets_map.get(key)
-
-                            # If you'd like to tie RPE to movement_difficulty (or from set_data), do so:
-                            derived_rpe = movement_data.get('movement_difficulty', movement.movement_difficulty)
-
-                            load_value = (weight or 0) * (reps or 0)  # Manually calculate total load
-
-                            if existing_strength_set:
-                                # Overwrite existing
-                                existing_strength_set.reps = reps
-                                existing_strength_set.weight = weight
-                                existing_strength_set.rpe = derived_rpe
-                                existing_strength_set.load = load_value
-                                strength_sets_to_update.append(existing_strength_set)
-                            else:
-                                # Create new StrengthSet
-                                new_sset = StrengthSet(
-                                    owner=user,
-                                    movement=movement.movements,  # "movement.movements" is your actual Movement instance
-                                    workout=workout,
-                                    performed_date=performed_date,
-                                    set_number=set_number,
-                                    reps=reps,
-                                    weight=weight,
-                                    rpe=derived_rpe,
-                                    load=load_value
-                                )
-                                new_strength_sets.append(new_sset)
-
-                    # If this is a "strength" section's movement
-                    if is_strength_section:
-                        strength_movements_count += 1
-                        if movement_has_valid_set:
-                            strength_fully_logged_count += 1
-
-            # Save sets and conditioning updates
-            if movements_to_update:
-                SectionMovement.objects.bulk_update(movements_to_update, ['movement_difficulty', 'movement_comment'])
-            
-            if new_sets:
-                Set.objects.bulk_create(new_sets)
-            if sets_to_update:
-                Set.objects.bulk_update(sets_to_update, ['reps', 'weight'])
-            if conditioning_updates:
-                ConditioningWorkout.objects.bulk_update(conditioning_updates, ['comments', 'rpe'])
-
-            # NEW: Bulk create / update for StrengthSet
-            if new_strength_sets:
-                StrengthSet.objects.bulk_create(new_strength_sets)
-            if strength_sets_to_update:
-                StrengthSet.objects.bulk_update(strength_sets_to_update, ['reps', 'weight', 'rpe', 'load'])
-
-            recalc_movement_summaries.delay(user_id)
-
-            # Award 20 points if everything is logged
-            if strength_movements_count > 0 and (strength_fully_logged_count == strength_movements_count):
-                # Avoid double awarding if they've completed this before
-                if not ScoreLog.objects.filter(user=user, workout_id=workout.id, score_type='Full Strength Logging').exists():
-                    leaderboard.save()
-                    ScoreLog.objects.create(
-                        user=user,
-                        score_type='Full Strength Logging',
-                        score_value=20,
-                        workout_id=workout.id
-                    )
+            GymCompletion(user_id, workout_id, request.data).run()
 
             logger.info("Workout with id %s completed successfully for user %s", workout_id, user_id)
             return Response({'message': 'Workout completed successfully!'}, status=200)
@@ -1672,140 +1231,19 @@ class CompleteWorkoutAPIView(APIView):
             return Response({'error': str(e)}, status=500)
 
 
-
 class CompleteHyroxAPIView(APIView):
+    @idempotent
     def put(self, request, workout_id):
         user_id = request.query_params.get('user_id')
 
         try:
             logger.info(f"Starting completion process for workout_id: {workout_id}, user_id: {user_id}")
 
-            # 1️⃣ --- Get User Object ---
-            user = User.objects.get(id=user_id)
-
-            # 2️⃣ --- Update Workout Status ---
-            workout = Workout.objects.get(id=workout_id, owner=user)
-            scheduled_date = request.data.get('scheduled_date')
-            workout.status = 'Completed'
-            workout.completed_date = scheduled_date if scheduled_date else now().date()
-            workout.save()
-
-            # 3️⃣ --- Award Points for Workout Completion (50 points) ---
-            leaderboard, _ = Leaderboard.objects.get_or_create(user=user)
-            if not ScoreLog.objects.filter(user=user, workout_id=workout.id, score_type='Workout Completion').exists():
-                ScoreLog.objects.create(
-                    user=user,
-                    score_type='Workout Completion',
-                    score_value=50,
-                    workout_id=workout.id
-                )
-
-            # 4️⃣ --- Process Sections and Movements (same as before) ---
-            sections_data = request.data.get('sections', [])
-            section_ids = [section['section_id'] for section in sections_data]
-            
-            sections = Section.objects.filter(id__in=section_ids, workout=workout).select_related('workout')
-            movements = SectionMovement.objects.filter(section__in=sections).select_related('section')
-            existing_sets = Set.objects.filter(section_movement__in=movements).select_related('section_movement')
-
-            # Create mappings for fast lookup
-            existing_sets_map = {
-                (set_instance.section_movement_id, set_instance.set_number): set_instance
-                for set_instance in existing_sets
-            }
-
-            new_sets = []
-            sets_to_update = []
-            conditioning_updates = []  # For bulk updating ConditioningWorkout entries
-
-            # We will track how many "strength" movements exist and how many are "fully logged"
-            strength_keywords = ["strong", "build", "pump"]  # case-insensitive
-            strength_movements_count = 0
-            strength_fully_logged_count = 0
-
-            for section_data in sections_data:
-                # Update conditioning workouts
-                if 'conditioning_workouts' in section_data:
-                    for conditioning_data in section_data['conditioning_workouts']:
-                        conditioning_id = conditioning_data.get('conditioning_id')
-                        conditioning_instance = ConditioningWorkout.objects.filter(id=conditioning_id).first()
-                        if conditioning_instance:
-                            conditioning_instance.comments = conditioning_data.get('comments', conditioning_instance.comments)
-                            conditioning_instance.rpe = conditioning_data.get('rpe', conditioning_instance.rpe)
-                            conditioning_updates.append(conditioning_instance)
-
-                # Update standard movements (sets)
-                for movement_data in section_data.get('movements', []):
-                    movement_id = movement_data.get('movement_id')
-                    movement = next((m for m in movements if m.id == movement_id), None)
-                    
-                    if not movement:
-                        continue
-
-                    # Determine if this movement belongs to a "strength" section
-                    section_obj = movement.section  # from .select_related('section')
-                    section_name_lower = section_obj.section_name.lower() if section_obj.section_name else ""
-                    is_strength_section = any(kw in section_name_lower for kw in strength_keywords)
-
-                    # We'll track if this movement is "fully logged" if it has at least one set with reps>0, weight>0
-                    movement_has_valid_set = False
-
-                    # Process sets
-                    for set_data in movement_data.get('sets', []):
-                        reps = set_data.get('reps') or 0
-                        weight = set_data.get('weight') or 0
-                        set_number = set_data.get('set_number')
-
-                        existing_set = existing_sets_map.get((movement_id, set_number))
-                        if existing_set:
-                            # Update existing set
-                            existing_set.reps = reps
-                            existing_set.weight = weight
-                            sets_to_update.append(existing_set)
-                        else:
-                            # Create new set
-                            new_sets.append(
-                                Set(
-                                    section_movement=movement,
-                                    set_number=set_number,
-                                    reps=reps,
-                                    weight=weight
-                                )
-                            )
-
-                        # If any set has reps>0 and weight>0, we consider this movement "fully logged"
-                        if reps > 0 and weight > 0:
-                            movement_has_valid_set = True
-
-                    # If this is a "strength" section's movement
-                    if is_strength_section:
-                        # Count total strength movements
-                        strength_movements_count += 1
-                        if movement_has_valid_set:
-                            strength_fully_logged_count += 1
-
-            # Save sets and conditioning updates
-            if new_sets:
-                Set.objects.bulk_create(new_sets)
-            if sets_to_update:
-                Set.objects.bulk_update(sets_to_update, ['reps', 'weight'])
-            if conditioning_updates:
-                ConditioningWorkout.objects.bulk_update(conditioning_updates, ['comments', 'rpe'])
-
-            # 5️⃣ --- NEW: Award Single +20 If ALL "Strength" Movements Are Fully Logged ---
-            if strength_movements_count > 0 and (strength_fully_logged_count == strength_movements_count):
-                # Avoid double awarding if they've completed this before
-                if not ScoreLog.objects.filter(user=user, workout_id=workout.id, score_type='Full Strength Logging').exists():
-                    ScoreLog.objects.create(
-                        user=user,
-                        score_type='Full Strength Logging',
-                        score_value=20,
-                        workout_id=workout.id
-                    )
+            HyroxCompletion(user_id, workout_id, request.data).run()
 
             logger.info(f"Workout with id {workout_id} completed successfully for user {user_id}")
             return Response({'message': 'Workout completed successfully!'}, status=200)
         
         except Exception as e:
-            logger.exception(f"Unexpected error in CompleteWorkoutAPIView for workout_id {workout_id}: {e}")
+            logger.exception(f"Unexpected error in CompleteHyroxAPIView for workout_id {workout_id}: {e}")
             return Response({'error': str(e)}, status=500)
@@ -0,0 +1,68 @@
+from functools import partial
+
+from django.db import connection, transaction
+from django.utils.timezone import now, localdate
+
+from leaderboard.backends import record_points
+from user_stats.models import DirtyUser
+from user_stats.dirty import mark_dirty
+from .models import ScoreLog, DailyScoreRollup
+
+
+def award_points(user_id, workout_id, awards):
+    """
+    Award points for a workout in a single statement.
+
+    `awards` is an iterable of (score_type, score_value). Rows are inserted with
+    ON CONFLICT DO NOTHING against the (user, workout_id, score_type) unique
+    constraint, so an award already given (or given by a concurrent retry) is
+    skipped without reading first.
+
+    Returns the [(score_type, score_value)] actually inserted. Their points are
+    added to the user's DailyScoreRollup for today (marking their leaderboard row
+    dirty), and to the leaderboard backend (if configured) once the transaction commits.
+    """
+    awards = list(dict(awards).items())  # One row per score type
+    if not awards:
+        return []
+
+    quote = connection.ops.quote_name
+    table = quote(ScoreLog._meta.db_table)
+    columns = ', '.join(quote(column) for column in ('user_id', 'workout_id', 'score_type', 'score_value', 'timestamp'))
+    conflict = ', '.join(quote(column) for column in ('user_id', 'workout_id', 'score_type'))
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(awards))
+
+    awarded_at = now()
+    timestamp = connection.ops.adapt_datetimefield_value(awarded_at)
+    params = []
+    for score_type, score_value in awards:
+        params.extend([user_id, workout_id, score_type, score_value, timestamp])
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+            f"ON CONFLICT ({conflict}) DO NOTHING "
+            f"RETURNING {quote('score_type')}, {quote('score_value')}",
+            params,
+        )
+        inserted = [tuple(row) for row in cursor.fetchall()]
+
+    if inserted:
+        points = sum(score_value for _, score_value in inserted)
+        _add_to_rollup(user_id, localdate(awarded_at), points)
+        mark_dirty([user_id], DirtyUser.LEADERBOARD)
+        transaction.on_commit(partial(record_points, user_id, points), robust=True)
+    return inserted
+
+
+def _add_to_rollup(user_id, day, points):
+    """Increment (or start) the user's rollup row for `day` in one statement."""
+    quote = connection.ops.quote_name
+    table = quote(DailyScoreRollup._meta.db_table)
+    score = quote('score')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({quote('user_id')}, {quote('day')}, {score}) VALUES (%s, %s, %s) "
+            f"ON CONFLICT ({quote('user_id')}, {quote('day')}) DO UPDATE SET {score} = {table}.{score} + EXCLUDED.{score}",
+            [user_id, connection.ops.adapt_datefield_value(day), points],
+        )
@@ -0,0 +1,60 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from score_logging.models import ScoreLog, DailyScoreRollup
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild DailyScoreRollup rows from ScoreLog. Rollups for the rebuilt days are "
+        "replaced; use --since to leave days whose ScoreLog rows were archived untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only rebuild days from this date (YYYY-MM-DD).")
+        parser.add_argument('--user-id', type=int, help="Only backfill this user.")
+
+    def handle(self, *args, **options):
+        logs = ScoreLog.objects.all()
+        rollups = DailyScoreRollup.objects.all()
+        if options.get('since'):
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+            logs = logs.filter(timestamp__date__gte=since)
+            rollups = rollups.filter(day__gte=since)
+        if options.get('user_id'):
+            logs = logs.filter(user_id=options['user_id'])
+            rollups = rollups.filter(user_id=options['user_id'])
+
+        days = (
+            logs
+            .annotate(day=TruncDate('timestamp'))
+            .values_list('user_id', 'day')
+            .annotate(score=Sum('score_value'))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            # Replace the rollups in scope outright, so removed ScoreLog rows stop counting
+            rollups.delete()
+            written = 0
+            batch = []
+            for user_id, day, score in days.iterator(chunk_size=BATCH_SIZE):
+                batch.append(DailyScoreRollup(user_id=user_id, day=day, score=score))
+                if len(batch) >= BATCH_SIZE:
+                    DailyScoreRollup.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                DailyScoreRollup.objects.bulk_create(batch)
+                written += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete: {written} daily rollups written."))
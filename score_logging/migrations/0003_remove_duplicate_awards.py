@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def remove_duplicate_awards(apps, schema_editor):
+    """Keep the earliest ScoreLog of each (user, workout_id, score_type) so the unique constraint can be added."""
+    ScoreLog = apps.get_model("score_logging", "ScoreLog")
+
+    duplicates = (
+        ScoreLog.objects
+        .filter(workout_id__isnull=False)
+        .values("user_id", "workout_id", "score_type")
+        .annotate(first_id=Min("id"), awards=Count("id"))
+        .filter(awards__gt=1)
+    )
+    for duplicate in duplicates:
+        ScoreLog.objects.filter(
+            user_id=duplicate["user_id"],
+            workout_id=duplicate["workout_id"],
+            score_type=duplicate["score_type"],
+        ).exclude(id=duplicate["first_id"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("score_logging", "0002_scorelog_section_movement_id_scorelog_workout_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_awards, migrations.RunPython.noop),
+    ]
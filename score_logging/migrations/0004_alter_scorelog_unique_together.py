@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:08
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("score_logging", "0003_remove_duplicate_awards"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="scorelog",
+            unique_together={("user", "workout_id", "score_type")},
+        ),
+    ]
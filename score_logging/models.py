@@ -14,6 +14,31 @@ class ScoreLog(models.Model):
     workout_id = models.IntegerField(blank=True, null=True)  
     section_movement_id = models.IntegerField(blank=True, null=True)
 
+    class Meta:
+        # One award of each type per workout; see score_logging.awards.award_points
+        unique_together = ('user', 'workout_id', 'score_type')
 
     def __str__(self):
         return f"{self.user.username} - {self.score_type} - {self.score_value} points"
+
+
+class DailyScoreRollup(models.Model):
+    """
+    A user's points per day, kept in step with ScoreLog by `award_points`.
+    Leaderboard windows and totals are summed from these rows, so reading a month
+    touches at most 31 rows per user and old ScoreLog rows can be archived.
+    Rebuild with `manage.py backfill_score_rollups`.
+    """
+    user = models.ForeignKey(
+        'jwt_auth.User',
+        on_delete=models.CASCADE,
+        related_name='daily_score_rollups'
+    )
+    day = models.DateField(db_index=True)
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'day')
+
+    def __str__(self):
+        return f"{self.user.username} - {self.day}: {self.score} points"
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movements", "0014_movement_movement_exercise_lower_idx"),
+        ("saved_workouts", "0012_workout_workout_owner_created_idx_and_more"),
+        (
+            "strength_records",
+            "0002_alter_strengthset_reps_alter_strengthset_rpe_and_more",
+        ),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="strengthset",
+            index=models.Index(
+                fields=["owner", "movement", "performed_date", "id"],
+                include=("set_number", "reps", "weight", "rpe", "load", "workout"),
+                name="strengthset_history_idx",
+            ),
+        ),
+    ]
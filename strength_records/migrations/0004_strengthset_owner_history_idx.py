@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("movements", "0014_movement_movement_exercise_lower_idx"),
+        ("saved_workouts", "0013_completionevent_previous_completed_date"),
+        ("strength_records", "0003_strengthset_strengthset_history_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="strengthset",
+            index=models.Index(
+                fields=["owner", "performed_date", "id"],
+                name="strengthset_owner_history_idx",
+            ),
+        ),
+    ]
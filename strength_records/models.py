@@ -33,6 +33,18 @@ class StrengthSet(models.Model):
     # total load (weight * reps)
     load = models.FloatField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset-paged set history of one movement; covers the listed columns (Postgres INCLUDE)
+            models.Index(
+                fields=['owner', 'movement', 'performed_date', 'id'],
+                include=['set_number', 'reps', 'weight', 'rpe', 'load', 'workout'],
+                name='strengthset_history_idx',
+            ),
+            # Keyset-paged set history across all of a user's movements
+            models.Index(fields=['owner', 'performed_date', 'id'], name='strengthset_owner_history_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if self.weight and self.reps:
             self.load = self.weight * self.reps
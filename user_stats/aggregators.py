@@ -3,9 +3,16 @@ from saved_workouts.models import Workout
 from workout_sections.models import Section
 from workout_section_movement.models import SectionMovement
 from movements.models import Movement
-from django.db.models import Sum
+from django.db.models import Sum, Count, Q, Value, CharField
+from django.db.models.functions import Concat
 from datetime import date, timedelta
 
+# Sections that don't count towards body-part usage
+EXCLUDED_SECTIONS = ["Warm Up A", "Warm Up B", "Conditioning"]
+
+# Stats windows, in days back from today (inclusive)
+STATS_WINDOWS = {'weekly': 7, 'monthly': 30, 'yearly': 365}
+
 
 def compute_body_part_count_for_workout(workout):
     """
@@ -17,8 +24,7 @@ def compute_body_part_count_for_workout(workout):
     """
     # 1) Exclude Warm Up / Conditioning sections
     # (Case-sensitive: if your DB has exact naming, or you might use .iexact)
-    excluded_sections = ["Warm Up A", "Warm Up B", "Conditioning"]
-    sections = workout.workout_sections.exclude(section_name__in=excluded_sections)
+    sections = workout.workout_sections.exclude(section_name__in=EXCLUDED_SECTIONS)
 
     # 2) Gather all SectionMovement for these sections
     section_movements = SectionMovement.objects.filter(section__in=sections)
@@ -40,6 +46,9 @@ def aggregate_body_parts_over_range(user, start_date, end_date):
     """
     For all 'Completed' workouts within [start_date, end_date],
     sum up the body-part counts from `compute_body_part_count_for_workout()`.
+
+    Per-workout reference implementation for a single user and range; the stats jobs
+    use `compute_user_stats`, which must return the same dicts.
     
     Example return: {"Shoulders": 5, "Back": 3, "Legs": 2, ...}
     """
@@ -66,6 +75,8 @@ def aggregate_activity_type_over_range(user, start_date, end_date):
     For all 'Completed' workouts in [start_date, end_date],
     sum durations by activity_type.
     Returns e.g.: {"Strength": 120, "Running": 60, "HIIT": 30}
+
+    Reference implementation, see `compute_user_stats`.
     """
     qs = Workout.objects.filter(
         owner=user,
@@ -82,3 +93,86 @@ def aggregate_activity_type_over_range(user, start_date, end_date):
         usage_dict[atype] += (w.duration or 0)
 
     return dict(usage_dict)
+
+
+def stats_window_starts(today):
+    return {name: today - timedelta(days=days) for name, days in STATS_WINDOWS.items()}
+
+
+def empty_stats():
+    return {
+        f'{name}_{kind}': {}
+        for name in STATS_WINDOWS
+        for kind in ('body_part', 'activity_type')
+    }
+
+
+def compute_user_stats(user_ids, today=None):
+    """
+    Body-part counts and activity-type minutes for every window, for a batch of users,
+    in two queries: one over section movements and one over workouts, each summing
+    all three windows at once with conditional aggregation.
+
+    A workout counts each distinct movement once per body part, as in
+    `compute_body_part_count_for_workout`, so body parts are counted as distinct
+    (workout, movement) pairs.
+
+    Returns {user_id: {'weekly_body_part': {...}, ..., 'yearly_activity_type': {...}}},
+    with the same dicts the per-workout aggregators build.
+    """
+    today = today or date.today()
+    starts = stats_window_starts(today)
+    earliest = min(starts.values())
+    stats = {user_id: empty_stats() for user_id in user_ids}
+
+    # 1) Body parts: distinct (workout, movement) pairs per owner and body part
+    workout_movement = Concat('section__workout_id', Value('-'), 'movements_id', output_field=CharField())
+    body_part_rows = (
+        SectionMovement.objects
+        .filter(
+            section__workout__owner_id__in=user_ids,
+            section__workout__status='Completed',
+            section__workout__completed_date__gte=earliest,
+            section__workout__completed_date__lte=today,
+        )
+        .exclude(section__section_name__in=EXCLUDED_SECTIONS)
+        .exclude(movements__primary_body_part__isnull=True)
+        .exclude(movements__primary_body_part='')
+        .values_list('section__workout__owner_id', 'movements__primary_body_part')
+        .annotate(**{
+            name: Count(workout_movement, distinct=True, filter=Q(section__workout__completed_date__gte=start))
+            for name, start in starts.items()
+        })
+        .order_by()
+    )
+    for owner_id, body_part, *counts in body_part_rows:
+        for name, count in zip(starts, counts):
+            if count:
+                stats[owner_id][f'{name}_body_part'][body_part] = count
+
+    # 2) Activity types: workouts and minutes per owner and activity type
+    aggregates = {}
+    for name, start in starts.items():
+        in_window = Q(completed_date__gte=start)
+        aggregates[f'{name}_workouts'] = Count('id', filter=in_window)
+        aggregates[f'{name}_minutes'] = Sum('duration', filter=in_window)
+    activity_rows = (
+        Workout.objects
+        .filter(
+            owner_id__in=user_ids,
+            status='Completed',
+            completed_date__gte=earliest,
+            completed_date__lte=today,
+        )
+        .values_list('owner_id', 'activity_type')
+        .annotate(**aggregates)
+        .order_by()
+    )
+    for owner_id, activity_type, *values in activity_rows:
+        atype = activity_type or "Unknown"
+        for name, workouts, minutes in zip(starts, values[0::2], values[1::2]):
+            if workouts:
+                usage = stats[owner_id][f'{name}_activity_type']
+                usage[atype] = usage.get(atype, 0.0) + float(minutes or 0)
+
+    return stats
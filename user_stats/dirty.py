@@ -0,0 +1,68 @@
+import logging
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import DirtyUser
+
+logger = logging.getLogger(__name__)
+
+DIRTY_BATCH_SIZE = 500
+
+
+def mark_dirty(user_ids, scope):
+    """
+    Flag users as needing `scope` recomputed. One upsert for the whole list; marking
+    an already-dirty user just moves its `marked_at` forward.
+
+    The upsert (rather than ignoring conflicts) matters: if a job is processing the
+    user right now, the upsert waits for that job's transaction and then re-creates
+    the mark, so a change made mid-run is never lost.
+    """
+    user_ids = {int(user_id) for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+    marked_at = now()
+    DirtyUser.objects.bulk_create(
+        [DirtyUser(user_id=user_id, scope=scope, marked_at=marked_at) for user_id in user_ids],
+        update_conflicts=True,
+        unique_fields=['user', 'scope'],
+        update_fields=['marked_at'],
+    )
+
+
+def drain_dirty_users(scope, process, batch_size=DIRTY_BATCH_SIZE):
+    """
+    Call `process(user_ids)` for every user marked dirty for `scope`, a batch at a time.
+
+    Each batch is claimed with SELECT ... FOR UPDATE SKIP LOCKED and its marks are
+    deleted in the same transaction as the processing, so concurrent workers split
+    the work and a failed batch stays dirty for the next run.
+    Returns the number of users processed.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            marks = list(
+                DirtyUser.objects
+                .select_for_update(skip_locked=True)
+                .filter(scope=scope)
+                .order_by('marked_at')[:batch_size]
+            )
+            if not marks:
+                break
+
+            process([mark.user_id for mark in marks])
+            DirtyUser.objects.filter(id__in=[mark.id for mark in marks]).delete()
+
+        processed += len(marks)
+
+    if processed:
+        logger.info("Recomputed %s for %s dirty users", scope, processed)
+    return processed
+
+
+def clear_dirty_users(scope, marked_before):
+    """Drop marks a full sweep has already covered."""
+    deleted, _ = DirtyUser.objects.filter(scope=scope, marked_at__lt=marked_before).delete()
+    return deleted
@@ -0,0 +1,168 @@
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value, CharField
+from django.db.models.functions import Concat
+
+from saved_workouts.models import Workout
+from saved_runs.models import SavedRunningSession
+from workout_section_movement.models import SectionMovement
+from workout_section_sets.models import Set
+from .aggregators import EXCLUDED_SECTIONS, STATS_WINDOWS, empty_stats, stats_window_starts
+from .models import DailyTrainingFact
+
+ACTIVITY_ROW = ''  # `body_part` of a day's activity-level fact
+
+
+def rebuild_daily_facts(owner_id, days):
+    """
+    Replace the owner's DailyTrainingFact rows for `days` from their completed
+    workouts on those days. A handful of grouped queries however many workouts
+    the days hold. Returns the number of fact rows written.
+    """
+    days = {day for day in days if day}
+    if not owner_id or not days:
+        return 0
+
+    workouts = Workout.objects.filter(owner_id=owner_id, status='Completed', completed_date__in=days)
+    facts = {}
+
+    def fact(day, activity_type, body_part=ACTIVITY_ROW):
+        key = (day, activity_type or "Unknown", body_part)
+        if key not in facts:
+            facts[key] = DailyTrainingFact(owner_id=owner_id, day=key[0], activity_type=key[1], body_part=body_part)
+        return facts[key]
+
+    # 1) Workouts and minutes
+    for day, activity_type, workout_count, minutes in (
+        workouts.values_list('completed_date', 'activity_type')
+        .annotate(workouts=Count('id'), minutes=Sum('duration'))
+        .order_by()
+    ):
+        row = fact(day, activity_type)
+        row.workout_count += workout_count
+        row.minutes += minutes or 0
+
+    # 2) Running distance
+    for day, activity_type, distance in (
+        SavedRunningSession.objects
+        .filter(workout__in=workouts)
+        .values_list('workout__completed_date', 'workout__activity_type')
+        .annotate(distance=Sum('total_distance'))
+        .order_by()
+    ):
+        fact(day, activity_type).distance += distance or 0
+
+    # 3) Movements per body part, each movement once per workout
+    body_part_movements = (
+        SectionMovement.objects
+        .filter(section__workout__in=workouts)
+        .exclude(section__section_name__in=EXCLUDED_SECTIONS)
+        .exclude(movements__primary_body_part__isnull=True)
+        .exclude(movements__primary_body_part='')
+    )
+    workout_movement = Concat('section__workout_id', Value('-'), 'movements_id', output_field=CharField())
+    for day, activity_type, body_part, movement_count in (
+        body_part_movements
+        .values_list('section__workout__completed_date', 'section__workout__activity_type', 'movements__primary_body_part')
+        .annotate(movements=Count(workout_movement, distinct=True))
+        .order_by()
+    ):
+        fact(day, activity_type, body_part).movement_count += movement_count
+
+    # 4) Sets and volume per body part
+    for day, activity_type, body_part, set_count, volume_load in (
+        Set.objects
+        .filter(section_movement__in=body_part_movements)
+        .values_list(
+            'section_movement__section__workout__completed_date',
+            'section_movement__section__workout__activity_type',
+            'section_movement__movements__primary_body_part',
+        )
+        .annotate(sets=Count('id'), volume=Sum(F('reps') * F('weight'), output_field=FloatField()))
+        .order_by()
+    ):
+        row = fact(day, activity_type, body_part)
+        row.set_count += set_count
+        row.volume_load += volume_load or 0
+
+    with transaction.atomic():
+        DailyTrainingFact.objects.filter(owner_id=owner_id, day__in=days).delete()
+        DailyTrainingFact.objects.bulk_create(facts.values())
+    return len(facts)
+
+
+def stats_windows(owner_id, today=None):
+    """
+    The weekly, monthly and yearly body-part and activity-type dicts (the UserStats
+    fields) for one user, in one query over their facts.
+    """
+    today = today or date.today()
+    starts = stats_window_starts(today)
+
+    aggregates = {}
+    for name, start in starts.items():
+        in_window = Q(day__gte=start)
+        aggregates[f'{name}_workouts'] = Sum('workout_count', filter=in_window)
+        aggregates[f'{name}_minutes'] = Sum('minutes', filter=in_window)
+        aggregates[f'{name}_movements'] = Sum('movement_count', filter=in_window)
+
+    rows = (
+        DailyTrainingFact.objects
+        .filter(owner_id=owner_id, day__gte=min(starts.values()), day__lte=today)
+        .values_list('activity_type', 'body_part')
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+    stats = empty_stats()
+    for activity_type, body_part, *values in rows:
+        for index, name in enumerate(STATS_WINDOWS):
+            workouts, minutes, movements = values[index * 3:index * 3 + 3]
+            _add(stats[f'{name}_activity_type'], stats[f'{name}_body_part'], activity_type, body_part,
+                 workouts, minutes, movements)
+    return stats
+
+
+def range_summary(owner_id, start, end):
+    """Body parts, activity minutes and training totals for any [start, end] range, in one query."""
+    rows = (
+        DailyTrainingFact.objects
+        .filter(owner_id=owner_id, day__gte=start, day__lte=end)
+        .values_list('activity_type', 'body_part')
+        .annotate(
+            workouts=Sum('workout_count'),
+            minutes=Sum('minutes'),
+            movements=Sum('movement_count'),
+            sets=Sum('set_count'),
+            volume=Sum('volume_load'),
+            km=Sum('distance'),
+        )
+        .order_by()
+    )
+
+    activity_type_usage, body_part_usage = {}, {}
+    totals = {'workouts': 0, 'minutes': 0.0, 'set_count': 0, 'volume_load': 0.0, 'distance': 0.0}
+    for activity_type, body_part, workouts, minutes, movements, sets, volume, km in rows:
+        _add(activity_type_usage, body_part_usage, activity_type, body_part, workouts, minutes, movements)
+        totals['workouts'] += workouts or 0
+        totals['minutes'] += minutes or 0
+        totals['set_count'] += sets or 0
+        totals['volume_load'] += volume or 0
+        totals['distance'] += km or 0
+
+    return {
+        'start': start,
+        'end': end,
+        'body_part': body_part_usage,
+        'activity_type': activity_type_usage,
+        'totals': totals,
+    }
+
+
+def _add(activity_type_usage, body_part_usage, activity_type, body_part, workouts, minutes, movements):
+    if body_part == ACTIVITY_ROW:
+        if workouts:
+            activity_type_usage[activity_type] = activity_type_usage.get(activity_type, 0.0) + float(minutes or 0)
+    elif movements:
+        body_part_usage[body_part] = body_part_usage.get(body_part, 0) + movements
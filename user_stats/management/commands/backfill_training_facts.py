@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from saved_workouts.models import Workout
+from user_stats.facts import rebuild_daily_facts
+
+
+class Command(BaseCommand):
+    help = "Rebuild DailyTrainingFact rows from completed workouts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, help="Only backfill this user.")
+
+    def handle(self, *args, **options):
+        workouts = Workout.objects.filter(status='Completed', completed_date__isnull=False, owner__isnull=False)
+        if options.get('user_id'):
+            workouts = workouts.filter(owner_id=options['user_id'])
+
+        days_by_owner = {}
+        for owner_id, day in workouts.values_list('owner_id', 'completed_date').distinct().iterator():
+            days_by_owner.setdefault(owner_id, set()).add(day)
+
+        total_rows = 0
+        for owner_id, days in days_by_owner.items():
+            rows = rebuild_daily_facts(owner_id, days)
+            total_rows += rows
+            self.stdout.write(f"User {owner_id}: {rows} facts over {len(days)} days.")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfill complete: {total_rows} rows written."))
@@ -0,0 +1,178 @@
+import resource
+import time
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from saved_workouts.models import Workout
+from workout_section_movement.models import SectionMovement
+from user_stats.aggregators import EXCLUDED_SECTIONS, STATS_WINDOWS, empty_stats, stats_window_starts
+from user_stats.tasks import store_user_stats
+
+User = get_user_model()
+
+USERS_PER_CHUNK = 5000
+CURSOR_CHUNK_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute UserStats for every user in bulk: stream the workout and movement columns "
+        "in user chunks into NumPy arrays, aggregate every window with grouped array "
+        "operations and upsert the results. Requires numpy."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=USERS_PER_CHUNK, help="Users per chunk.")
+        parser.add_argument('--today', help="Compute the windows as of this date (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            import numpy as np
+        except ImportError:
+            raise CommandError("recompute_user_stats needs numpy: pip install numpy")
+
+        today = date.today()
+        if options.get('today'):
+            try:
+                today = date.fromisoformat(options['today'])
+            except ValueError:
+                raise CommandError("--today must be a date in YYYY-MM-DD format")
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be positive")
+
+        started = time.monotonic()
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        rows_read = 0
+
+        for offset in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[offset:offset + chunk_size]
+            stats_by_user = {user_id: empty_stats() for user_id in chunk}
+
+            rows_read += _add_activity_types(np, stats_by_user, chunk, today)
+            rows_read += _add_body_parts(np, stats_by_user, chunk, today)
+            store_user_stats(stats_by_user)
+
+            self.stdout.write(f"Users {chunk[0]}-{chunk[-1]}: {len(chunk)} stored, {rows_read} rows read so far.")
+
+        elapsed = time.monotonic() - started
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+        self.stdout.write(self.style.SUCCESS(
+            f"Recomputed stats for {len(user_ids)} users from {rows_read} rows in {elapsed:.1f}s "
+            f"({rows_read / elapsed if elapsed else 0:.0f} rows/s, peak memory {peak_mb:.0f} MB)."
+        ))
+
+
+def _stream(np, queryset, columns):
+    """
+    Read `columns` of the queryset into one typed NumPy array each, through a
+    server-side cursor where the database has one. `columns` is a list of
+    (field, dtype, default for NULL). Rows are converted one cursor batch at a
+    time, so no full list of row tuples is ever held.
+    """
+    rows = queryset.values_list(*(field for field, _, _ in columns)).iterator(chunk_size=CURSOR_CHUNK_SIZE)
+    parts = [[] for _ in columns]
+    while batch := list(islice(rows, CURSOR_CHUNK_SIZE)):
+        for index, (_, dtype, default) in enumerate(columns):
+            parts[index].append(np.fromiter(
+                (default if row[index] is None else row[index] for row in batch),
+                dtype=dtype,
+                count=len(batch),
+            ))
+    return [
+        np.concatenate(column) if column else np.empty(0, dtype=dtype)
+        for column, (_, dtype, _) in zip(parts, columns)
+    ]
+
+
+def _window_keys(np, owner_ids, labels, days, today):
+    """
+    Factorize (owner, label) into one integer key per row, plus each row's age in days.
+    Returns (owners, labels, keys, days_ago).
+    """
+    owners, owner_index = np.unique(owner_ids, return_inverse=True)
+    label_values, label_index = np.unique(labels, return_inverse=True)
+    keys = owner_index * len(label_values) + label_index
+    days_ago = (np.datetime64(today, 'D') - days).astype(np.int64)
+    return owners, label_values, keys, days_ago
+
+
+def _add_activity_types(np, stats_by_user, user_ids, today):
+    """Minutes per activity type for each window. Returns the number of rows read."""
+    owner_ids, activity_types, minutes, days = _stream(
+        np,
+        Workout.objects.filter(
+            owner_id__in=user_ids,
+            status='Completed',
+            completed_date__gte=min(stats_window_starts(today).values()),
+            completed_date__lte=today,
+        ),
+        [
+            ('owner_id', np.int64, 0),
+            ('activity_type', object, "Unknown"),
+            ('duration', np.float64, 0),
+            ('completed_date', 'datetime64[D]', None),
+        ],
+    )
+    if not len(owner_ids):
+        return 0
+
+    # Blank activity types count as "Unknown", as they do for NULL
+    activity_types[activity_types == ''] = "Unknown"
+    owners, types, keys, days_ago = _window_keys(np, owner_ids, activity_types, days, today)
+    size = len(owners) * len(types)
+
+    for name, window_days in STATS_WINDOWS.items():
+        in_window = days_ago <= window_days
+        workouts = np.bincount(keys[in_window], minlength=size)
+        totals = np.bincount(keys[in_window], weights=minutes[in_window], minlength=size)
+        for key in np.flatnonzero(workouts):
+            owner, atype = divmod(int(key), len(types))
+            stats_by_user[int(owners[owner])][f'{name}_activity_type'][types[atype]] = float(totals[key])
+    return len(owner_ids)
+
+
+def _add_body_parts(np, stats_by_user, user_ids, today):
+    """
+    Body-part counts for each window, counting each movement once per workout as
+    `compute_body_part_count_for_workout` does. Returns the number of rows read.
+    """
+    workout_ids, movement_ids, owner_ids, body_parts, days = _stream(
+        np,
+        SectionMovement.objects
+        .filter(
+            section__workout__owner_id__in=user_ids,
+            section__workout__status='Completed',
+            section__workout__completed_date__gte=min(stats_window_starts(today).values()),
+            section__workout__completed_date__lte=today,
+        )
+        .exclude(section__section_name__in=EXCLUDED_SECTIONS)
+        .exclude(movements__primary_body_part__isnull=True)
+        .exclude(movements__primary_body_part=''),
+        [
+            ('section__workout_id', np.int64, 0),
+            ('movements_id', np.int64, 0),
+            ('section__workout__owner_id', np.int64, 0),
+            ('movements__primary_body_part', object, None),
+            ('section__workout__completed_date', 'datetime64[D]', None),
+        ],
+    )
+    if not len(owner_ids):
+        return 0
+
+    # 1) Keep one row per (workout, movement)
+    _, first = np.unique(np.column_stack([workout_ids, movement_ids]), axis=0, return_index=True)
+
+    # 2) Count per owner and body part within each window
+    owners, parts, keys, days_ago = _window_keys(np, owner_ids[first], body_parts[first], days[first], today)
+    size = len(owners) * len(parts)
+
+    for name, window_days in STATS_WINDOWS.items():
+        counts = np.bincount(keys[days_ago <= window_days], minlength=size)
+        for key in np.flatnonzero(counts):
+            owner, part = divmod(int(key), len(parts))
+            stats_by_user[int(owners[owner])][f'{name}_body_part'][parts[part]] = int(counts[key])
+    return len(owner_ids)
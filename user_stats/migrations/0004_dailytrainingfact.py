@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 18:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("user_stats", "0003_dirtyuser"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyTrainingFact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("activity_type", models.CharField(max_length=20)),
+                ("body_part", models.CharField(blank=True, default="", max_length=100)),
+                ("workout_count", models.PositiveIntegerField(default=0)),
+                ("minutes", models.FloatField(default=0)),
+                ("distance", models.FloatField(default=0)),
+                ("movement_count", models.PositiveIntegerField(default=0)),
+                ("set_count", models.PositiveIntegerField(default=0)),
+                ("volume_load", models.FloatField(default=0)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="training_facts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("owner", "day", "activity_type", "body_part")},
+            },
+        ),
+    ]
@@ -25,3 +25,68 @@ class UserStats(models.Model):
 
     def __str__(self):
         return f"Stats for user {self.owner.username}"
+
+
+class DirtyUser(models.Model):
+    """
+    A user whose derived data is out of date for one `scope`. Rows are upserted by
+    `user_stats.dirty.mark_dirty` when workouts or scores change, and deleted by the
+    periodic job that brings that scope up to date, so each tick only does work
+    for users who were active.
+    """
+    STATS = 'stats'
+    LEADERBOARD = 'leaderboard'
+    SCOPE_CHOICES = [
+        (STATS, 'User stats'),
+        (LEADERBOARD, 'Leaderboard'),
+    ]
+
+    user = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='dirty_marks',
+        on_delete=models.CASCADE
+    )
+    scope = models.CharField(max_length=20, choices=SCOPE_CHOICES)
+    marked_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'scope')
+
+    def __str__(self):
+        return f"{self.user_id} dirty for {self.scope} since {self.marked_at}"
+
+
+class DailyTrainingFact(models.Model):
+    """
+    What a user trained on one day, per activity type and body part. Each (owner, day,
+    activity_type) has one activity row (`body_part` blank) carrying workouts, minutes
+    and distance, plus one row per body part carrying movements, sets and volume.
+
+    Rebuilt per (owner, day) by `user_stats.facts.rebuild_daily_facts` whenever a
+    workout on that day is completed, edited or deleted, so any date range is a sum
+    over at most a few rows per day; see `user_stats.facts`.
+    """
+    owner = models.ForeignKey(
+        'jwt_auth.User',
+        related_name='training_facts',
+        on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    activity_type = models.CharField(max_length=20)
+    body_part = models.CharField(max_length=100, blank=True, default='')
+
+    # Activity row
+    workout_count = models.PositiveIntegerField(default=0)
+    minutes = models.FloatField(default=0)
+    distance = models.FloatField(default=0)
+
+    # Body-part rows
+    movement_count = models.PositiveIntegerField(default=0)  # Distinct movements per workout, summed
+    set_count = models.PositiveIntegerField(default=0)
+    volume_load = models.FloatField(default=0)  # Sum of reps x weight
+
+    class Meta:
+        unique_together = ('owner', 'day', 'activity_type', 'body_part')
+
+    def __str__(self):
+        return f"{self.owner_id} {self.day} {self.activity_type} {self.body_part or '(activity)'}"
@@ -1,42 +1,56 @@
 from celery import shared_task
-from datetime import date, timedelta
+from datetime import date
 
 from django.contrib.auth import get_user_model
+from django.utils.timezone import now
 User = get_user_model()
 
-from user_stats.models import UserStats
-from user_stats.aggregators import (
-    aggregate_body_parts_over_range,
-    aggregate_activity_type_over_range
-)
+from user_stats.models import UserStats, DirtyUser
+from user_stats.aggregators import compute_user_stats, empty_stats
+from user_stats.dirty import drain_dirty_users, clear_dirty_users
+
+# Users whose stats are computed (two queries) and written (one upsert) together
+USER_STATS_BATCH_SIZE = 500
+
+
+def refresh_user_stats(user_ids, today=None):
+    """Recompute and store every stats window for these users."""
+    today = today or date.today()
+
+    # 1) Body-part and activity-type aggregates for every window
+    stats_by_user = compute_user_stats(user_ids, today)
+
+    # 2) Store or create the user stats records
+    store_user_stats(stats_by_user)
+
+
+def store_user_stats(stats_by_user):
+    """Upsert {user_id: stats dict} into UserStats in one statement."""
+    UserStats.objects.bulk_create(
+        [UserStats(owner_id=user_id, **stats) for user_id, stats in stats_by_user.items()],
+        update_conflicts=True,
+        unique_fields=['owner'],
+        update_fields=list(empty_stats()) + ['last_updated'],
+    )
+
+
+@shared_task
+def update_dirty_user_stats():
+    """Recompute stats only for users whose workouts changed since the last run."""
+    return drain_dirty_users(DirtyUser.STATS, refresh_user_stats, batch_size=USER_STATS_BATCH_SIZE)
+
 
 @shared_task
 def update_all_user_stats():
+    """
+    Daily sweep over every user, so windows roll forward for users who were not
+    active. Marks made before the sweep started are covered by it.
+    """
+    started = now()
     today = date.today()
-    one_week_ago = today - timedelta(days=7)
-    one_month_ago = today - timedelta(days=30)
-    one_year_ago = today - timedelta(days=365)
-
-    users = User.objects.all()
-    for user in users:
-        # 1) Body-part aggregator
-        weekly_body = aggregate_body_parts_over_range(user, one_week_ago, today)
-        monthly_body = aggregate_body_parts_over_range(user, one_month_ago, today)
-        yearly_body = aggregate_body_parts_over_range(user, one_year_ago, today)
-
-        # 2) Activity-type aggregator
-        weekly_act = aggregate_activity_type_over_range(user, one_week_ago, today)
-        monthly_act = aggregate_activity_type_over_range(user, one_month_ago, today)
-        yearly_act = aggregate_activity_type_over_range(user, one_year_ago, today)
-
-        # 3) Store or create the user stats record
-        stats, created = UserStats.objects.get_or_create(owner=user)
-        stats.weekly_body_part = weekly_body
-        stats.monthly_body_part = monthly_body
-        stats.yearly_body_part = yearly_body
-
-        stats.weekly_activity_type = weekly_act
-        stats.monthly_activity_type = monthly_act
-        stats.yearly_activity_type = yearly_act
-
-        stats.save()
+
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for offset in range(0, len(user_ids), USER_STATS_BATCH_SIZE):
+        refresh_user_stats(user_ids[offset:offset + USER_STATS_BATCH_SIZE], today)
+
+    clear_dirty_users(DirtyUser.STATS, started)
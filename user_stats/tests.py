@@ -1,3 +1,175 @@
+import importlib.util
+from datetime import date, timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from movements.models import Movement
+from saved_workouts.models import Workout
+from workout_sections.models import Section
+from workout_section_movement.models import SectionMovement
+from user_stats.aggregators import (
+    STATS_WINDOWS,
+    aggregate_activity_type_over_range,
+    aggregate_body_parts_over_range,
+    compute_user_stats,
+)
+from user_stats.facts import range_summary, rebuild_daily_facts, stats_windows
+from user_stats.models import UserStats
+from user_stats.tasks import update_all_user_stats
+
+User = get_user_model()
+
+
+class ComputeUserStatsParityTest(TestCase):
+    """`compute_user_stats` must build exactly the dicts of the per-workout aggregators."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = date.today()
+        shoulders = Movement.objects.create(exercise='Press', primary_body_part='Shoulders')
+        back = Movement.objects.create(exercise='Row', primary_body_part='Back')
+        legs = Movement.objects.create(exercise='Squat', primary_body_part='Legs')
+        no_part = Movement.objects.create(exercise='Carry', primary_body_part=None)
+        blank_part = Movement.objects.create(exercise='Crawl', primary_body_part='')
+
+        cls.users = [
+            User.objects.create(email=f'user{i}@example.com', username=f'user{i}', first_name=f'User{i}')
+            for i in range(3)
+        ]
+        alice, bob, _ = cls.users  # The third user has no workouts
+
+        def workout(owner, days_ago, activity_type='Gym', duration=45, status='Completed', sections=()):
+            w = Workout.objects.create(
+                owner=owner,
+                activity_type=activity_type,
+                duration=duration,
+                status=status,
+                completed_date=cls.today - timedelta(days=days_ago),
+            )
+            for order, (section_name, movements) in enumerate(sections):
+                section = Section.objects.create(workout=w, section_name=section_name, section_order=order)
+                for movement_order, movement in enumerate(movements):
+                    SectionMovement.objects.create(section=section, movements=movement, movement_order=movement_order)
+            return w
+
+        # The same movement twice in one workout counts once; excluded sections don't count
+        workout(alice, 0, sections=[
+            ('Build Strength', [shoulders, shoulders, back]),
+            ('Warm Up A', [legs]),
+            ('Conditioning', [legs]),
+        ])
+        # Same movement in two sections of one workout, an unnamed section, movements without a body part
+        workout(alice, 3, sections=[
+            ('Pump', [back, no_part]),
+            ('Finisher', [back, blank_part]),
+            (None, [legs]),
+        ])
+        workout(alice, 7, activity_type=None, duration=None, sections=[('Build', [legs])])
+        workout(alice, 8, activity_type='', duration=30, sections=[('Build', [legs, shoulders])])
+        workout(alice, 29, activity_type='Running', duration=25)
+        workout(alice, 30, activity_type='Hiit', duration=20, sections=[('Warm Up B', [back])])
+        workout(alice, 31, activity_type='Running', duration=40, sections=[('Build', [back])])
+        workout(alice, 365, activity_type='Mobility', duration=15, sections=[('Build', [shoulders])])
+        workout(alice, 366, activity_type='Mobility', duration=60, sections=[('Build', [legs])])
+        workout(alice, -1, sections=[('Build', [legs])])  # Completed "tomorrow": outside every window
+        workout(alice, 1, status='Scheduled', sections=[('Build', [legs])])
+
+        workout(bob, 2, activity_type='Gym', duration=50, sections=[('Build', [legs, back])])
+        workout(bob, 200, activity_type='Gym', duration=50, sections=[('Build', [legs])])
+
+    def expected(self, user):
+        expected = {}
+        for name, days in STATS_WINDOWS.items():
+            start = self.today - timedelta(days=days)
+            expected[f'{name}_body_part'] = aggregate_body_parts_over_range(user, start, self.today)
+            expected[f'{name}_activity_type'] = aggregate_activity_type_over_range(user, start, self.today)
+        return expected
+
+    def test_matches_per_workout_aggregators(self):
+        stats = compute_user_stats([user.id for user in self.users], self.today)
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                self.assertEqual(stats[user.id], self.expected(user))
+
+    def test_value_types_match(self):
+        alice = self.users[0]
+        stats = compute_user_stats([alice.id], self.today)[alice.id]
+
+        for field, expected in self.expected(alice).items():
+            for key, value in expected.items():
+                self.assertIs(type(stats[field][key]), type(value), f'{field}[{key!r}]')
+
+    def test_update_all_user_stats_stores_the_same_dicts(self):
+        UserStats.objects.create(owner=self.users[1], weekly_body_part={'Stale': 1})
+
+        update_all_user_stats()
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                stored = UserStats.objects.get(owner=user)
+                for field, expected in self.expected(user).items():
+                    self.assertEqual(getattr(stored, field), expected, field)
+
+    @skipUnless(importlib.util.find_spec('numpy'), "numpy is not installed")
+    def test_recompute_command_stores_the_same_dicts(self):
+        UserStats.objects.create(owner=self.users[1], weekly_body_part={'Stale': 1})
+
+        call_command('recompute_user_stats', '--chunk-size=2', f'--today={self.today}', stdout=StringIO())
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                stored = UserStats.objects.get(owner=user)
+                for field, expected in self.expected(user).items():
+                    self.assertEqual(getattr(stored, field), expected, field)
+                    for key, value in expected.items():
+                        self.assertIs(type(getattr(stored, field)[key]), type(value), f'{field}[{key!r}]')
+
+    def test_query_count_does_not_grow_with_workouts(self):
+        with self.assertNumQueries(2):
+            compute_user_stats([user.id for user in self.users], self.today)
+
+    def rebuild_all_facts(self):
+        for user in self.users:
+            days = Workout.objects.filter(owner=user, status='Completed').values_list('completed_date', flat=True)
+            rebuild_daily_facts(user.id, set(days))
+
+    def test_daily_training_facts_give_the_same_windows(self):
+        self.rebuild_all_facts()
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                self.assertEqual(stats_windows(user.id, self.today), self.expected(user))
+
+    def test_daily_training_facts_give_the_same_ranges(self):
+        self.rebuild_all_facts()
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                expected = self.expected(user)
+                for name, days in STATS_WINDOWS.items():
+                    summary = range_summary(user.id, self.today - timedelta(days=days), self.today)
+                    self.assertEqual(summary['body_part'], expected[f'{name}_body_part'], name)
+                    self.assertEqual(summary['activity_type'], expected[f'{name}_activity_type'], name)
+
+    def test_stats_views_serve_the_same_windows(self):
+        self.rebuild_all_facts()
+        client = APIClient()
+
+        for user in self.users:
+            with self.subTest(user=user.username):
+                expected = self.expected(user)
+
+                stats = client.get(f'/api/stats/{user.id}/').data
+                self.assertEqual(stats['id'], UserStats.objects.get(owner=user).id)
+                self.assertEqual(stats['owner'], user.id)
+                self.assertIn('last_updated', stats)
+                self.assertEqual({field: stats[field] for field in expected}, expected)
 
-# Create your tests here.
+                profile = client.get(f'/api/auth/full-profile/{user.id}/').data
+                self.assertEqual(profile['stats']['aggregates'], expected)
@@ -1,18 +1,46 @@
+from datetime import date, datetime
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.shortcuts import get_object_or_404
+from django.utils.timezone import now
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
 from user_stats.models import UserStats
-from user_stats.serializers.common import UserStatsSerializer
+from user_stats.facts import stats_windows, range_summary
+
+# Longest custom range one request may ask for
+MAX_RANGE_DAYS = 366 * 2
+
 
 class UserStatsView(APIView):
+    """
+    Weekly, monthly and yearly body-part and activity-type stats for a user, summed
+    from their daily training facts. Pass `start` and `end` (YYYY-MM-DD) for any
+    other range, e.g. the last 90 days.
+    """
     def get(self, request, user_id):
         # for example, you can do permission checks here
         user = get_object_or_404(User, id=user_id)
-        stats, _ = UserStats.objects.get_or_create(user=user)
-        serializer = UserStatsSerializer(stats)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        start, end = request.query_params.get('start'), request.query_params.get('end')
+        if start or end:
+            try:
+                start = datetime.strptime(start, '%Y-%m-%d').date()
+                end = datetime.strptime(end, '%Y-%m-%d').date() if end else date.today()
+            except (TypeError, ValueError):
+                return Response({'error': 'start (and optional end) must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+            if end < start or (end - start).days > MAX_RANGE_DAYS:
+                return Response(
+                    {'error': f'end must be on or after start, at most {MAX_RANGE_DAYS} days apart'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response(range_summary(user.id, start, end), status=status.HTTP_200_OK)
+
+        # Same keys as UserStatsSerializer; the windows are summed live, so they're current as of now
+        stats, _ = UserStats.objects.get_or_create(owner=user)
+        data = {'id': stats.id, 'owner': user.id, **stats_windows(user.id), 'last_updated': now()}
+        return Response(data, status=status.HTTP_200_OK)
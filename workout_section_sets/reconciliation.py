@@ -0,0 +1,107 @@
+from strength_records.models import StrengthSet
+from movement_summary_stats.records import detect_personal_records
+from .models import Set
+
+
+def apply_changes(instance, values):
+    """
+    Copy `values` onto `instance`, returning True only if any field actually changed.
+    Lets callers skip rows the payload re-sends untouched.
+    """
+    changed = False
+    for field, value in values.items():
+        if getattr(instance, field) != value:
+            setattr(instance, field, value)
+            changed = True
+    return changed
+
+
+class Reconciler:
+    """
+    Diff incoming rows against existing ones in linear time.
+
+    Existing instances are indexed once by `key_fields`. Each incoming row is
+    staged with `stage(key, values)`, which either updates the indexed instance
+    (only when a value differs) or queues a new one. `save()` then writes the
+    create/update/delete batches with one bulk statement each.
+    """
+
+    def __init__(self, model, existing, key_fields, update_fields):
+        self.model = model
+        self.key_fields = tuple(key_fields)
+        self.update_fields = list(update_fields)
+
+        self.index = {self.key_of(instance): instance for instance in existing}
+        self.to_create = []
+        self.to_update = {}
+        self.seen = set()
+
+    def key_of(self, instance):
+        return tuple(getattr(instance, field) for field in self.key_fields)
+
+    def stage(self, key, values, **create_kwargs):
+        """
+        Stage the incoming `values` for `key` and return the instance they landed on.
+        `create_kwargs` are only used when a new row has to be created.
+        """
+        self.seen.add(key)
+        instance = self.index.get(key)
+
+        if instance is None:
+            instance = self.model(**dict(zip(self.key_fields, key)), **create_kwargs, **values)
+            self.to_create.append(instance)
+            # A repeated key in the same payload updates the pending row
+            self.index[key] = instance
+        elif apply_changes(instance, values) and instance.pk is not None:
+            self.to_update[instance.pk] = instance
+
+        return instance
+
+    def stale(self, in_scope=None):
+        """
+        Existing rows that were not staged. `in_scope(key)` limits which unstaged rows
+        count as stale, so rows the payload never mentioned are left alone.
+        """
+        return [
+            instance for key, instance in self.index.items()
+            if key not in self.seen
+            and instance.pk is not None
+            and (in_scope is None or in_scope(key))
+        ]
+
+    def save(self, delete_stale=False, in_scope=None):
+        """Write the batches. Returns (created, updated, deleted) row counts."""
+        deleted = 0
+        if delete_stale:
+            stale_ids = [instance.pk for instance in self.stale(in_scope)]
+            if stale_ids:
+                deleted, _ = self.model.objects.filter(pk__in=stale_ids).delete()
+
+        if self.to_create:
+            self.model.objects.bulk_create(self.to_create)
+        if self.to_update:
+            self.model.objects.bulk_update(list(self.to_update.values()), self.update_fields)
+
+        return len(self.to_create), len(self.to_update), deleted
+
+
+def set_reconciler(existing_sets):
+    """Reconciler for workout `Set` rows keyed on (section_movement_id, set_number)."""
+    return Reconciler(Set, existing_sets, ('section_movement_id', 'set_number'), ['reps', 'weight'])
+
+
+class StrengthSetReconciler(Reconciler):
+    """A Reconciler that passes every StrengthSet it writes to the personal-record detector."""
+
+    def save(self, delete_stale=False, in_scope=None):
+        deleted = self.stale(in_scope) if delete_stale else []
+        counts = super().save(delete_stale=delete_stale, in_scope=in_scope)
+        detect_personal_records(created=self.to_create, updated=list(self.to_update.values()), deleted=deleted)
+        return counts
+
+
+def strength_set_reconciler(existing_strength_sets):
+    """Reconciler for `StrengthSet` rows keyed on (movement_id, set_number)."""
+    return StrengthSetReconciler(
+        StrengthSet, existing_strength_sets, ('movement_id', 'set_number'), ['reps', 'weight', 'rpe', 'load']
+    )